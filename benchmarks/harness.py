@@ -0,0 +1,152 @@
+'''
+    Minimal benchmark harness: repeatable scenarios, warmup, statistics, baselines.
+
+    A Scenario is a named piece of work with an optional setup/teardown (e.g. start a local
+    HTTP server once, outside of the timing) and a number of `items` it processes per run
+    (tasks, pages, images) for the throughput figure.
+
+    run_scenario() runs it `warmup` times untimed (imports, caches, worker start-up), then
+    `repeat` times timed, and returns the statistics of the timed runs:
+
+        {"median": s, "p95": s, "mean": s, "stdev": s, "min": s, "max": s,
+         "runs": repeat, "items": n, "throughput": items per second at the median}
+
+    Results are saved as JSON together with some machine info, and compare() checks them
+    against a stored baseline: a scenario whose median got more than `threshold` slower is a
+    regression.
+'''
+import json
+import math
+import os
+from pathlib import Path
+import platform
+import statistics
+import sys
+import time
+
+
+class Scenario:
+    '''
+    name     - unique name, "<group>/<variant>", e.g. "sleep/tpe-map"
+    run      - run(context) does the work once; context is what setup() returned (or None)
+    items    - number of items processed per run
+    setup    - optional setup() -> context, called once before the warmup
+    teardown - optional teardown(context), called once after the timed runs
+    '''
+    def __init__(self, name, run, items, setup=None, teardown=None):
+        self.name = name
+        self.run = run
+        self.items = items
+        self.setup = setup
+        self.teardown = teardown
+
+    @property
+    def group(self):
+        return self.name.split('/')[0]
+
+
+def percentile(values, pct):
+    '''
+    Percentile with linear interpolation between the closest ranks (like numpy's default)
+    '''
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(timings, items):
+    median = statistics.median(timings)
+    return {
+        'median': round(median, 6),
+        'p95': round(percentile(timings, 95), 6),
+        'mean': round(statistics.fmean(timings), 6),
+        'stdev': round(statistics.stdev(timings), 6) if len(timings) > 1 else 0.0,
+        'min': round(min(timings), 6),
+        'max': round(max(timings), 6),
+        'runs': len(timings),
+        'items': items,
+        'throughput': round(items / median, 3) if median else None,
+    }
+
+
+def run_scenario(scenario, warmup=1, repeat=5):
+    context = scenario.setup() if scenario.setup else None
+    try:
+        for _ in range(warmup):
+            scenario.run(context)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            scenario.run(context)
+            timings.append(time.perf_counter() - start)
+    finally:
+        if scenario.teardown:
+            scenario.teardown(context)
+    return summarize(timings, scenario.items)
+
+
+def machine_info():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_suite(scenarios, warmup=1, repeat=5, on_result=None):
+    '''
+    Run every scenario, return the results document (meta + results by scenario name);
+    on_result(name, stats) is called after each scenario
+    '''
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = run_scenario(scenario, warmup, repeat)
+        if on_result is not None:
+            on_result(scenario.name, results[scenario.name])
+    return {
+        'meta': {**machine_info(), 'argv': sys.argv[1:], 'warmup': warmup, 'repeat': repeat,
+                 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'results': results,
+    }
+
+
+def save_results(fname, document):
+    Path(fname).parent.mkdir(parents=True, exist_ok=True)
+    with open(fname, 'w') as f:
+        json.dump(document, f, indent=2)
+
+
+def load_results(fname):
+    with open(fname) as f:
+        return json.load(f)
+
+
+def compare(document, baseline, threshold=0.10):
+    '''
+    Compare the medians of `document` with `baseline` (both results documents).  Returns one
+    row per scenario found in both:
+        {"name", "baseline", "current", "ratio", "status"}
+    status is "regression" (more than threshold slower), "improved" (more than threshold
+    faster) or "ok".  Scenarios missing from either side are left out.
+    '''
+    rows = []
+    for name, stats in document['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        ratio = stats['median'] / base['median'] if base['median'] else float('inf')
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 - threshold:
+            status = 'improved'
+        else:
+            status = 'ok'
+        rows.append({'name': name, 'baseline': base['median'], 'current': stats['median'],
+                     'ratio': round(ratio, 3), 'status': status})
+    return rows
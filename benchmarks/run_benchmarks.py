@@ -0,0 +1,65 @@
+'''
+    Run the threading / futures / multiprocessing benchmark suite.
+
+    $ python benchmarks/run_benchmarks.py                        # all scenarios
+    $ python benchmarks/run_benchmarks.py --group io --group cpu # only some groups
+    $ python benchmarks/run_benchmarks.py --save-baseline        # store the results as the baseline
+    $ python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --threshold 0.15
+
+    The results (median, p95, throughput ... per scenario, see harness.py) are written as JSON to
+    --output.  With a baseline file the medians are compared, and the exit code is 1 when any
+    scenario got more than --threshold slower - usable as a check in a script or CI job.
+    Baselines are only comparable on the same machine.
+'''
+import argparse
+from pathlib import Path
+import sys
+
+from harness import compare, load_results, run_suite, save_results
+from scenarios import all_scenarios
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_OUTPUT = HERE / 'results' / 'latest.json'
+DEFAULT_BASELINE = HERE / 'results' / 'baseline.json'
+
+
+def print_result(name, stats):
+    print(f"{name:<24} median {stats['median']:8.4f} s   p95 {stats['p95']:8.4f} s   "
+          f"{stats['throughput']:9.1f} items/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--group', action='append', choices=['sleep', 'io', 'cpu'],
+                        help='scenario group to run (repeatable, default: all)')
+    parser.add_argument('--filter', default='', help='only scenarios whose name contains this text')
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='results JSON file')
+    parser.add_argument('--baseline', default=None, help=f'baseline JSON to compare with (e.g. {DEFAULT_BASELINE})')
+    parser.add_argument('--save-baseline', action='store_true', help=f'also save the results to {DEFAULT_BASELINE}')
+    parser.add_argument('--threshold', type=float, default=0.10, help='slowdown that counts as a regression')
+    args = parser.parse_args()
+
+    scenarios = [s for s in all_scenarios()
+                 if (not args.group or s.group in args.group) and args.filter in s.name]
+    document = run_suite(scenarios, warmup=args.warmup, repeat=args.repeat, on_result=print_result)
+
+    save_results(args.output, document)
+    print(f'\nresults written to {args.output}')
+    if args.save_baseline:
+        save_results(DEFAULT_BASELINE, document)
+        print(f'baseline written to {DEFAULT_BASELINE}')
+
+    if args.baseline:
+        rows = compare(document, load_results(args.baseline), args.threshold)
+        print(f'\ncompared with {args.baseline} (threshold {args.threshold:.0%}):')
+        for row in rows:
+            print(f"{row['name']:<24} {row['baseline']:8.4f} -> {row['current']:8.4f} s  "
+                  f"{row['ratio']:6.2f}x  {row['status'].upper() if row['status'] != 'ok' else 'ok'}")
+        if any(row['status'] == 'regression' for row in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+'''
+    Benchmark scenarios for the threading / concurrent.futures / multiprocessing demos.
+
+    Three groups of work, each run with the techniques the demos show:
+
+    sleep - 20 time.sleep() tasks (thread_01_methods.quiet_worker), the pure "waiting" case
+    io    - 40 page downloads with cc_futures_01.load_url() from a local HTTP stand-in
+            (shared/local_http_server.py, 20 ms latency per request) instead of live web sites
+    cpu   - 8 synthetic 1600x1200 photos through image_pipeline.blur_and_thumbnail()
+            (GaussianBlur(15) + thumbnail), the CPU bound case of mp_pool_executor.py
+
+    techniques:
+        serial           - one after the other, the reference
+        thread-list      - threading.Thread per task, start() all, join() all
+        tpe-submit       - ThreadPoolExecutor.submit() + result() in submit order
+        tpe-map          - ThreadPoolExecutor.map()
+        tpe-as-completed - ThreadPoolExecutor.submit() + as_completed()
+        ppe-map          - ProcessPoolExecutor.map() (sleep and cpu only - forking worker
+                           processes that share the pooled HTTP session's sockets is unsafe)
+
+    Every pool is created inside the timed run, exactly like the demos do.
+'''
+import concurrent.futures
+from pathlib import Path
+import sys
+import threading
+
+import numpy as np
+from PIL import Image
+
+# the demos live in folders with dashes in their names - put them on the path directly
+repo = Path(__file__).resolve().parents[1]
+for folder in (repo, repo / 'multi-threading', repo / 'multi-processing', repo / 'concurrent_futures'):
+    sys.path.insert(0, str(folder))
+
+from cc_futures_01 import load_url
+from image_pipeline import blur_and_thumbnail
+from shared.local_http_server import LocalHTTPServer
+from thread_01_methods import quiet_worker
+
+from harness import Scenario
+
+SLEEP_SECS = [0.02, 0.04, 0.06, 0.08] * 5
+SLEEP_WORKERS = len(SLEEP_SECS)
+
+IO_PAGES = 40
+IO_PAGE_SIZE = 20_000
+IO_DELAY = 0.02
+IO_WORKERS = 8
+
+CPU_IMAGES = 8
+CPU_IMAGE_SIZE = (1600, 1200)
+CPU_WORKERS = None      # ProcessPoolExecutor / ThreadPoolExecutor default
+
+
+# ================================================================================
+# the techniques - run(func, args) for every args, return the results
+# ================================================================================
+
+def serial(func, args_list, workers=None):
+    return [func(*args) for args in args_list]
+
+def thread_list(func, args_list, workers=None):
+    results = [None] * len(args_list)
+    def target(indx, args):
+        results[indx] = func(*args)
+    threads = [threading.Thread(target=target, args=(indx, args)) for indx, args in enumerate(args_list)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+def tpe_submit(func, args_list, workers=None):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(func, *args) for args in args_list]
+        return [f.result() for f in futures]
+
+def tpe_map(func, args_list, workers=None):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, *zip(*args_list)))
+
+def tpe_as_completed(func, args_list, workers=None):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(func, *args) for args in args_list]
+        return [f.result() for f in concurrent.futures.as_completed(futures)]
+
+def ppe_map(func, args_list, workers=None):
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, *zip(*args_list)))
+
+TECHNIQUES = {
+    'serial': serial,
+    'thread-list': thread_list,
+    'tpe-submit': tpe_submit,
+    'tpe-map': tpe_map,
+    'tpe-as-completed': tpe_as_completed,
+    'ppe-map': ppe_map,
+}
+
+
+# ================================================================================
+# workloads
+# ================================================================================
+
+def fetch_checked(url, timeout):
+    # load_url() returns the exception instead of raising it - a failed request must not
+    # count as a (fast) successful run
+    url, thread_name, content, exc = load_url(url, timeout)
+    if exc is not None:
+        raise exc
+    return len(content)
+
+def start_page_server():
+    pages = {f'/page/{i}': bytes([65 + i % 26]) * IO_PAGE_SIZE for i in range(IO_PAGES)}
+    return LocalHTTPServer(pages, delay=IO_DELAY, content_type='text/plain').start()
+
+def stop_page_server(server):
+    server.stop()
+
+def blur_synthetic_image(seed):
+    # deterministic noise image - the blur costs the same whatever the picture shows
+    pixels = np.random.default_rng(seed).integers(0, 256, (CPU_IMAGE_SIZE[1], CPU_IMAGE_SIZE[0], 3), dtype=np.uint8)
+    return blur_and_thumbnail(Image.fromarray(pixels)).size
+
+
+def sleep_scenario(technique):
+    run = TECHNIQUES[technique]
+    return Scenario(f'sleep/{technique}', lambda _: run(quiet_worker, [(s,) for s in SLEEP_SECS], SLEEP_WORKERS),
+                    items=len(SLEEP_SECS))
+
+def io_scenario(technique):
+    run = TECHNIQUES[technique]
+    return Scenario(f'io/{technique}',
+                    lambda server: run(fetch_checked, [(server.url(f'/page/{i}'), 10) for i in range(IO_PAGES)],
+                                       IO_WORKERS),
+                    items=IO_PAGES, setup=start_page_server, teardown=stop_page_server)
+
+def cpu_scenario(technique):
+    run = TECHNIQUES[technique]
+    return Scenario(f'cpu/{technique}', lambda _: run(blur_synthetic_image, [(i,) for i in range(CPU_IMAGES)], CPU_WORKERS),
+                    items=CPU_IMAGES)
+
+
+def all_scenarios():
+    scenarios = [sleep_scenario(t) for t in TECHNIQUES if t != 'serial']
+    scenarios += [io_scenario(t) for t in TECHNIQUES if t != 'ppe-map']
+    scenarios += [cpu_scenario(t) for t in TECHNIQUES]
+    return scenarios
@@ -0,0 +1,87 @@
+'''
+    Benchmark: tail latency of a batch of requests - plain ThreadPoolExecutor + as_completed()
+    against TaskGroup with hedging, and TaskGroup with a deadline.
+
+    The "requests" are simulated: every call takes --latency seconds, except that each call
+    has a --straggler-rate chance to hang for --straggler seconds (a slow host, a lost packet).
+    Every call is an independent draw, so a hedged duplicate of a straggler is usually fast.
+    Hedging at p95 only helps while fewer than 5% of the calls straggle - with more, the 95th
+    percentile IS the straggler time (try --straggler-rate 0.08, and hedge='p90' in the code).
+
+    $ python concurrent_futures/bench_task_group.py --tasks 200 --straggler-rate 0.02
+'''
+import argparse
+import concurrent.futures
+import random
+import statistics
+import threading
+import time
+
+from task_group import TaskGroup
+
+rng = random.Random(0)
+rng_lock = threading.Lock()
+
+
+def simulated_request(latency, straggler_rate, straggler):
+    with rng_lock:
+        slow = rng.random() < straggler_rate
+    time.sleep(straggler if slow else latency * (0.5 + rng.random()))
+    return slow
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def run_plain(args):
+    latencies = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(simulated_request, args.latency, args.straggler_rate, args.straggler): time.monotonic()
+                   for _ in range(args.tasks)}
+        for future in concurrent.futures.as_completed(futures):
+            latencies.append(time.monotonic() - futures[future])
+    return latencies, 0, 0
+
+
+def run_group(args, **group_kwargs):
+    latencies, failed = [], 0
+    group = TaskGroup(max_workers=args.workers, **group_kwargs)
+    for _ in range(args.tasks):
+        group.submit(simulated_request, args.latency, args.straggler_rate, args.straggler)
+    for result in group.as_completed():
+        latencies.append(result.seconds)
+        failed += result.exception is not None
+    group.shutdown()
+    return latencies, group.hedges_fired, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=None, help='pool size (default: tasks, plus room for hedges)')
+    parser.add_argument('--latency', type=float, default=0.05, help='typical request time (seconds)')
+    parser.add_argument('--straggler-rate', type=float, default=0.02)
+    parser.add_argument('--straggler', type=float, default=2.0, help='time a straggler hangs (seconds)')
+    parser.add_argument('--deadline', type=float, default=0.5)
+    args = parser.parse_args()
+    args.workers = args.workers or 2 * args.tasks
+
+    print(f'{args.tasks} requests of ~{args.latency}s, {args.straggler_rate:.0%} stragglers of {args.straggler}s\n')
+    print(f'{"":<26} {"batch":>7} {"p50":>7} {"p95":>7} {"p99":>7} {"hedges":>7} {"unfinished":>10}')
+    variants = {
+        'as_completed': lambda: run_plain(args),
+        'TaskGroup hedge=p95': lambda: run_group(args, hedge='p95'),
+        f'TaskGroup deadline={args.deadline}s': lambda: run_group(args, deadline=args.deadline),
+    }
+    for name, run in variants.items():
+        start = time.monotonic()
+        latencies, hedges, failed = run()
+        batch = time.monotonic() - start
+        print(f'{name:<26} {batch:>6.2f}s {statistics.median(latencies):>6.3f}s {percentile(latencies, 95):>6.3f}s '
+              f'{percentile(latencies, 99):>6.3f}s {hedges:>7} {failed:>10}')
+
+
+if __name__ == '__main__':
+    main()
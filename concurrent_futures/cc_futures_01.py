@@ -6,12 +6,21 @@ I wanted to modify the code to allow for the following:
 - pass the thread name back to the main function so we can accurately display the thread name
 - move the try-except logic to the thread function 'load_url' 
 - return (thread name, url, url contents, and exception message) values as a tuple back to main function as our future.result() per url processed
+- fetch the urls through the shared pooled session (shared/http_session.py) instead of urllib.request.urlopen()
+- run the batch in a TaskGroup (task_group.py): the whole batch has a deadline, slow requests are hedged
+  (sent a second time once they have been running for 2 seconds) and the results stream in as they finish
 '''
 
 
+from pathlib import Path
 from threading import currentThread
-import concurrent.futures
-import urllib.request
+import sys
+
+from task_group import TaskGroup
+
+# put the repo root on sys.path for the "shared" package
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from shared.http_session import get_session, transport_stats
 
 URLS = ['http://www.foxnews.com/',
         'http://www.cnn.com/',
@@ -23,21 +32,40 @@ URLS = ['http://www.foxnews.com/',
 # Retrieve a single page and report the URL and contents
 def load_url(url, timeout):
     try:
-        # if urllib.request read URL success then pass url contents (conn.rread()) as 3rd parameter and the 4th parameter is set to None
-        with urllib.request.urlopen(url, timeout=timeout) as conn:
-            return url, currentThread().getName(), conn.read(), None
+        # if the request succeeds then pass url contents (resp.content) as 3rd parameter and the 4th parameter is set to None
+        resp = get_session().get(url, timeout=timeout)
+        resp.raise_for_status()
+        return url, currentThread().getName(), resp.content, None
     except Exception as exc:
-        # if urllib.request read URL FAILED then pass exception message (exc) as the 4th parameter and set 3rd parameter to None
+        # if the request FAILED then pass exception message (exc) as the 4th parameter and set 3rd parameter to None
         return url, currentThread().getName(), None, exc
 
-# We can use a with statement to ensure threads are cleaned up promptly
-with concurrent.futures.ThreadPoolExecutor(max_workers=5, thread_name_prefix='url_thread') as executor:
-    futures = (executor.submit(load_url, url, 60) for url in URLS)
-    for future in concurrent.futures.as_completed(futures):
-        # break down the tuple to its individual parts
-        url, thread_name, data, exc = future.result()
-
-        if exc:
-            print(f'Thread Name {thread_name}: {url} generated an exception {exc}')
-        else:
-            print(f'Thread Name {thread_name}: content length of {url} = {len(data)} bytes')
+# a fixed hedge delay: with 5 urls a percentile like hedge='p95' would only be known once all 5
+# had finished - too late to hedge any of them (percentiles are for batches of hundreds of urls)
+def main(urls=URLS, deadline=15, hedge=2.0):
+    # the TaskGroup bounds the whole batch: after `deadline` seconds the unfinished urls are reported
+    # as DeadlineExceeded instead of holding up the loop, whatever their own timeout says
+    with TaskGroup(max_workers=2 * len(urls), deadline=deadline, hedge=hedge, thread_name_prefix='url_thread') as group:
+        for url in urls:
+            # no request may outlive the batch - cap its timeout with the time left
+            group.submit(load_url, url, min(60, group.remaining()), key=url)
+
+        for result in group.as_completed():
+            if result.exception:
+                # the deadline (or cancellation) of the group
+                print(f'{result.key} did not finish: {result.exception!r}')
+                continue
+            # break down the tuple to its individual parts
+            url, thread_name, data, exc = result.value
+
+            if exc:
+                print(f'Thread Name {thread_name}: {url} generated an exception {exc}')
+            else:
+                print(f'Thread Name {thread_name}: content length of {url} = {len(data)} bytes '
+                      f'({result.seconds:.2f}s{", hedged" if result.hedge_won else ""})')
+
+    print(f'\n{transport_stats() = }')
+
+# the benchmarks (benchmarks/scenarios.py) import load_url - only fetch the live URLS when run as a script
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+'''
+    TaskGroup - a ThreadPoolExecutor with an overall deadline, cancellation and hedged requests.
+
+    cc_futures_01.load_url() gives every request its own timeout, but nothing bounds the batch:
+    one slow host holds up as_completed(), and a dead domain keeps a worker busy for the whole
+    60 seconds.  A TaskGroup runs a batch of tasks on a thread pool and
+
+    - streams the results as they finish (as_completed() is a generator of TaskResults)
+    - stops at the group's deadline: tasks still pending are cancelled, tasks still running are
+      abandoned (Python threads can't be killed - cap the request timeout with remaining() so
+      they give up by themselves), and each unfinished task comes out as a TaskResult whose
+      exception is DeadlineExceeded - so the whole batch never takes longer than the deadline
+    - hedges slow tasks: when an attempt has been running longer than the hedge delay, the same
+      call is started a second time and whichever finishes first wins; the loser is cancelled
+      or ignored.  The delay is either fixed (hedge=0.5) or the 95th percentile of the latencies
+      seen so far in the group (hedge='p95'), so only about the slowest 5% get a second request.
+      Only hedge calls that are safe to repeat, like GET requests.
+
+    Example:
+        with TaskGroup(max_workers=8, deadline=10, hedge='p95') as group:
+            for url in URLS:
+                group.submit(load_url, url, min(60, group.remaining()), key=url)
+            for result in group.as_completed():
+                print(result.key, result.seconds, result.exception or len(result.value))
+'''
+from collections import deque, namedtuple
+import concurrent.futures
+import math
+import time
+
+# outcome of one task: exception is None on success; attempts counts the hedged duplicates
+TaskResult = namedtuple('TaskResult', ['key', 'value', 'exception', 'seconds', 'attempts', 'hedge_won'])
+
+
+class DeadlineExceeded(Exception):
+    '''
+    The task didn't finish before the deadline of its TaskGroup
+    '''
+
+
+class _Task:
+    __slots__ = ('key', 'fn', 'args', 'kwargs', 'submitted', 'started', 'attempts', 'futures', 'errors')
+
+    def __init__(self, key, fn, args, kwargs):
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.submitted = time.monotonic()
+        self.started = {}       # attempt number -> time it started running
+        self.attempts = 0
+        self.futures = {}       # future -> attempt number
+        self.errors = []
+
+
+class TaskGroup:
+    '''
+    max_workers        - size of the thread pool (leave room for the hedged duplicates)
+    deadline           - seconds, from the creation of the group, for the whole batch (None = no limit)
+    hedge              - None (no hedging), a delay in seconds, or 'p95' (or 'p90', 'p99' ...) to
+                         hedge after that percentile of the latencies seen so far
+    hedge_min_samples  - with a percentile: number of finished tasks needed before hedging starts
+    max_hedges         - extra attempts per task
+    '''
+    def __init__(self, max_workers=None, deadline=None, hedge=None, hedge_min_samples=5, max_hedges=1,
+                 thread_name_prefix='task'):
+        if isinstance(hedge, str):
+            if not (hedge.startswith('p') and hedge[1:].isdigit() and 0 < int(hedge[1:]) < 100):
+                raise ValueError(f"hedge must be None, seconds or a percentile like 'p95', not {hedge!r}")
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                               thread_name_prefix=thread_name_prefix)
+        self.created = time.monotonic()
+        self.deadline = None if deadline is None else self.created + deadline
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.max_hedges = max_hedges
+        self._latencies = deque(maxlen=500)     # seconds of the successful attempts
+        self._tasks = {}                        # unfinished tasks, in submit order (dict as ordered set)
+        self._owner = {}                        # future -> task
+        self._submitted = 0
+        self.hedges_fired = 0
+
+    def remaining(self):
+        '''
+        Seconds left until the deadline (math.inf without a deadline) - use it to cap a request
+        timeout, e.g. min(60, group.remaining())
+        '''
+        if self.deadline is None:
+            return math.inf
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def submit(self, fn, *args, key=None, **kwargs):
+        '''
+        Add fn(*args, **kwargs) to the group; key identifies it in the TaskResult (default: its
+        position).  Returns the key.
+        '''
+        task = _Task(self._submitted if key is None else key, fn, args, kwargs)
+        self._submitted += 1
+        self._tasks[task] = None
+        self._start_attempt(task)
+        return task.key
+
+    def _start_attempt(self, task):
+        attempt = task.attempts
+        task.attempts += 1
+
+        def run():
+            # the hedge clock starts when the attempt RUNS, not while it waits in the pool queue
+            task.started[attempt] = time.monotonic()
+            return task.fn(*task.args, **task.kwargs)
+
+        future = self._executor.submit(run)
+        task.futures[future] = attempt
+        self._owner[future] = task
+
+    def hedge_delay(self):
+        '''
+        Current hedge delay in seconds (None = no hedging yet)
+
+        For a percentile, the unfinished tasks count too: p95 is only known once 95% of all the
+        tasks seen (finished + unfinished) are done - it is the latency by which 95% of them
+        finished.  Taking the percentile of the finished ones only would let the first, fastest
+        results set the delay, and nearly every task would get hedged.  (So when more than 5% of
+        a batch hangs, p95 never becomes known and nothing is hedged - p95 IS the hang then.)
+        '''
+        if self.hedge is None:
+            return None
+        if not isinstance(self.hedge, str):
+            return self.hedge
+        finished = len(self._latencies)
+        if finished < self.hedge_min_samples:
+            return None
+        rank = math.ceil((finished + len(self._tasks)) * int(self.hedge[1:]) / 100)
+        if finished < rank:
+            return None
+        return sorted(self._latencies)[rank - 1]
+
+    def _fire_hedges(self, now, delay):
+        '''
+        Start another attempt of every task whose latest attempt has been running for `delay`
+        seconds (up to max_hedges extra attempts) - returns when the next hedge is due, or None
+        '''
+        next_due = None
+        for task in self._tasks:
+            latest = task.attempts - 1
+            if latest >= self.max_hedges or latest not in task.started:
+                continue
+            due = task.started[latest] + delay
+            if now >= due:
+                self._start_attempt(task)
+                self.hedges_fired += 1
+            elif next_due is None or due < next_due:
+                next_due = due
+        return next_due
+
+    def _finish(self, task, value=None, exception=None, attempt=0):
+        for future in task.futures:
+            future.cancel()
+            self._owner.pop(future, None)
+        del self._tasks[task]
+        return TaskResult(task.key, value, exception, time.monotonic() - task.submitted, task.attempts, attempt > 0)
+
+    def as_completed(self):
+        '''
+        Generator of TaskResults in the order the tasks finish, ending at the deadline at the latest
+        '''
+        while self._tasks:
+            now = time.monotonic()
+            if self.deadline is not None and now >= self.deadline:
+                yield from self.cancel()
+                return
+
+            delay = self.hedge_delay()
+            wake_up = [self.deadline] if self.deadline is not None else []
+            if delay is not None:
+                next_hedge = self._fire_hedges(now, delay)
+                if next_hedge is not None:
+                    wake_up.append(next_hedge)
+            elif self.hedge is not None:
+                # not enough latencies for the percentile yet - check back now and then
+                wake_up.append(now + 0.05)
+            timeout = max(min(wake_up) - now, 0) if wake_up else None
+
+            done, _ = concurrent.futures.wait(list(self._owner), timeout=timeout,
+                                              return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                task = self._owner.pop(future, None)
+                if task is None or future.cancelled():
+                    continue
+                attempt = task.futures[future]
+                exception = future.exception()
+                if exception is None:
+                    self._latencies.append(time.monotonic() - task.started.get(attempt, task.submitted))
+                    yield self._finish(task, future.result(), None, attempt)
+                elif any(f in self._owner for f in task.futures):
+                    # another attempt of this task is still running - it may still succeed
+                    task.errors.append(exception)
+                else:
+                    yield self._finish(task, None, exception, attempt)
+
+    def cancel(self):
+        '''
+        Cancel every unfinished task - returns their TaskResults, with exception DeadlineExceeded
+        once the deadline has passed, concurrent.futures.CancelledError before that
+        '''
+        past_deadline = self.deadline is not None and time.monotonic() >= self.deadline
+        results = []
+        for task in list(self._tasks):
+            if past_deadline:
+                exception = DeadlineExceeded(f'{task.key} did not finish before the deadline')
+            else:
+                exception = concurrent.futures.CancelledError(f'{task.key} was cancelled')
+            results.append(self._finish(task, None, exception))
+        return results
+
+    def shutdown(self):
+        # don't wait for abandoned attempts - they finish (or time out) on their own
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cancel()
+        self.shutdown()
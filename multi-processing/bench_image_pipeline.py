@@ -0,0 +1,54 @@
+'''
+    Benchmark: "blur then thumbnail" (the order mp_pool_executor.process_image uses) against
+    "thumbnail then blur with a scaled radius" (image_pipeline's downscale_first=True).
+
+    Both runs go through image_pipeline.blur_images() on the images of orig_images/ (the names
+    of mp_pool_executor.img_names that exist - missing ones show up as per-file failures),
+    repeated --rounds times.  The two sets of thumbnails are compared pixel by pixel: mean and
+    max absolute difference per channel (0-255).
+
+    $ python multi-processing/bench_image_pipeline.py --rounds 2
+'''
+import argparse
+from pathlib import Path
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+from image_pipeline import blur_images, format_report
+from mp_pool_executor import img_names, source
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=1, help='process the image list this many times')
+    parser.add_argument('--chunksize', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    names = img_names * args.rounds
+
+    with tempfile.TemporaryDirectory() as tmp:
+        blur_first_dir, downscale_first_dir = Path(tmp, 'blur_first'), Path(tmp, 'downscale_first')
+        reports = {}
+        for label, destination, downscale_first in (('blur, then thumbnail', blur_first_dir, False),
+                                                    ('thumbnail, then blur', downscale_first_dir, True)):
+            reports[label] = blur_images(names, source, destination, downscale_first=downscale_first,
+                                         chunksize=args.chunksize, max_workers=args.workers)
+            print(f'{label}:\n{format_report(reports[label])}\n')
+
+        diffs = []
+        for img_name in sorted({r.img_name for r in reports['thumbnail, then blur']['results'] if r.ok}):
+            with Image.open(blur_first_dir / img_name) as a, Image.open(downscale_first_dir / img_name) as b:
+                diffs.append(np.abs(np.asarray(a, dtype=np.int16) - np.asarray(b, dtype=np.int16)))
+        if diffs:
+            print(f'pixel difference: mean {np.mean([d.mean() for d in diffs]):.2f}, '
+                  f'max {max(d.max() for d in diffs)} (0-255)')
+
+    slow, fast = (r['seconds'] for r in reports.values())
+    print(f'speedup of downscale_first: {slow / fast:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+'''
+    Benchmark: numpy_blur.blur_stack() against the per-image PIL GaussianBlur loop.  The numpy
+    engine is an experiment - PIL is the faster one and stays the default (see numpy_blur.py).
+
+    The sample set is the 15 images of mp_pool_executor.img_names.  The images that exist in
+    orig_images/ are resized to one common --size (a stack needs same-size images) and reused
+    until there are 15 of them.  Every method blurs the whole set with --radius; the accuracy
+    columns compare each method's output with PIL's (mean / max absolute difference, 0-255).
+
+    $ python multi-processing/bench_numpy_blur.py --radius 15 --size 1200x800
+'''
+import argparse
+from pathlib import Path
+import time
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from mp_pool_executor import img_names, source
+from numpy_blur import blur_stack, stack_images
+
+
+def load_sample_set(size):
+    images = []
+    for img_name in img_names:
+        if Path(source, img_name).exists():
+            with Image.open(Path(source, img_name)) as img:
+                images.append(img.convert('RGB').resize(size))
+    return [images[i % len(images)] for i in range(len(img_names))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--radius', type=float, default=15)
+    parser.add_argument('--size', default='1200x800', help='WIDTHxHEIGHT of the stacked images')
+    parser.add_argument('--repeat', type=int, default=3, help='best of N runs')
+    args = parser.parse_args()
+
+    size = tuple(int(n) for n in args.size.split('x'))
+    images = load_sample_set(size)
+    stack = stack_images(images)
+    print(f'{len(images)} images of {size[0]}x{size[1]}, radius {args.radius}\n')
+
+    def pil_loop():
+        return stack_images([img.filter(ImageFilter.GaussianBlur(args.radius)) for img in images])
+
+    methods = {
+        'PIL, per image': pil_loop,
+        'numpy box float32': lambda: blur_stack(stack, args.radius, method='box'),
+        'numpy box float64': lambda: blur_stack(stack, args.radius, method='box', dtype=np.float64),
+        'numpy gaussian float32': lambda: blur_stack(stack, args.radius, method='gaussian'),
+    }
+
+    reference = None
+    print(f'{"method":<24} {"seconds":>8} {"vs PIL":>7} {"mean diff":>10} {"max diff":>9}')
+    for name, run in methods.items():
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        if reference is None:
+            reference, baseline = result, best
+        diff = np.abs(result.astype(np.int16) - reference.astype(np.int16))
+        print(f'{name:<24} {best:>8.3f} {baseline / best:>6.2f}x {diff.mean():>10.3f} {diff.max():>9}')
+
+
+if __name__ == '__main__':
+    main()
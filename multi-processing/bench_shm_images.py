@@ -0,0 +1,76 @@
+'''
+    Benchmark: sending decoded images to worker processes by pickling vs. shared memory.
+
+    The images of orig_images/ are decoded once in the parent process (--copies times each),
+    then the filter chain "blur, thumbnail" runs on a ProcessPoolExecutor:
+
+    - pickled: the numpy array is an argument of the task and the result array is returned,
+               so every pixel is pickled to the worker and the thumbnail pickled back
+    - shared:  shm_images.SharedImageBatch - the workers get a block name and a shape only
+
+    The cost of copying the images into the shared blocks is timed separately ("setup").
+    Both ways must produce identical thumbnails.
+
+    $ python multi-processing/bench_shm_images.py --copies 2
+'''
+import argparse
+from functools import partial
+from pathlib import Path
+import concurrent.futures
+import time
+
+import numpy as np
+from PIL import Image
+
+from mp_pool_executor import img_names, source
+from shm_images import SharedImageBatch, gaussian_blur, thumbnail
+
+
+def apply_chain_pickled(arr, chain):
+    for image_filter in chain:
+        arr = image_filter(arr)
+    return arr
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--copies', type=int, default=1, help='use every image this many times')
+    parser.add_argument('--radius', type=float, default=15)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    arrays = [np.asarray(Image.open(Path(source) / img_name).convert('RGB'))
+              for img_name in img_names if Path(source, img_name).exists()] * args.copies
+    print(f'{len(arrays)} images, {sum(a.nbytes for a in arrays) / 1e6:.0f} MB decoded\n')
+    chain = [partial(gaussian_blur, radius=args.radius), partial(thumbnail, size=(1200, 1200))]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+        # start the workers before timing anything
+        list(executor.map(int, range(executor._max_workers)))
+
+        start = time.perf_counter()
+        pickled = list(executor.map(apply_chain_pickled, arrays, [chain] * len(arrays)))
+        pickled_time = time.perf_counter() - start
+
+        with SharedImageBatch() as batch:
+            start = time.perf_counter()
+            for arr in arrays:
+                batch.add(arr)
+            setup_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            batch.run(chain, executor=executor)
+            shared_time = time.perf_counter() - start
+
+            assert not batch.errors, batch.errors
+            assert all(np.array_equal(batch.array(i), result) for i, result in enumerate(pickled))
+
+    print(f'{"pickled":<16}: {pickled_time:7.3f} s')
+    print(f'{"shared (setup)":<16}: {setup_time:7.3f} s')
+    print(f'{"shared (run)":<16}: {shared_time:7.3f} s')
+    print(f'{"speedup":<16}: {pickled_time / shared_time:7.2f}x run, '
+          f'{pickled_time / (shared_time + setup_time):.2f}x including setup')
+
+
+if __name__ == '__main__':
+    main()
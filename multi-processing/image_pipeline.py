@@ -0,0 +1,170 @@
+'''
+    Batch image pipeline: blur + thumbnail a whole folder of images on a ProcessPoolExecutor.
+
+    mp_pool_executor.py shows the bare ProcessPoolExecutor calls - one image per task, nothing
+    comes back from the workers (so an exception in a worker is silently lost) and every image
+    is blurred at full resolution before it is shrunk to a thumbnail.  This module is the
+    "production" version of the same job:
+
+    - the images are sent to the workers in chunks of `chunksize` names, with only a few chunks
+      in flight at a time, so a folder of thousands of photos doesn't create thousands of futures
+    - every image gives back an ImageResult - ok or the error of that one file - as soon as its
+      chunk is done (iter_blur_images() is a generator), a failing file never stops the batch
+    - blur_images() collects the results into a report: images, failures, seconds, images/s, MB/s
+    - every output is written to a temporary file and renamed into place (atomic_save()), so a
+      crash or a kill never leaves a half-written JPEG behind
+
+    downscale_first=True (opt-in) makes the thumbnail FIRST and blurs the small image with the
+    radius scaled by the same factor.  Blurring a 6000x4000 photo with radius 15 and then
+    throwing away 97% of its pixels is most of the work; the downscaled version looks the same
+    (see bench_image_pipeline.py) and is many times faster - JPEG files are even decoded at a
+    reduced size straight away (PIL's draft mode, used by Image.thumbnail()).
+
+    Example:
+        report = blur_images(img_names, source, destination, downscale_first=True)
+        print(format_report(report))
+'''
+from collections import namedtuple
+import concurrent.futures
+import os
+from pathlib import Path
+import time
+
+from PIL import Image, ImageFilter
+
+BLUR_RADIUS = 15
+THUMBNAIL_SIZE = (1200, 1200)
+CHUNKSIZE = 4
+
+# outcome of one image: error is None when ok, else "ExceptionName: message"
+ImageResult = namedtuple('ImageResult', ['img_name', 'ok', 'seconds', 'bytes_in', 'size', 'error'])
+
+
+def blur_and_thumbnail(img, radius=BLUR_RADIUS, size=THUMBNAIL_SIZE, downscale_first=False):
+    '''
+    Return the blurred thumbnail of a PIL image
+
+    downscale_first=False - blur the full image with `radius`, then shrink it (the original order)
+    downscale_first=True  - shrink first, then blur with radius * (thumbnail width / original width)
+    '''
+    if downscale_first:
+        orig_width = img.width
+        img.thumbnail(size)
+        return img.filter(ImageFilter.GaussianBlur(radius * img.width / orig_width))
+
+    img = img.filter(ImageFilter.GaussianBlur(radius))
+    img.thumbnail(size)
+    return img
+
+
+def atomic_save(img, dest_file):
+    '''
+    Save a PIL image to dest_file through a temporary file in the same folder + os.replace(),
+    so dest_file is either the old file or the complete new one, never half of it
+    '''
+    dest_file = Path(dest_file)
+    tmp_file = dest_file.with_name(f'.{dest_file.name}.{os.getpid()}.tmp')
+    # the format comes from the real extension - PIL can't guess it from ".tmp"
+    img_format = Image.registered_extensions().get(dest_file.suffix.lower())
+    try:
+        img.save(tmp_file, format=img_format)
+        os.replace(tmp_file, dest_file)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+
+
+def process_image_file(img_name, source, destination, radius=BLUR_RADIUS, size=THUMBNAIL_SIZE,
+                       downscale_first=False):
+    '''
+    Blur + thumbnail source/img_name into destination/img_name - never raises, the error of a
+    bad file is returned in the ImageResult
+    '''
+    start = time.perf_counter()
+    source_file = Path(source) / img_name
+    try:
+        bytes_in = source_file.stat().st_size
+        with Image.open(source_file) as img:
+            thumb = blur_and_thumbnail(img, radius, size, downscale_first)
+        atomic_save(thumb, Path(destination) / img_name)
+    except Exception as e:
+        return ImageResult(img_name, False, time.perf_counter() - start, 0, None, f'{type(e).__name__}: {e}')
+    return ImageResult(img_name, True, time.perf_counter() - start, bytes_in, thumb.size, None)
+
+
+def process_image_chunk(img_names, source, destination, radius=BLUR_RADIUS, size=THUMBNAIL_SIZE,
+                        downscale_first=False):
+    # one task = one chunk of images, so the per-task overhead is paid once per chunk
+    return [process_image_file(img_name, source, destination, radius, size, downscale_first)
+            for img_name in img_names]
+
+
+def chunked(items, chunksize):
+    for i in range(0, len(items), chunksize):
+        yield items[i:i + chunksize]
+
+
+def iter_blur_images(img_names, source, destination, radius=BLUR_RADIUS, size=THUMBNAIL_SIZE,
+                     downscale_first=False, chunksize=CHUNKSIZE, executor=None, max_workers=None):
+    '''
+    Generator of ImageResults, in the order the chunks finish
+
+    executor - a ProcessPoolExecutor (or any concurrent.futures executor) to run on; a new
+               ProcessPoolExecutor(max_workers) is created and shut down when not given
+    '''
+    Path(destination).mkdir(parents=True, exist_ok=True)
+    own_executor = executor is None
+    if own_executor:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+    # enough chunks in flight to keep every worker busy, but not the whole folder at once
+    workers = getattr(executor, '_max_workers', None) or max_workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+
+    try:
+        in_flight = set()
+        for chunk in chunked(list(img_names), chunksize):
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+            in_flight.add(executor.submit(process_image_chunk, chunk, source, destination, radius, size,
+                                          downscale_first))
+        for future in concurrent.futures.as_completed(in_flight):
+            yield from future.result()
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def blur_images(img_names, source, destination, on_result=None, **kwargs):
+    '''
+    Run iter_blur_images() to the end and return the report dict - on_result(ImageResult) is
+    called for every image as it comes back
+    '''
+    start = time.perf_counter()
+    results = []
+    for result in iter_blur_images(img_names, source, destination, **kwargs):
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+    elapsed = time.perf_counter() - start
+
+    ok = [r for r in results if r.ok]
+    megabytes = sum(r.bytes_in for r in ok) / 1e6
+    return {
+        'images': len(results),
+        'ok': len(ok),
+        'failed': {r.img_name: r.error for r in results if not r.ok},
+        'seconds': round(elapsed, 3),
+        'images_per_second': round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        'mb_per_second': round(megabytes / elapsed, 2) if elapsed else 0.0,
+        'results': results,
+    }
+
+
+def format_report(report):
+    lines = [f"{report['ok']}/{report['images']} images in {report['seconds']} seconds "
+             f"({report['images_per_second']} images/s, {report['mb_per_second']} MB/s of source files)"]
+    for img_name, error in report['failed'].items():
+        lines.append(f'  FAILED {img_name}: {error}')
+    return '\n'.join(lines)
@@ -0,0 +1,171 @@
+'''
+    Incremental rebuild of the blurred_images folder - only process what changed.
+
+    Every run of mp_pool_executor.py used to blur every image again.  incremental_build()
+    keeps a manifest (blurred_images/.manifest.json) of what each output was built from:
+
+        "photo-1.jpg": {"sha256": <content hash of the source file>, "size": ..., "mtime_ns": ...,
+                        "params": <hash of radius, thumbnail size, downscale_first>}
+
+    and on the next run
+    - builds only the sources that are new, whose content changed or whose output is missing,
+      plus everything when the processing parameters changed
+    - deletes the outputs (and manifest entries) of sources that are gone
+    - skips the rest - on a folder of thousands of unchanged photos a rerun does close to no work
+
+    Hashing thousands of large photos is itself expensive, so a file whose size and mtime match
+    the manifest keeps its recorded hash; only files that look touched are hashed again.
+
+    The outputs are written atomically (image_pipeline.atomic_save), and so is the manifest, which
+    only ever lists outputs that were completely written - a crash at any point leaves at most
+    some unrecorded outputs, which the next run simply builds again.  Failed images are reported
+    and not recorded, so they are retried next time.
+'''
+import hashlib
+import json
+import os
+from pathlib import Path
+import time
+
+from image_pipeline import BLUR_RADIUS, THUMBNAIL_SIZE, iter_blur_images
+
+MANIFEST_NAME = '.manifest.json'
+MANIFEST_VERSION = 1
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png')
+
+
+def file_sha256(fname, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(fname, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def params_hash(**params):
+    '''
+    Short hash of the processing parameters - any change makes every output out of date
+    '''
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def load_manifest(destination):
+    try:
+        with open(Path(destination) / MANIFEST_NAME) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        # no manifest yet, or an unreadable one - start from scratch
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('entries', {})
+
+
+def save_manifest(destination, entries):
+    '''
+    Write the manifest through a temporary file + os.replace(), like the images
+    '''
+    manifest_file = Path(destination) / MANIFEST_NAME
+    tmp_file = manifest_file.with_name(f'{MANIFEST_NAME}.{os.getpid()}.tmp')
+    with open(tmp_file, 'w') as f:
+        json.dump({'version': MANIFEST_VERSION, 'entries': entries}, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, manifest_file)
+
+
+def scan_sources(source, entries, suffixes=IMAGE_SUFFIXES):
+    '''
+    {img_name: {"sha256", "size", "mtime_ns"}} of the images in source - the hash is reused from
+    the manifest entries when size and mtime are unchanged
+    '''
+    sources = {}
+    for path in sorted(Path(source).iterdir()):
+        if path.suffix.lower() not in suffixes or not path.is_file():
+            continue
+        stat = path.stat()
+        entry = entries.get(path.name)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            sha256 = entry['sha256']
+        else:
+            sha256 = file_sha256(path)
+        sources[path.name] = {'sha256': sha256, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    return sources
+
+
+def plan_build(sources, entries, destination, params):
+    '''
+    Return (to_build, stale): the image names to process, and the manifest entries whose
+    source no longer exists
+    '''
+    to_build = []
+    for img_name, info in sources.items():
+        entry = entries.get(img_name)
+        if (entry is None or entry['sha256'] != info['sha256'] or entry['params'] != params
+                or not (Path(destination) / img_name).exists()):
+            to_build.append(img_name)
+    stale = [img_name for img_name in entries if img_name not in sources]
+    return to_build, stale
+
+
+def remove_leftover_temp_files(destination):
+    # temporary files of a run that was killed before it could rename them
+    for tmp_file in Path(destination).glob('.*.tmp'):
+        tmp_file.unlink(missing_ok=True)
+
+
+def incremental_build(source, destination, radius=BLUR_RADIUS, size=THUMBNAIL_SIZE, downscale_first=False,
+                      on_result=None, **pipeline_kwargs):
+    '''
+    Bring destination up to date with source, return a report dict:
+        sources, built, skipped, removed, failed ({img_name: error}), seconds
+
+    on_result(ImageResult) is called for every processed image; pipeline_kwargs (chunksize,
+    executor, max_workers) are passed on to image_pipeline.iter_blur_images()
+    '''
+    start = time.perf_counter()
+    destination = Path(destination)
+    destination.mkdir(parents=True, exist_ok=True)
+    remove_leftover_temp_files(destination)
+
+    params = params_hash(radius=radius, size=list(size), downscale_first=downscale_first)
+    entries = load_manifest(destination)
+    sources = scan_sources(source, entries)
+    to_build, stale = plan_build(sources, entries, destination, params)
+
+    for img_name in stale:
+        (destination / img_name).unlink(missing_ok=True)
+        del entries[img_name]
+
+    built, failed = 0, {}
+    try:
+        for result in iter_blur_images(to_build, source, destination, radius=radius, size=size,
+                                       downscale_first=downscale_first, **pipeline_kwargs):
+            if result.ok:
+                entries[result.img_name] = {**sources[result.img_name], 'params': params}
+                built += 1
+            else:
+                # not recorded - the next run tries it again
+                entries.pop(result.img_name, None)
+                failed[result.img_name] = result.error
+            if on_result is not None:
+                on_result(result)
+    finally:
+        # also on Ctrl-C: whatever was built so far is not built again
+        save_manifest(destination, entries)
+
+    return {
+        'sources': len(sources),
+        'built': built,
+        'skipped': len(sources) - len(to_build),
+        'removed': len(stale),
+        'failed': failed,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def format_build_report(report):
+    lines = [f"{report['sources']} source images: {report['built']} built, {report['skipped']} up to date, "
+             f"{report['removed']} stale outputs removed, {len(report['failed'])} failed "
+             f"({report['seconds']} seconds)"]
+    for img_name, error in report['failed'].items():
+        lines.append(f'  FAILED {img_name}: {error}')
+    return '\n'.join(lines)
@@ -6,11 +6,30 @@
     - function "concurrent_futures_process_pool_submit()" uses  'executor.submit()'
     - function "concurrent_futures_process_pool_map()")   uses  'executor.map()'  - the preferred way
 
-    Run this module - it will create a 'blurred_image' folder, apply Gaussian blur to each
-    of the 15 images and save them into the "blurred_images" folder with the same name.  The blurring process
-    is executed twice - once by 'concurrent_futures_process_pool_submit()' and another by 
-    'concurrent_futures_process_pool_map()' function. Total execution time for both functions is almost 
-    identical (total runtime of just ~3 seconds when running it on Mac 2020 with os.cpu_count of 12).
+    and "concurrent_futures_process_pool_adaptive()" lets shared.adaptive_executor.AdaptiveExecutor
+    pick the number of worker processes instead of defaulting to os.cpu_count().
+
+    "image_pipeline_blur()" runs the same job through image_pipeline.py - chunked submission,
+    a result (or the error) for every image and a throughput report, with an opt-in
+    "thumbnail first, then blur" mode that skips blurring pixels the thumbnail throws away.
+
+    "shared_memory_blur()" keeps the decoded images in shared memory (shm_images.py), so the
+    worker processes blur and shrink them in place - no pixel is pickled between processes.
+
+    Run this module - it creates the "blurred_images" folder and does an INCREMENTAL build
+    ("incremental_blur()", see incremental_build.py): the first run applies Gaussian blur to each
+    of the 15 images in "orig_images" and saves them into "blurred_images" with the same name,
+    and records what each output was built from in blurred_images/.manifest.json.  A rerun only
+    blurs the images that are new or changed (or all of them when the blur radius / thumbnail
+    size changed), removes the outputs of deleted images and skips the rest, so with nothing
+    changed it does close to no work.  The build report says how many images were built,
+    skipped, removed or failed.
+
+    To run all the demo functions above instead (each of them re-blurs every image - the submit()
+    and map() versions take almost the same time, ~3 seconds for the 15 images on a Mac 2020 with
+    os.cpu_count of 12):
+
+        $ python mp_pool_executor.py --demos
 
 
     Miscellaneous:
@@ -24,11 +43,21 @@
 
 '''
 import concurrent.futures
+from functools import partial
 from pathlib import Path
+import sys
 import time
 
 from PIL import Image, ImageFilter
 
+from image_pipeline import blur_images, format_report
+from incremental_build import format_build_report, incremental_build
+from shm_images import SharedImageBatch, gaussian_blur, thumbnail
+
+# put the repo root on sys.path for the "shared" package
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from shared.adaptive_executor import AdaptiveExecutor
+
 img_names = [
     'photo-1516117172878-fd2c41f4a759.jpg',
     'photo-1532009324734-20a7a5813719.jpg',
@@ -113,9 +142,88 @@ def concurrent_futures_process_pool_map():
     t2 = time.perf_counter()
     print(f'concurrent futures using ProcessPoolExecutor - Finished in {t2-t1} seconds')
 
+
+@funcname
+def concurrent_futures_process_pool_adaptive(rounds=5, policy='hill_climb'):
+    """
+        This function lets AdaptiveExecutor choose the number of worker processes: it measures
+        how many images per second come out, and grows or shrinks the number of processes
+        allowed to run (at most os.cpu_count()).  Blurring is CPU bound, so the throughput
+        stops growing once every core is busy and the executor settles around the core count.
+
+        The images are blurred `rounds` times over to give the executor a few measurement windows.
+    """
+    t1 = time.perf_counter()
+    images = [img for img in img_names if Path(source/img).exists()] * rounds
+
+    with AdaptiveExecutor('process', policy=policy, interval=0.25) as executor:
+        futures = [executor.submit(process_image, img) for img in images]
+    failed = sum(f.exception() is not None for f in futures)
+
+    t2 = time.perf_counter()
+    print(f'{len(images) - failed} images blurred, {failed} failed')
+    print(f'chosen concurrency: {executor.concurrency}, best measured: {executor.best_concurrency()}')
+    print(f'throughput curve (processes: images per second): {executor.throughput_curve()}')
+    print(f'AdaptiveExecutor - Finished in {t2-t1} seconds')
+
+@funcname
+def image_pipeline_blur(downscale_first=False):
+    """
+        This function uses image_pipeline.blur_images(): the image names go to the workers in
+        chunks, each image comes back as an ImageResult (so a missing or broken file is reported
+        instead of silently lost) and the report shows the throughput.
+
+        downscale_first=True makes the thumbnail first and blurs it with the radius scaled down
+        by the same factor - nearly the same picture, several times faster on large photos.
+    """
+    report = blur_images(img_names, source, destination, radius=15, size=size, downscale_first=downscale_first)
+    print(format_report(report))
+
+@funcname
+def shared_memory_blur():
+    """
+        This function decodes the images once in this process and puts them in shared memory
+        blocks (shm_images.SharedImageBatch).  The worker processes get only the block names,
+        run the blur + thumbnail chain on numpy views of the blocks and write the thumbnails back
+        into the same blocks - nothing but names and shapes is pickled.
+    """
+    t1 = time.perf_counter()
+    names = [img for img in img_names if Path(source/img).exists()]
+
+    with SharedImageBatch() as batch:
+        for img in names:
+            with Image.open(source/img) as image:
+                batch.add(image)
+        batch.run([partial(gaussian_blur, radius=15), partial(thumbnail, size=size)])
+
+        for indx, img in enumerate(names):
+            if indx in batch.errors:
+                print(f'{img} failed - {batch.errors[indx]}')
+            else:
+                batch.image(indx).save(f'{destination}/{img}')
+
+    t2 = time.perf_counter()
+    print(f'shared memory ProcessPoolExecutor - {len(names)} images finished in {t2-t1} seconds')
+
+@funcname
+def incremental_blur():
+    """
+        This function brings the "blurred_images" folder up to date with "orig_images": the
+        manifest in blurred_images/.manifest.json records the content hash of every source and
+        the blur radius / thumbnail size it was built with, so a rerun only blurs what changed.
+    """
+    report = incremental_build(source, destination, radius=15, size=size)
+    print(format_build_report(report))
+
 if __name__ == '__main__':
 
     create_destination_folder()
-    
-    concurrent_futures_process_pool_submit()
-    concurrent_futures_process_pool_map()
+
+    if '--demos' in sys.argv:
+        concurrent_futures_process_pool_submit()
+        concurrent_futures_process_pool_map()
+        concurrent_futures_process_pool_adaptive()
+        image_pipeline_blur(downscale_first=True)
+        shared_memory_blur()
+    else:
+        incremental_blur()
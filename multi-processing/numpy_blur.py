@@ -0,0 +1,192 @@
+'''
+    NumPy blur engine (EXPERIMENT) - blur a whole STACK of same-size images in one vectorized call.
+
+    This is NOT a faster blur: PIL's ImageFilter.GaussianBlur stays the engine of every pipeline
+    in this folder (mp_pool_executor.py, image_pipeline.py, shm_images.py), and nothing uses this
+    module by default.  bench_numpy_blur.py, 15 images of 1200x800, radius 15, single core:
+
+        PIL, per image          0.77 s   1.00x
+        numpy box float32       1.94 s   0.40x   (max diff from PIL 2)
+        numpy box float64       3.51 s   0.22x
+        numpy gaussian float32 10.34 s   0.07x   (max diff from PIL 20)
+
+    It is kept as an experiment in vectorizing an image filter with numpy.
+
+    PIL's ImageFilter.GaussianBlur works on one image at a time, always in 8 bit and always
+    with the same algorithm.  Here the images are one numpy array of shape (N, H, W) or
+    (N, H, W, C) and the blur is separable - a 1-D pass down the rows, then a 1-D pass along
+    the columns, for every image and channel at once.  Two algorithms:
+
+    'gaussian' - convolution with a precomputed, normalized Gaussian kernel (sigma = radius,
+                 truncated at `truncate` sigmas).  Exact, but the work grows with the radius:
+                 2 * truncate * radius + 1 multiply-adds per pixel and pass.
+    'box'      - three box blurs approximating the Gaussian (the same trick PIL uses), each
+                 computed from a running sum (cumsum), so the cost does NOT grow with the radius.
+    'auto'     - 'gaussian' for small radii, 'box' from BOX_MIN_RADIUS on.
+
+    dtype picks the precision / speed trade-off of the arithmetic: float32 (default) or float64.
+    Edges are handled like PIL: the edge pixels are repeated.
+
+    Why it is slower: numpy makes a full pass over the stack for every step, while PIL's C loop
+    blurs one cache-friendly row at a time.  What it offers that PIL doesn't: one call for a
+    whole stack, float precision, a choice of exact vs. approximate blur, and arrays that are
+    already in numpy (e.g. the shared memory blocks of shm_images.py).
+
+    compare_with_pil() measures how far the result is from PIL's own GaussianBlur; see
+    bench_numpy_blur.py for the speed comparison against the per-image PIL loop.
+
+    Example:
+        stack = stack_images([Image.open(f) for f in files])    # all the same size
+        blurred = blur_stack(stack, radius=15)                   # uint8, same shape
+'''
+from functools import lru_cache
+import math
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+METHODS = ('auto', 'gaussian', 'box')
+BOX_MIN_RADIUS = 3
+
+
+@lru_cache(maxsize=64)
+def gaussian_kernel(sigma, truncate=3.0):
+    '''
+    Normalized 1-D Gaussian kernel with standard deviation sigma (float64, read-only)
+    '''
+    half = max(int(math.ceil(truncate * sigma)), 1)
+    x = np.arange(-half, half + 1, dtype=np.float64)
+    kernel = np.exp(-0.5 * (x / sigma) ** 2)
+    kernel /= kernel.sum()
+    kernel.setflags(write=False)
+    return kernel
+
+
+def box_sizes(sigma, passes=3):
+    '''
+    Widths (odd) of `passes` box blurs that together approximate a Gaussian of std. dev. sigma
+    '''
+    ideal = math.sqrt(12 * sigma * sigma / passes + 1)
+    lower = int(ideal)
+    if lower % 2 == 0:
+        lower -= 1
+    upper = lower + 2
+    # number of passes that use the lower width, so the variances add up to sigma^2
+    m = round((12 * sigma * sigma - passes * lower * lower - 4 * passes * lower - 3 * passes) / (-4 * lower - 4))
+    return [lower if i < m else upper for i in range(passes)]
+
+
+def _axis_slice(ndim, axis, start, stop):
+    index = [slice(None)] * ndim
+    index[axis] = slice(start, stop)
+    return tuple(index)
+
+
+def _pad_edge(arr, axis, before, after):
+    pad = [(0, 0)] * arr.ndim
+    pad[axis] = (before, after)
+    return np.pad(arr, pad, mode='edge')
+
+
+def convolve_axis(arr, kernel, axis):
+    '''
+    Convolve a float array with a symmetric 1-D kernel along one axis
+    '''
+    n = arr.shape[axis]
+    half = len(kernel) // 2
+    padded = _pad_edge(arr, axis, half, half)
+    out = padded[_axis_slice(arr.ndim, axis, half, half + n)] * kernel[half]
+    tmp = np.empty_like(out)
+    # the kernel is symmetric: add the two mirrored taps first, then multiply once
+    for k in range(half):
+        np.add(padded[_axis_slice(arr.ndim, axis, k, k + n)],
+               padded[_axis_slice(arr.ndim, axis, 2 * half - k, 2 * half - k + n)], out=tmp)
+        tmp *= kernel[k]
+        out += tmp
+    return out
+
+
+def box_blur_axis(arr, width, axis):
+    '''
+    Box blur (mean of `width` neighbours, width odd) along one axis using a running sum -
+    window i is csum[i + half] - csum[i - half - 1]; only the `half` windows at each edge, which
+    reach past the image, need the repeated edge pixel added separately
+    '''
+    n = arr.shape[axis]
+    half = width // 2
+    at = lambda start, stop: _axis_slice(arr.ndim, axis, start, stop)
+    if n <= 2 * half + 1:
+        # image narrower than the box - not worth a special case, pad it
+        return box_blur_axis(_pad_edge(arr, axis, width, width), width, axis)[at(width, width + n)]
+
+    csum = np.cumsum(arr, axis=axis)
+    out = np.empty_like(arr)
+    np.subtract(csum[at(2 * half + 1, n)], csum[at(0, n - 2 * half - 1)], out=out[at(half + 1, n - half)])
+
+    first, last = arr[at(0, 1)], arr[at(n - 1, n)]
+    for i in [*range(half + 1), *range(n - half, n)]:
+        lo, hi = i - half, min(i + half, n - 1)
+        window = csum[at(hi, hi + 1)].copy()
+        if lo > 0:
+            window -= csum[at(lo - 1, lo)]
+        else:
+            window += -lo * first
+        window += (i + half - hi) * last
+        out[at(i, i + 1)] = window
+    out /= width
+    return out
+
+
+def blur_stack(stack, radius, method='auto', dtype=np.float32, truncate=3.0):
+    '''
+    Blur every image of a uint8 stack (N, H, W) or (N, H, W, C) - returns a uint8 stack of the
+    same shape.  radius is the standard deviation of the Gaussian, like PIL's GaussianBlur.
+    '''
+    if method not in METHODS:
+        raise ValueError(f'method must be one of {METHODS}, not {method!r}')
+    stack = np.asarray(stack)
+    if stack.ndim not in (3, 4):
+        raise ValueError(f'expected a stack of shape (N, H, W) or (N, H, W, C), got {stack.shape}')
+    if radius <= 0:
+        return stack.copy()
+    if method == 'auto':
+        method = 'gaussian' if radius < BOX_MIN_RADIUS else 'box'
+
+    out = stack.astype(dtype)
+    for axis in (1, 2):     # rows, then columns
+        if method == 'gaussian':
+            out = convolve_axis(out, gaussian_kernel(float(radius), truncate).astype(dtype), axis)
+        else:
+            for width in box_sizes(radius):
+                out = box_blur_axis(out, width, axis)
+
+    np.rint(out, out=out)
+    return np.clip(out, 0, 255).astype(np.uint8)
+
+
+def stack_images(images):
+    '''
+    One (N, H, W[, C]) uint8 array from a list of same-size PIL images or arrays
+    '''
+    arrays = [np.asarray(img) for img in images]
+    if len({a.shape for a in arrays}) > 1:
+        raise ValueError('all the images of a stack must have the same size and mode')
+    return np.stack(arrays)
+
+
+def blur_image(img, radius, **kwargs):
+    '''
+    Drop-in for img.filter(ImageFilter.GaussianBlur(radius)) on a single PIL image
+    '''
+    return Image.fromarray(blur_stack(np.asarray(img)[np.newaxis], radius, **kwargs)[0])
+
+
+def compare_with_pil(img, radius, **kwargs):
+    '''
+    Blur a PIL image with PIL and with blur_stack(), return the mean and max absolute pixel
+    difference (0-255)
+    '''
+    ours = np.asarray(blur_image(img, radius, **kwargs), dtype=np.int16)
+    pil = np.asarray(img.filter(ImageFilter.GaussianBlur(radius)), dtype=np.int16)
+    diff = np.abs(ours - pil)
+    return {'mean_abs_diff': round(float(diff.mean()), 3), 'max_abs_diff': int(diff.max())}
@@ -0,0 +1,175 @@
+'''
+    Zero-copy image transfer between worker processes with multiprocessing.shared_memory.
+
+    Anything passed to (or returned from) a ProcessPoolExecutor task is pickled and copied
+    through a pipe - that is why mp_pool_executor.py sends file NAMES to the workers and lets
+    every worker read and write the files itself.  When the images are already decoded in
+    memory that means a round trip through the disk, or pickling ~70 MB per 6000x4000 photo.
+
+    SharedImageBatch puts every decoded image in its own shared memory block instead.  The
+    workers only receive the block name and the array shape, attach to the block and work on a
+    numpy view of it, and write the result back INTO THE SAME BLOCK - only the new shape travels
+    back.  So a whole chain of filters runs across processes without pickling a single pixel:
+
+        with SharedImageBatch() as batch:
+            for img_name in img_names:
+                batch.add(Image.open(source/img_name))          # decode once, in memory
+            batch.run([partial(gaussian_blur, radius=15), partial(thumbnail, size=(1200, 1200))])
+            for i, img_name in enumerate(img_names):
+                batch.image(i).save(destination/img_name)
+
+    The filters are plain functions "numpy array in -> numpy array out" (gaussian_blur(),
+    box_blur(), thumbnail(), grayscale() below, or your own module-level function); a result
+    must not be bigger than the block it is written back into, so shrinking filters are fine.
+
+    The blocks are unlinked when the batch is closed (or leaves the "with" block).
+'''
+import concurrent.futures
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+
+# ================================================================================
+# filters - numpy array in, numpy array out
+# ================================================================================
+
+def gaussian_blur(arr, radius=15):
+    return np.asarray(Image.fromarray(arr).filter(ImageFilter.GaussianBlur(radius)))
+
+def box_blur(arr, radius=15):
+    return np.asarray(Image.fromarray(arr).filter(ImageFilter.BoxBlur(radius)))
+
+def thumbnail(arr, size=(1200, 1200)):
+    img = Image.fromarray(arr)
+    img.thumbnail(size)
+    return np.asarray(img)
+
+def grayscale(arr):
+    return np.asarray(Image.fromarray(arr).convert('L'))
+
+
+# ================================================================================
+# worker side
+# ================================================================================
+
+def attach_block(name):
+    '''
+    Attach to an existing block WITHOUT registering it with this process's resource tracker -
+    before Python 3.13 every attach registers the block, and a worker's own tracker would then
+    "clean up" (unlink) the parent's blocks when the worker exits
+    '''
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)     # Python 3.13+
+    except TypeError:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+def apply_chain(name, shape, chain):
+    '''
+    Run the filters of `chain` one after the other on the image in shared memory block `name`,
+    write the result back into the block and return its shape (runs in the worker process)
+    '''
+    shm = attach_block(name)
+    try:
+        result = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        for image_filter in chain:
+            result = image_filter(result)
+        if result.nbytes > shm.size:
+            raise ValueError(f'filter result {result.shape} does not fit the {shm.size} byte block')
+        new_shape = result.shape
+        out = np.ndarray(new_shape, dtype=np.uint8, buffer=shm.buf)
+        out[...] = result
+        # numpy views keep the buffer exported - drop them before the block is closed
+        del out, result
+        return new_shape
+    finally:
+        shm.close()
+
+
+# ================================================================================
+# parent side
+# ================================================================================
+
+class SharedImageBatch:
+    '''
+    A list of 8-bit images (L, RGB or RGBA), each in its own shared memory block
+    '''
+    def __init__(self):
+        self._blocks = []   # SharedMemory objects
+        self._shapes = []   # current shape of the image in each block
+        self.errors = {}    # index -> "ExceptionName: message" of the last run()
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def add(self, image):
+        '''
+        Copy a PIL image or a uint8 numpy array into a new shared memory block, return its index
+        '''
+        if isinstance(image, Image.Image):
+            if image.mode not in ('L', 'RGB', 'RGBA'):
+                image = image.convert('RGB')
+            image = np.asarray(image)
+        arr = np.ascontiguousarray(image, dtype=np.uint8)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        view = np.ndarray(arr.shape, dtype=np.uint8, buffer=shm.buf)
+        view[...] = arr
+        del view
+        self._blocks.append(shm)
+        self._shapes.append(arr.shape)
+        return len(self._blocks) - 1
+
+    def array(self, indx):
+        '''
+        numpy view of image `indx` - no copy, valid until the batch is closed
+        '''
+        return np.ndarray(self._shapes[indx], dtype=np.uint8, buffer=self._blocks[indx].buf)
+
+    def image(self, indx):
+        '''
+        PIL copy of image `indx`
+        '''
+        return Image.fromarray(self.array(indx).copy())
+
+    def run(self, chain, executor=None, max_workers=None):
+        '''
+        Apply the filter chain to every image on a process pool, results land in the same blocks.
+        Returns the number of images done; the errors of the failed ones are in self.errors
+        (those images keep their previous content).
+        '''
+        own_executor = executor is None
+        if own_executor:
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+        self.errors = {}
+        try:
+            futures = {executor.submit(apply_chain, shm.name, shape, list(chain)): indx
+                       for indx, (shm, shape) in enumerate(zip(self._blocks, self._shapes))}
+            for future in concurrent.futures.as_completed(futures):
+                indx = futures[future]
+                try:
+                    self._shapes[indx] = future.result()
+                except Exception as e:
+                    self.errors[indx] = f'{type(e).__name__}: {e}'
+        finally:
+            if own_executor:
+                executor.shutdown()
+        return len(futures) - len(self.errors)
+
+    def close(self):
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks, self._shapes = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,76 @@
+'''
+    Benchmark: one Lock around a shared counter (the increment_val_with_lock pattern of
+    thread_02_locking.py) against ShardedCounter, from 2 to 64 threads.
+
+    Every thread does --increments / threads increments in a tight loop; all variants must end
+    with exactly --increments.  The ProfiledLock row is the single-lock version measured with
+    the profiler - it shows how many acquisitions had to wait (and what the profiling costs).
+
+    $ python multi-threading/bench_sharded_counter.py --increments 400000
+'''
+import argparse
+import threading
+import time
+
+from sharded_counter import ProfiledLock, ShardedCounter
+
+
+def run_threads(worker, threads, per_thread):
+    workers = [threading.Thread(target=worker, args=(per_thread,)) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return time.perf_counter() - start
+
+
+def single_lock(threads, per_thread, lock=None):
+    lock = lock or threading.Lock()
+    shared = [0]
+
+    def worker(n):
+        for _ in range(n):
+            with lock:
+                shared[0] += 1
+
+    return run_threads(worker, threads, per_thread), shared[0]
+
+
+def sharded(threads, per_thread):
+    counter = ShardedCounter()
+
+    def worker(n):
+        increment = counter.increment
+        for _ in range(n):
+            increment()
+
+    return run_threads(worker, threads, per_thread), counter.value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--increments', type=int, default=400_000, help='total increments per run')
+    parser.add_argument('--threads', type=int, nargs='+', default=[2, 4, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    print(f'{args.increments} increments per run\n')
+    print(f'{"threads":>7}  {"single Lock":>12}  {"ShardedCounter":>14}  {"speedup":>7}  '
+          f'{"ProfiledLock":>12}  {"contended":>9}')
+    for threads in args.threads:
+        per_thread = args.increments // threads
+        expected = per_thread * threads
+
+        lock_time, lock_total = single_lock(threads, per_thread)
+        sharded_time, sharded_total = sharded(threads, per_thread)
+        profiled = ProfiledLock('counter')
+        profiled_time, profiled_total = single_lock(threads, per_thread, profiled)
+        assert lock_total == sharded_total == profiled_total == expected
+
+        contention = sum(r['contended'] for r in profiled.report()) / expected
+        print(f'{threads:>7}  {lock_time:>11.3f}s  {sharded_time:>13.3f}s  {lock_time / sharded_time:>6.2f}x  '
+              f'{profiled_time:>11.3f}s  {contention:>9.1%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+'''
+    Thread-safe counting without one hot lock, and a profiler to find the hot locks.
+
+    thread_02_locking.py protects a shared counter with ONE threading.Lock around the
+    read-modify-write.  That is correct, but every increment of every thread now queues up on
+    the same lock.  Two tools for that:
+
+    ShardedCounter / ShardedTally
+        every thread adds to its OWN accumulator (a "shard", found through threading.local), so
+        an increment never waits for another thread.  Reading the value merges the shards - reads
+        are the (rare) expensive operation instead of the (frequent) writes.  ShardedCounter
+        counts one number, ShardedTally counts per key like collections.Counter.
+
+    ProfiledLock
+        a drop-in threading.Lock (acquire / release / with) that records, per call site
+        (file:line of the code taking the lock): number of acquisitions, how many of them had to
+        wait, total and max wait time, total and max hold time.  Swap it in for a Lock, run the
+        program, and print_report() shows which lock site costs the most waiting.
+
+    Example:
+        hits = ShardedCounter()
+        ...in any thread:  hits.increment()
+        print(hits.value)
+
+        lock = ProfiledLock('shared_value')
+        ...in any thread:  with lock: shared_value += 1
+        lock.print_report()
+'''
+from collections import Counter
+import os
+import sys
+import threading
+import time
+
+
+class _Sharded:
+    '''
+    Base class: one shard per thread, created on the thread's first write.  The shards of
+    threads that have finished are folded into self._retired on read, so a program starting
+    thousands of short-lived threads doesn't keep thousands of shards around.
+    '''
+    def __init__(self):
+        self._local = threading.local()
+        self._registry_lock = threading.Lock()   # only taken to add a shard and to read
+        self._shards = []                        # [(thread, shard)]
+        self._retired = self._new_shard()
+
+    def _new_shard(self):
+        raise NotImplementedError
+
+    def _merge(self, total, shard):
+        raise NotImplementedError
+
+    def _shard(self):
+        # slow path of a thread's first write: create and register its shard
+        shard = self._new_shard()
+        with self._registry_lock:
+            self._shards.append((threading.current_thread(), shard))
+        self._local.shard = shard
+        return shard
+
+    def _collect(self, total):
+        with self._registry_lock:
+            alive = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    self._retired = self._merge(self._retired, shard)
+            self._shards = alive
+            total = self._merge(total, self._retired)
+            for _, shard in alive:
+                total = self._merge(total, shard)
+        return total
+
+    @property
+    def shards(self):
+        with self._registry_lock:
+            return len(self._shards)
+
+
+class ShardedCounter(_Sharded):
+    '''
+    A number that many threads increment - increment() never takes a lock after a thread's
+    first call, `value` sums the per-thread shards
+    '''
+    def __init__(self):
+        super().__init__()
+        # reset() never writes into the shards - only their owning thread does (without a lock), so
+        # a "shard[0] = 0" from another thread could wipe out an increment running at the same time.
+        # It records the total at the time of the reset instead, and `value` counts from there.
+        self._baseline = 0
+        self._baseline_lock = threading.Lock()
+
+    def _new_shard(self):
+        return [0]
+
+    def _merge(self, total, shard):
+        total[0] += shard[0]
+        return total
+
+    def increment(self, n=1):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        # only this thread ever writes to its shard
+        shard[0] += n
+
+    @property
+    def value(self):
+        with self._baseline_lock:
+            return self._collect([0])[0] - self._baseline
+
+    def reset(self):
+        with self._baseline_lock:
+            self._baseline = self._collect([0])[0]
+
+
+class ShardedTally(_Sharded):
+    '''
+    Per-key counts (like collections.Counter) that many threads add to without a shared lock
+    '''
+    def _new_shard(self):
+        return Counter()
+
+    def _merge(self, total, shard):
+        # copy first - a thread may add a new key to its shard while we iterate over it
+        total.update(dict(shard))
+        return total
+
+    def add(self, key, n=1):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        shard[key] += n
+
+    def counts(self):
+        return self._collect(Counter())
+
+    def __getitem__(self, key):
+        return self.counts()[key]
+
+
+class ProfiledLock:
+    '''
+    threading.Lock that records wait time, hold time and acquisition counts per call site.
+    All the statistics are updated while the lock is held, so they need no lock of their own.
+    '''
+    def __init__(self, name='lock'):
+        self.name = name
+        self._lock = threading.Lock()
+        # (code object, line) of the call site -> [acquisitions, contended, total_wait, max_wait, total_hold, max_hold]
+        self._stats = {}
+        self._site = None           # call site of the current holder
+        self._acquired_at = 0.0
+
+    @staticmethod
+    def _call_site(depth):
+        # a cheap key - it is only turned into "file:line (function)" for the report
+        frame = sys._getframe(depth)
+        return frame.f_code, frame.f_lineno
+
+    @staticmethod
+    def _format_site(site):
+        code, lineno = site
+        return f'{os.path.basename(code.co_filename)}:{lineno} ({code.co_name})'
+
+    def _acquire(self, site, blocking, timeout):
+        start = time.perf_counter()
+        contended = not self._lock.acquire(False)
+        if contended:
+            if not blocking or not self._lock.acquire(True, timeout):
+                return False
+        now = time.perf_counter()
+        stats = self._stats.setdefault(site, [0, 0, 0.0, 0.0, 0.0, 0.0])
+        wait = now - start
+        stats[0] += 1
+        stats[1] += contended
+        stats[2] += wait
+        stats[3] = max(stats[3], wait)
+        self._site = site
+        self._acquired_at = now
+        return True
+
+    def acquire(self, blocking=True, timeout=-1):
+        return self._acquire(self._call_site(2), blocking, timeout)
+
+    def release(self):
+        stats = self._stats[self._site]
+        hold = time.perf_counter() - self._acquired_at
+        stats[4] += hold
+        stats[5] = max(stats[5], hold)
+        self._lock.release()
+
+    def locked(self):
+        return self._lock.locked()
+
+    def __enter__(self):
+        self._acquire(self._call_site(2), True, -1)
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def report(self):
+        '''
+        One dict per call site, the site with the most total waiting first
+        '''
+        rows = []
+        for site, (acquisitions, contended, total_wait, max_wait, total_hold, max_hold) in list(self._stats.items()):
+            rows.append({
+                'site': self._format_site(site),
+                'acquisitions': acquisitions,
+                'contended': contended,
+                'contention_ratio': round(contended / acquisitions, 3) if acquisitions else 0.0,
+                'total_wait': round(total_wait, 6),
+                'max_wait': round(max_wait, 6),
+                'avg_wait': round(total_wait / acquisitions, 9) if acquisitions else 0.0,
+                'total_hold': round(total_hold, 6),
+                'max_hold': round(max_hold, 6),
+            })
+        return sorted(rows, key=lambda row: row['total_wait'], reverse=True)
+
+    def print_report(self):
+        print(f'lock "{self.name}":')
+        for row in self.report():
+            print(f"  {row['site']:<48} {row['acquisitions']:>9} acquisitions, {row['contention_ratio']:6.1%} contended, "
+                  f"wait {row['total_wait']:.4f}s (max {row['max_wait'] * 1000:.2f}ms), "
+                  f"hold {row['total_hold']:.4f}s (max {row['max_hold'] * 1000:.2f}ms)")
+
+    def reset(self):
+        self._stats = {}
@@ -2,9 +2,15 @@
 # note that the recommended way to do multithreading is to use concurrent.futures (avaiable begining Python3.2)
 
 import concurrent.futures
+from pathlib import Path
+import sys
 import threading
 import time
 
+# put the repo root on sys.path for the "shared" package
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from shared.adaptive_executor import AdaptiveExecutor
+
 # timer functions
 def start_timer():
     return time.perf_counter()
@@ -299,6 +305,9 @@ def conc_futures_thrd_with_max_workers(max_workers):
 
 
         This methd uses 'task2' as the worker thread prefix   (thread_name_prefix='task2')
+
+        Picking max_workers is guesswork - see conc_futures_thrd_adaptive() below for an executor
+        that finds the number by itself.
     '''
 
     start = start_timer()
@@ -313,6 +322,37 @@ def conc_futures_thrd_with_max_workers(max_workers):
 
     print(f'{total_time(start)}')
 
+# ------------------- 10. let the executor pick the number of workers (AdaptiveExecutor) -------------------
+def quiet_worker(seconds):
+    # same as run_workers, without the print - a few hundred tasks would flood the console
+    time.sleep(seconds)
+    return seconds
+
+@funcname
+def conc_futures_thrd_adaptive(max_workers=64, policy='hill_climb'):
+    '''
+        shared.adaptive_executor.AdaptiveExecutor wraps a ThreadPoolExecutor of up to max_workers
+        threads, measures the throughput (tasks finished per second) every half second and moves the
+        number of threads allowed to run up or down - hill climbing (policy='hill_climb') or
+        additive increase / multiplicative decrease (policy='aimd').
+
+        Sleeping threads don't compete for the CPU, so for these 400 short I/O-like tasks the
+        throughput keeps growing with every thread added and the executor climbs towards max_workers.
+        (Try the CPU-bound version in multi-processing/mp_pool_executor.py - there it settles on a
+        small number.)
+    '''
+
+    start = start_timer()
+
+    with AdaptiveExecutor('thread', max_workers=max_workers, policy=policy, thread_name_prefix='task3') as executor:
+        secs = [0.05, 0.1, 0.15, 0.2] * 100
+        results = list(executor.map(quiet_worker, secs))
+
+    print(f'{len(results)} tasks done')
+    print(f'chosen concurrency: {executor.concurrency}, best measured: {executor.best_concurrency()}')
+    print(f'throughput curve (threads: tasks per second): {executor.throughput_curve()}')
+    print(f'{total_time(start)}')
+
 if __name__ == '__main__':
 
     # This program shows the different ways to create multi-threading function (except for 'call_func_twice_no_threads').
@@ -332,3 +372,4 @@ if __name__ == '__main__':
     conc_futures_thrd_as_completed()                    #  concurrent.futures ThreadPoolExecutor() using as_completed()
     conc_futures_thrd_with_executor_map()               # concurrent.futures ThreadPoolExecutor() using executor.map()
     conc_futures_thrd_with_max_workers(5)               # concurrent.futures ThreadPoolExecutor() passing max_workers argument
+    conc_futures_thrd_adaptive()                        # AdaptiveExecutor picks the number of threads by itself
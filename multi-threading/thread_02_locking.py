@@ -9,11 +9,20 @@
     This demo shows the result of shared_value1 with NO threading.Lock() applied,
     and the shared_value2 with threading.Lock() applied. 
 
+    One lock around a hot counter makes every thread wait for every other thread, though.
+    sharded_counter.py has two tools for that, both shown at the end of this demo:
+    - ShardedCounter: each thread counts into its own shard, no lock on increment -
+      see increment_val_with_sharded_counter(), the drop-in for increment_val_with_lock()
+    - ProfiledLock: a threading.Lock that records who waited how long, per line of code -
+      pass it to increment_val_with_lock() instead of a plain Lock
+
 
 '''
 from threading import current_thread, Lock, Thread
 import time
 
+from sharded_counter import ProfiledLock, ShardedCounter
+
 shared_value1 = 0
 shared_value2 = 0
 
@@ -72,6 +81,16 @@ def increment_val_with_lock(lock):
     '''
 
 
+def increment_val_with_sharded_counter(counter):
+    '''
+       same job as increment_val_with_lock(), without the lock: counter is a ShardedCounter,
+       each thread increments its own shard and counter.value adds the shards up when read.
+       No thread ever waits for another one, and no increment is lost.
+    '''
+    counter.increment()
+    time.sleep(0.1)
+
+
 def multi_functions(lock):
     increment_value_no_lock()
     print(f" increment_value_no_lock():   {current_thread().name}:  {shared_value1 = }")
@@ -81,10 +100,32 @@ def multi_functions(lock):
 
 
 
-thread_lock = Lock()
-t1 = Thread(target=multi_functions, args=(thread_lock,))
-t2 = Thread(target=multi_functions, args=(thread_lock,))
-t1.start()
-t2.start()
-t1.join()
-t2.join()
+if __name__ == '__main__':
+
+    thread_lock = Lock()
+    t1 = Thread(target=multi_functions, args=(thread_lock,))
+    t2 = Thread(target=multi_functions, args=(thread_lock,))
+    t1.start()
+    t2.start()
+    t1.join()
+    t2.join()
+
+    # the same increment with a ProfiledLock - how long did the threads wait for each other?
+    profiled_lock = ProfiledLock('shared_value2')
+    threads = [Thread(target=increment_val_with_lock, args=(profiled_lock,)) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"\n increment_val_with_lock(ProfiledLock) x 5:  {shared_value2 = }")
+    profiled_lock.print_report()
+
+    # and with a ShardedCounter - nobody waits: 5 threads x 0.1 seconds take 0.1 seconds, not 0.5
+    counter = ShardedCounter()
+    start = time.perf_counter()
+    threads = [Thread(target=increment_val_with_sharded_counter, args=(counter,)) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"\n increment_val_with_sharded_counter() x 5:  {counter.value = } in {time.perf_counter() - start:.2f} seconds")
@@ -0,0 +1,100 @@
+'''
+    Benchmark: page-by-page vs. concurrent fetching of the article_users API.
+
+    A local mock server (shared/local_http_server.py) serves --pages pages in the same JSON
+    shape as https://jsonmock.hackerrank.com/api/article_users, with --delay seconds of
+    simulated latency per request.  Every --fail-every'th page answers 503 on its first request
+    to exercise the retries (done by the shared session).
+
+    $ python rest_api/bench_get_authors.py --pages 50 --delay 0.05
+'''
+import argparse
+import json
+from pathlib import Path
+import random
+import sys
+import time
+
+# put the repo root on sys.path for the "shared" package
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from rest_api.get_authors_list import get_authors_concurrently, get_authors_sequentially
+from shared.local_http_server import LocalHTTPServer
+
+PER_PAGE = 10
+
+
+def mock_article_users_pages(total_pages, seed=0):
+    rnd = random.Random(seed)
+    total = total_pages * PER_PAGE
+    pages = {}
+    for page in range(1, total_pages + 1):
+        data = [{'id': n, 'username': f'user{n}', 'about': '', 'submitted': rnd.randint(0, 900),
+                 'updated_at': '2019-08-29T06:34:37.000Z', 'submission_count': rnd.randint(0, 200),
+                 'comment_count': rnd.randint(0, 50), 'created_at': rnd.randint(1e9, 1.6e9)}
+                for n in range((page - 1) * PER_PAGE + 1, page * PER_PAGE + 1)]
+        body = {'page': page, 'per_page': PER_PAGE, 'total': total, 'total_pages': total_pages, 'data': data}
+        pages[f'/api/article_users?page={page}'] = json.dumps(body).encode()
+    return pages
+
+
+class FlakyServer(LocalHTTPServer):
+    '''
+    Mock server whose every n-th page fails once with a 503 before it succeeds
+    '''
+    def __init__(self, pages, fail_every=0, **kwargs):
+        failing = {path for i, path in enumerate(pages, start=1) if fail_every and i % fail_every == 0}
+        self.pending_failures = failing
+        super().__init__(pages, content_type='application/json', **kwargs)
+
+    def _make_handler(self):
+        handler = super()._make_handler()
+        server = self
+
+        class FlakyHandler(handler):
+            def do_GET(self):
+                with server._lock:
+                    fail = self.path in server.pending_failures
+                    server.pending_failures.discard(self.path)
+                if fail:
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                super().do_GET()
+
+        return FlakyHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--delay', type=float, default=0.05, help='simulated latency per request (seconds)')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--fail-every', type=int, default=7, help='every n-th page fails once (0 = never)')
+    args = parser.parse_args()
+
+    pages = mock_article_users_pages(args.pages)
+
+    with FlakyServer(pages, fail_every=args.fail_every, delay=args.delay) as server:
+        base_url = server.url('/api/article_users?page=')
+        start = time.perf_counter()
+        sequential = get_authors_sequentially(50, base_url)
+        sequential_time = time.perf_counter() - start
+
+    with FlakyServer(pages, fail_every=args.fail_every, delay=args.delay) as server:
+        base_url = server.url('/api/article_users?page=')
+        start = time.perf_counter()
+        concurrent = get_authors_concurrently(50, base_url, max_workers=args.workers)
+        concurrent_time = time.perf_counter() - start
+
+    assert sequential == concurrent, 'concurrent paginator returned a different author list'
+
+    print(f'{args.pages} pages, {args.delay}s simulated latency, {len(concurrent)} authors')
+    print(f'{"page-by-page loop":<24}: {sequential_time:8.3f} s')
+    print(f'{f"concurrent (x{args.workers})":<24}: {concurrent_time:8.3f} s')
+    print(f'{"speedup":<24}: {sequential_time / concurrent_time:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
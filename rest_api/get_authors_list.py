@@ -5,26 +5,78 @@
 #   Create a list of authors whose submission count is greater than the threshold.
 #   Write out the list to a json file named 'authors_list.json'.
 #
+#   Page 1 tells us the total number of pages - after that every page is independent, so
+#   iter_authors() streams the authors through paginated_client.PaginatedClient, which keeps
+#   the next few pages downloading while the current one is filtered.
+#
 
 # %%
 from pathlib import Path
 import json
-import requests
+import sys
+
+# put the repo root on sys.path for the "shared" package
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from shared.http_session import transport_stats
+from rest_api.paginated_client import PaginatedClient
 
 # %%
 # users array and threshold
-authors = []
 threshold = 50
-current_page = 1
 url = "https://jsonmock.hackerrank.com/api/article_users?page="
 
-def run_api_request(page):
-    r = requests.get(url + str(page))
-    if r.ok:
-        # return the json() object from the response
-        return r.json()
-    else:
-        print('Error while accessing URL - check URL link')
+def run_api_request(page, base_url=url):
+    '''
+        return the json body of one page - raises ApiError when the page can't be fetched
+        (RetryableApiError for connection errors, 429 and 5xx once the shared session's retries are used up)
+    '''
+    return PaginatedClient(base_url + '{page}', prefetch=0).fetch_page(page)
+
+def is_author(threshold):
+    # filter for PaginatedClient.iter_records()
+    return lambda user: user['submission_count'] > threshold
+
+def username(user):
+    # projection for PaginatedClient.iter_records()
+    return user['username']
+
+def get_authors_sequentially(threshold=threshold, base_url=url):
+    '''
+        the original page-by-page loop - total latency is roughly total_pages x round trip time
+    '''
+    authors = []
+    current_page = 1
+    article_users = run_api_request(current_page, base_url)
+    total_pages = article_users['total_pages']
+
+    while True:
+        user_data = article_users['data']
+        for user in user_data:
+            if user['submission_count'] > threshold:
+                authors.append(user['username'])
+
+        current_page +=1
+        if current_page <= total_pages:
+            article_users = run_api_request(current_page, base_url)
+        else:
+            break
+
+    return authors
+
+def iter_authors(threshold=threshold, base_url=url, prefetch=8):
+    '''
+        generator of the usernames with more than threshold submissions, in page order -
+        the next `prefetch` pages download while the current one is consumed, and only those
+        pages are held in memory however many pages the API has
+    '''
+    client = PaginatedClient(base_url + '{page}', prefetch=prefetch)
+    return client.iter_records(filter=is_author(threshold), projection=username)
+
+def get_authors_concurrently(threshold=threshold, base_url=url, max_workers=8):
+    '''
+        same list as get_authors_sequentially(), with max_workers pages in flight at a time
+    '''
+    return list(iter_authors(threshold, base_url, prefetch=max_workers))
 
 def write_to_json(authors_list):
     '''
@@ -37,21 +89,9 @@ def write_to_json(authors_list):
         json.dump(results, outfile, indent=4)
 
 # %%
+if __name__ == '__main__':
+    authors = get_authors_concurrently(threshold)
 
-article_users = run_api_request(current_page)
-total_pages = article_users['total_pages']
-
-while True:
-    user_data = article_users['data']
-    for user in user_data:
-        if user['submission_count'] > threshold:
-            authors.append(user['username'])
-
-    current_page +=1
-    if current_page <= total_pages:
-        article_users = run_api_request(current_page)
-    else:
-        break
-
-print(authors)
-write_to_json(authors)
+    print(authors)
+    print(transport_stats())
+    write_to_json(authors)
@@ -0,0 +1,167 @@
+'''
+    Reusable client for page-numbered REST APIs like
+    https://jsonmock.hackerrank.com/api/article_users?page=<pagenumber>
+
+    Every page is a json object with the records under one key ("data") and the number of
+    pages under another ("total_pages").  PaginatedClient.iter_records() is a generator that
+    yields the records one at a time, page after page:
+
+    - the next `prefetch` pages are already being downloaded (on a small thread pool) while the
+      current page is consumed, so the API latency overlaps with our own processing
+    - at most prefetch + 1 pages are held in memory, however many pages the API has
+    - filter / projection functions pick and reshape the records on the way out
+    - failures raise typed errors instead of printing and returning None:
+        ApiError            - the request can't succeed (404, bad json, missing keys ...)
+        RetryableApiError   - connection errors, timeouts, 429 and 5xx responses that are still
+                              failing after the retries
+
+    There is ONE retry layer: the shared session (shared/http_session.py) already retries
+    connection errors, 429 and 5xx with exponential backoff (urllib3 Retry, honouring
+    Retry-After), so the client doesn't retry on top of it by default - both layers together
+    sent up to 16 requests per throttled page.  Pass retries=N only with a session that has
+    no Retry of its own.
+
+    Example:
+        client = PaginatedClient("https://jsonmock.hackerrank.com/api/article_users?page={page}")
+        for username in client.iter_records(filter=lambda user: user['submission_count'] > 50,
+                                            projection=lambda user: user['username']):
+            print(username)
+'''
+from collections import deque
+import concurrent.futures
+import time
+
+import requests
+
+# "shared" is found through the repo root, which the entry scripts (get_authors_list.py ...) put on sys.path
+from shared.http_session import get_session
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class ApiError(Exception):
+    '''
+    A page request that failed - url and status (None when there was no response) tell which
+    '''
+    def __init__(self, message, url=None, status=None):
+        super().__init__(message)
+        self.url = url
+        self.status = status
+
+
+class RetryableApiError(ApiError):
+    '''
+    A transient failure (connection error, timeout, 429, 5xx) - trying again may succeed
+    '''
+
+
+class PaginatedClient:
+    '''
+    Iterate over all the records of a page-numbered API
+
+    page_url        - url of a page, with a "{page}" placeholder for the page number
+    session         - requests.Session to use (default: the shared pooled session)
+    prefetch        - number of pages downloaded ahead of the page being consumed (0 = none)
+    retries         - retries of a page after a RetryableApiError (0: leave retrying to the session)
+    backoff         - sleeps backoff, 2*backoff, 4*backoff ... between the retries
+    records_key     - key of the list of records in a page
+    total_pages_key - key of the number of pages in a page
+    first_page      - number of the first page
+    '''
+    def __init__(self, page_url, session=None, prefetch=4, retries=0, backoff=0.5,
+                 records_key='data', total_pages_key='total_pages', first_page=1):
+        if '{page}' not in page_url:
+            raise ValueError('page_url needs a "{page}" placeholder for the page number')
+        self.page_url = page_url
+        self.session = session
+        self.prefetch = prefetch
+        self.retries = retries
+        self.backoff = backoff
+        self.records_key = records_key
+        self.total_pages_key = total_pages_key
+        self.first_page = first_page
+
+    def _request_page(self, page):
+        url = self.page_url.format(page=page)
+        session = self.session or get_session()
+        try:
+            r = session.get(url)
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.RetryError) as e:
+            raise RetryableApiError(f'{url}: {e}', url) from e
+        except requests.RequestException as e:
+            raise ApiError(f'{url}: {e}', url) from e
+
+        if r.status_code in RETRYABLE_STATUS:
+            raise RetryableApiError(f'{url}: HTTP {r.status_code}', url, r.status_code)
+        if not r.ok:
+            raise ApiError(f'{url}: HTTP {r.status_code}', url, r.status_code)
+        try:
+            body = r.json()
+        except ValueError as e:
+            raise ApiError(f'{url}: response is not valid json', url, r.status_code) from e
+        if not isinstance(body, dict) or self.records_key not in body:
+            raise ApiError(f'{url}: response has no "{self.records_key}" list', url, r.status_code)
+        return body
+
+    def fetch_page(self, page):
+        '''
+        Return the json body of one page, retrying RetryableApiErrors with backoff when the
+        client has retries
+        '''
+        for attempt in range(self.retries + 1):
+            try:
+                return self._request_page(page)
+            except RetryableApiError:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def total_pages(self, body):
+        try:
+            return int(body[self.total_pages_key])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ApiError(f'page has no valid "{self.total_pages_key}"') from e
+
+    def iter_pages(self):
+        '''
+        Generator of the page bodies in page order.  The first page is fetched on its own to
+        learn the number of pages, then up to `prefetch` pages are kept downloading ahead.
+        '''
+        body = self.fetch_page(self.first_page)
+        last_page = self.first_page + self.total_pages(body) - 1
+        yield body
+
+        pages = iter(range(self.first_page + 1, last_page + 1))
+        if self.prefetch <= 0:
+            for page in pages:
+                yield self.fetch_page(page)
+            return
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.prefetch, thread_name_prefix='page')
+        try:
+            in_flight = deque()
+            for page in pages:
+                in_flight.append(executor.submit(self.fetch_page, page))
+                if len(in_flight) == self.prefetch:
+                    break
+            while in_flight:
+                body = in_flight.popleft().result()
+                # keep the window full: start the next page before handing this one out
+                page = next(pages, None)
+                if page is not None:
+                    in_flight.append(executor.submit(self.fetch_page, page))
+                yield body
+        finally:
+            # the consumer may stop early (break / exception) - don't start pages nobody wants
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def iter_records(self, filter=None, projection=None):
+        '''
+        Generator of the records of all the pages, in order.
+        filter(record) -> bool picks the records, projection(record) reshapes them.
+        '''
+        for body in self.iter_pages():
+            for record in body[self.records_key]:
+                if filter is not None and not filter(record):
+                    continue
+                yield projection(record) if projection is not None else record
@@ -0,0 +1,229 @@
+'''
+    Executor that picks its own number of workers.
+
+    ThreadPoolExecutor / ProcessPoolExecutor make us guess max_workers up front - and the right
+    number is very different for I/O bound jobs (scraping: dozens of requests can wait on the
+    network at once) and CPU bound jobs (image filters: more workers than cores only adds
+    overhead).  AdaptiveExecutor wraps a pool of up to max_workers workers, but only lets
+    `concurrency` tasks run at the same time, and keeps adjusting that number while it runs:
+
+    - every `interval` seconds it measures the throughput (tasks finished per second) and the
+      average latency (submit to finish) of the tasks finished in that window
+    - then it moves the concurrency within [min_workers, max_workers] with one of two rules:
+
+        'hill_climb' - keep stepping in the same direction while the throughput improves, turn
+                       around when it gets worse, and step down when it stays flat (the same
+                       throughput with fewer workers is the better setting)
+        'aimd'       - additive increase / multiplicative decrease: add `increase` workers while
+                       the latency stays close to the lowest latency seen, cut the concurrency by
+                       `decrease_factor` as soon as the latency climbs or the throughput drops
+
+    The chosen concurrency, and every measurement window, can be read back afterwards:
+
+        with AdaptiveExecutor('thread', max_workers=64) as executor:
+            results = list(executor.map(fetch_page, urls))
+        print(executor.concurrency, executor.best_concurrency())
+        print(executor.throughput_curve())      # {concurrency: tasks per second}
+
+    submit() blocks while `concurrency` tasks are already running - that is what keeps the
+    concurrency limit, and it also keeps the caller from queueing up millions of futures.
+'''
+from collections import deque
+import concurrent.futures
+from functools import partial
+import os
+import threading
+import time
+
+POLICIES = ('hill_climb', 'aimd')
+
+
+class AdaptiveExecutor:
+    '''
+    kind              - 'thread' or 'process'
+    min_workers       - lower bound of the concurrency
+    max_workers       - upper bound of the concurrency (= size of the underlying pool); default
+                        64 threads or os.cpu_count() processes
+    initial_workers   - concurrency to start with (default: min_workers)
+    policy            - 'hill_climb' or 'aimd'
+    interval          - length of a measurement window in seconds
+    tolerance         - throughput changes smaller than this fraction count as "flat"
+    step_ratio        - hill_climb step, as a fraction of the current concurrency (at least 1)
+    increase          - aimd additive increase
+    decrease_factor   - aimd multiplicative decrease
+    latency_tolerance - aimd backs off once the latency is this fraction above the lowest seen
+    executor_kwargs   - passed on to the ThreadPoolExecutor / ProcessPoolExecutor
+    '''
+    def __init__(self, kind='thread', min_workers=1, max_workers=None, initial_workers=None,
+                 policy='hill_climb', interval=0.5, tolerance=0.05, step_ratio=0.25, increase=1,
+                 decrease_factor=0.5, latency_tolerance=0.5, **executor_kwargs):
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"kind must be 'thread' or 'process', not {kind!r}")
+        if policy not in POLICIES:
+            raise ValueError(f'policy must be one of {POLICIES}, not {policy!r}')
+        if max_workers is None:
+            max_workers = 64 if kind == 'thread' else (os.cpu_count() or 1)
+        if not 1 <= min_workers <= max_workers:
+            raise ValueError('need 1 <= min_workers <= max_workers')
+
+        self.kind = kind
+        self.policy = policy
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.interval = interval
+        self.tolerance = tolerance
+        self.step_ratio = step_ratio
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+
+        pool_class = concurrent.futures.ThreadPoolExecutor if kind == 'thread' else concurrent.futures.ProcessPoolExecutor
+        self._executor = pool_class(max_workers=max_workers, **executor_kwargs)
+
+        self._cond = threading.Condition()
+        self._concurrency = min(max(initial_workers or min_workers, min_workers), max_workers)
+        self._in_flight = 0
+        self._direction = 1
+        self._prev_throughput = None
+        self._min_latency = None
+        self._started = time.perf_counter()
+        self._window_start = self._started
+        self._window_done = 0
+        self._window_latency = 0.0
+        self.completed = 0
+        self.history = []   # one dict per measurement window
+
+    @property
+    def concurrency(self):
+        '''
+        The number of tasks currently allowed to run at the same time
+        '''
+        return self._concurrency
+
+    def submit(self, fn, *args, **kwargs):
+        '''
+        Same as Executor.submit(), but waits until fewer than `concurrency` tasks are running
+        '''
+        with self._cond:
+            self._cond.wait_for(lambda: self._in_flight < self._concurrency)
+            self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+            raise
+        future.add_done_callback(partial(self._task_done, started))
+        return future
+
+    def map(self, fn, *iterables):
+        '''
+        Same as Executor.map() - results in the order of the inputs - except the inputs are
+        submitted lazily, as the concurrency limit lets them in
+        '''
+        pending = deque()
+        for args in zip(*iterables):
+            while pending and pending[0].done():
+                yield pending.popleft().result()
+            pending.append(self.submit(fn, *args))
+        while pending:
+            yield pending.popleft().result()
+
+    def _task_done(self, started, future):
+        now = time.perf_counter()
+        with self._cond:
+            self._in_flight -= 1
+            self.completed += 1
+            self._window_done += 1
+            self._window_latency += now - started
+            if now - self._window_start >= self.interval:
+                self._adjust(now)
+            self._cond.notify_all()
+
+    def _adjust(self, now):
+        # called with self._cond held, at the end of a measurement window
+        throughput = self._window_done / (now - self._window_start)
+        avg_latency = self._window_latency / self._window_done
+        self.history.append({
+            'time': round(now - self._started, 3),
+            'concurrency': self._concurrency,
+            'tasks': self._window_done,
+            'throughput': round(throughput, 3),
+            'avg_latency': round(avg_latency, 4),
+        })
+
+        if self.policy == 'hill_climb':
+            new_concurrency = self._hill_climb(throughput)
+        else:
+            new_concurrency = self._aimd(throughput, avg_latency)
+        self._prev_throughput = throughput
+        self._concurrency = min(max(new_concurrency, self.min_workers), self.max_workers)
+
+        self._window_start = now
+        self._window_done = 0
+        self._window_latency = 0.0
+
+    def _hill_climb(self, throughput):
+        prev = self._prev_throughput
+        if prev is not None:
+            if throughput < prev * (1 - self.tolerance):
+                self._direction = -self._direction      # got worse - turn around
+            elif throughput <= prev * (1 + self.tolerance):
+                self._direction = -1                    # flat - try fewer workers
+        step = max(1, round(self._concurrency * self.step_ratio))
+        new_concurrency = self._concurrency + self._direction * step
+        # bounce off the bounds, otherwise we'd keep measuring the same setting
+        if new_concurrency >= self.max_workers:
+            self._direction = -1
+        elif new_concurrency <= self.min_workers:
+            self._direction = 1
+        return new_concurrency
+
+    def _aimd(self, throughput, avg_latency):
+        if self._min_latency is None or avg_latency < self._min_latency:
+            self._min_latency = avg_latency
+        prev = self._prev_throughput
+        congested = (avg_latency > self._min_latency * (1 + self.latency_tolerance)
+                     or (prev is not None and throughput < prev * (1 - self.tolerance)))
+        if congested:
+            return int(self._concurrency * self.decrease_factor)
+        return self._concurrency + self.increase
+
+    def throughput_curve(self):
+        '''
+        Average measured throughput (tasks per second) for every concurrency tried
+        '''
+        with self._cond:
+            windows = list(self.history)
+        curve = {}
+        for window in windows:
+            curve.setdefault(window['concurrency'], []).append(window['throughput'])
+        return {c: round(sum(t) / len(t), 3) for c, t in sorted(curve.items())}
+
+    def best_concurrency(self):
+        '''
+        The concurrency with the highest average throughput so far (None before the first window)
+        '''
+        curve = self.throughput_curve()
+        return max(curve, key=curve.get) if curve else None
+
+    def stats(self):
+        return {
+            'kind': self.kind,
+            'policy': self.policy,
+            'completed': self.completed,
+            'concurrency': self._concurrency,
+            'best_concurrency': self.best_concurrency(),
+            'windows': len(self.history),
+        }
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
@@ -0,0 +1,159 @@
+'''
+    Shared HTTP transport for all the scrapers.
+
+    A bare requests.get() (or urllib.request.urlopen()) opens a brand new TCP/TLS connection
+    for every call.  get_session() returns ONE requests.Session per process that:
+
+    - keeps connections alive and pools them per host (pool_maxsize connections per host)
+    - retries failed requests (connection errors, 429 and 5xx responses) with exponential backoff
+    - applies a default timeout to every request, so a dead host can't hang a worker forever
+    - counts requests, new connections and latency, so we can see how many handshakes
+      the connection reuse saves us - see transport_stats()
+
+    Example:
+        from shared.http_session import get_session, transport_stats
+
+        session = get_session()
+        r = session.get('https://en.wikipedia.org/wiki/Toy_Story_3')
+        print(transport_stats())
+'''
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = (5, 30)       # (connect, read) timeout in seconds
+DEFAULT_POOL_CONNECTIONS = 10   # number of hosts to keep a connection pool for
+DEFAULT_POOL_MAXSIZE = 16       # number of keep-alive connections kept per host
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5    # sleeps 0.5s, 1s, 2s ... between retries
+
+
+class TransportStats:
+    '''
+    Thread-safe counters for the shared transport
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+            self.errors = 0
+            self.total_latency = 0.0
+            self.max_latency = 0.0
+
+    def record_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def record_request(self, latency, failed=False):
+        with self._lock:
+            self.requests += 1
+            self.errors += failed
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def as_dict(self):
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                'requests': self.requests,
+                'new_connections': self.new_connections,
+                'reused_connections': reused,
+                'reuse_ratio': round(reused / self.requests, 3) if self.requests else 0.0,
+                'errors': self.errors,
+                'avg_latency': round(self.total_latency / self.requests, 4) if self.requests else 0.0,
+                'max_latency': round(self.max_latency, 4),
+            }
+
+
+_stats = TransportStats()
+
+
+# connection pools that count every new connection they open (i.e. every TCP/TLS handshake)
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _stats.record_connection()
+        return super()._new_conn()
+
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _stats.record_connection()
+        return super()._new_conn()
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    '''
+    HTTPAdapter with a default timeout, connection counting and latency tracking
+    '''
+    def __init__(self, timeout=DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        start = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            _stats.record_request(time.perf_counter() - start, failed=True)
+            raise
+        _stats.record_request(time.perf_counter() - start, failed=not response.ok)
+        return response
+
+
+def create_session(pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                   retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR,
+                   timeout=DEFAULT_TIMEOUT):
+    '''
+    Build a new pooled keep-alive session.  Most code should call get_session() instead,
+    so that every scraper shares the same connection pools.
+    '''
+    retry = Retry(total=retries, backoff_factor=backoff_factor,
+                  status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=('GET', 'HEAD'),
+                  raise_on_status=False)
+    adapter = PooledHTTPAdapter(timeout=timeout, pool_connections=pool_connections,
+                                pool_maxsize=pool_maxsize, pool_block=True, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session(**kwargs):
+    '''
+    Return the process-wide shared session, creating it on first use.  Keyword arguments
+    (pool size, retries, timeout, ...) are only used when the session is first created.
+    '''
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session(**kwargs)
+        return _session
+
+
+def transport_stats():
+    '''
+    Connection-reuse and latency counters of the shared transport, as a dict
+    '''
+    return _stats.as_dict()
@@ -0,0 +1,109 @@
+'''
+    A small local HTTP stand-in for benchmarking the scrapers without touching the internet.
+
+    LocalHTTPServer serves a dict of {path: bytes} from a background thread, with an optional
+    artificial delay per request to simulate the round trip time to a real server.
+
+    Example:
+        pages = {'/wiki/Toy_Story_3': b'<html>...</html>'}
+        with LocalHTTPServer(pages, delay=0.05) as server:
+            requests.get(server.url('/wiki/Toy_Story_3'))
+'''
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import hashlib
+from pathlib import Path
+import socket
+import threading
+import time
+
+
+def load_saved_pages(pages_dir, prefix='/wiki/'):
+    '''
+    Map every saved "<name>.html" file in pages_dir to the url path "<prefix><name>"
+    '''
+    return {f'{prefix}{f.stem}': f.read_bytes() for f in sorted(Path(pages_dir).glob('*.html'))}
+
+
+class LocalHTTPServer:
+    def __init__(self, pages, delay=0.0, content_type='text/html; charset=utf-8'):
+        self.pages = pages
+        self.delay = delay
+        self.content_type = content_type
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 so that clients can keep connections alive between requests
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # headers and body are written separately - without TCP_NODELAY a kept-alive
+                # connection stalls on delayed ACKs and the benchmark measures that instead
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_GET(self):
+                with server._lock:
+                    server.request_count += 1
+                if server.delay:
+                    time.sleep(server.delay)
+
+                body = server.pages.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                # answer conditional GETs like a real server would
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', server.content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            # keep the benchmark output clean - don't log every request to stderr
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, path):
+        return f'{self.base_url}{path}'
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,121 @@
+'''
+    Benchmark: runtime and peak memory of the hand-written drop() chain of
+    cleanup_dataframe.clean_up_columns() (plus the usual column-by-column dtype conversions)
+    against plan_cleanup() + apply_cleanup(), which drop and convert in one pass.
+
+    The frame is a wide synthetic movie frame: the usual infobox columns, the columns the
+    chain drops by name and position, --sparse columns that are almost always empty (the
+    labels only a few movies have) and a few half-empty ones.  Budget, box office, running
+    time and release date are still unconverted text, as the scraper produces them.
+
+    Peak memory is measured with tracemalloc (numpy and pandas allocations are traced), from a
+    frame that is already loaded - so it is the extra memory the cleanup needs.
+
+    $ python web_scraping/benchmarks/bench_cleanup.py --rows 100000 --sparse 40
+'''
+import argparse
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# make the "modules" package (web_scraping/) importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.cleanup_dataframe import apply_cleanup, clean_up_columns, plan_cleanup
+
+# clean_up_columns() drops columns by position - up to position 34, after dropping 3 by name - so
+# the frame needs 35 + 3 columns: the 24 fixed ones of wide_movie_frame() plus at least 14 sparse
+MIN_SPARSE = 14
+
+
+def wide_movie_frame(rows, sparse, seed=0):
+    rnd = np.random.default_rng(seed)
+
+    def with_nans(values, nan_ratio):
+        values = pd.Series(values, dtype=object)
+        values[rnd.random(rows) < nan_ratio] = np.nan
+        return values
+
+    columns = {
+        'title': [f'# {i:03}: Movie {i}' for i in range(rows)],
+        'wiki_link': [f'/wiki/Movie_{i}' for i in range(rows)],
+        'Directed by': with_nans(rnd.choice(['Some Director', 'Another Director'], rows), 0.02),
+        'Starring': with_nans(rnd.choice(['Actor One', 'Actor Two'], rows), 0.05),
+        'Production company': with_nans(['Walt Disney Pictures'] * rows, 0.1),
+        'Release date': with_nans([f'{d} June {y}' for d, y in zip(rnd.integers(1, 28, rows), rnd.integers(1937, 2023, rows))], 0.01),
+        'Running time': with_nans(rnd.integers(70, 150, rows).astype(str), 0.05),
+        'Country': with_nans(['United States'] * rows, 0.1),
+        'Language': with_nans(['English'] * rows, 0.1),
+        'Budget (US$)': with_nans((rnd.integers(1, 300, rows) * 1e6).astype(str), 0.3),
+        'Box office (US$)': with_nans((rnd.integers(1, 1000, rows) * 1e6).astype(str), 0.2),
+        'Hepburn': with_nans(['Nihongo'] * rows, 0.99),
+        'Languages': with_nans(['English, Spanish'] * rows, 0.95),
+        'Countries': with_nans(['United States, Canada'] * rows, 0.95),
+    }
+    for i in range(10):
+        columns[f'Half empty {i}'] = with_nans([f'value {i}'] * rows, 0.5)
+    for i in range(sparse):
+        columns[f'Rare label {i}'] = with_nans([f'rare {i}'] * rows, 0.97)
+    return pd.DataFrame(columns)
+
+
+def convert_column_by_column(df):
+    # the usual way: one conversion (and one new column) per statement
+    df['Release date'] = pd.to_datetime(df['Release date'], errors='coerce')
+    df['Running time'] = pd.to_numeric(df['Running time'], errors='coerce')
+    df['Budget (US$)'] = pd.to_numeric(df['Budget (US$)'], errors='coerce')
+    df['Box office (US$)'] = pd.to_numeric(df['Box office (US$)'], errors='coerce')
+    return df
+
+
+def chain(df):
+    return convert_column_by_column(clean_up_columns(df))
+
+
+def planned(df):
+    return apply_cleanup(df, plan_cleanup(df))
+
+
+def measure(fn, df, repeat):
+    # clean_up_columns() drops inplace - every run gets its own copy, made outside the measurement
+    times = []
+    for _ in range(repeat):
+        frame = df.copy()
+        start = time.perf_counter()
+        fn(frame)
+        times.append(time.perf_counter() - start)
+    frame = df.copy()
+    tracemalloc.start()
+    result = fn(frame)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--sparse', type=int, default=40, help=f'number of almost empty columns (at least {MIN_SPARSE})')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    if args.sparse < MIN_SPARSE:
+        parser.error(f'--sparse must be at least {MIN_SPARSE}: clean_up_columns() drops columns up to position 34')
+
+    df = wide_movie_frame(args.rows, args.sparse)
+    frame_mb = df.memory_usage(deep=True).sum() / 1e6
+    print(f'{args.rows} rows x {df.shape[1]} columns ({frame_mb:.0f} MB)\n')
+    plan = plan_cleanup(df)
+    print(f'plan: drop {len(plan.drop)} columns, convert {", ".join(plan.coerce)}\n')
+
+    print(f'{"":<28} {"time":>8} {"peak memory":>12} {"columns":>8}')
+    for name, fn in [('drop() chain + conversions', chain), ('plan + apply (one pass)', planned)]:
+        seconds, peak, result = measure(fn, df, args.repeat)
+        print(f'{name:<28} {seconds:>7.3f}s {peak / 1e6:>9.1f} MB {result.shape[1]:>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+'''
+    Benchmark: serial get_info_box() loop vs. the asyncio fetch engine, with the pages parsed
+    on the I/O threads and on a ProcessPoolExecutor (two-stage pipeline).
+
+    Both run against a local HTTP stand-in (shared/local_http_server.py) so the numbers do
+    not depend on wikipedia.  Pass a folder of saved movie pages ("<Title>.html") with
+    --pages-dir; without it synthetic movie pages (synthetic_pages.py) are served.
+
+    $ python web_scraping/benchmarks/bench_fetch_engine.py --pages 100 --delay 0.05
+'''
+import argparse
+import concurrent.futures
+import os
+from pathlib import Path
+import sys
+import time
+
+# make the "modules" package (web_scraping/) and the "shared" package (repo root) importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from modules.fetch_engine import crawl_movie_pages
+from modules.processing_data import get_info_box
+from shared.http_session import transport_stats
+from shared.local_http_server import LocalHTTPServer, load_saved_pages
+from synthetic_pages import synthetic_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages-dir', help='folder with saved movie pages (*.html)')
+    parser.add_argument('--pages', type=int, default=100, help='number of synthetic pages')
+    parser.add_argument('--delay', type=float, default=0.05, help='simulated server latency (seconds)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=1000.0, help='token bucket rate (requests/second)')
+    parser.add_argument('--filler', type=int, default=0, help='filler paragraphs per synthetic page (more parse work)')
+    args = parser.parse_args()
+
+    if args.pages_dir:
+        pages = load_saved_pages(args.pages_dir)
+    else:
+        pages = synthetic_corpus(args.pages, filler_paragraphs=args.filler)
+
+    with LocalHTTPServer(pages, delay=args.delay) as server:
+        movie_links = [(indx, server.url(path)) for indx, path in enumerate(pages, start=1)]
+
+        start = time.perf_counter()
+        serial = [get_info_box(indx, href) for indx, href in movie_links]
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        threaded = crawl_movie_pages(movie_links, max_concurrency=args.concurrency,
+                                     rate=args.rate, burst=args.concurrency)
+        concurrent_time = time.perf_counter() - start
+
+        parse_workers = os.cpu_count() or 1
+        with concurrent.futures.ProcessPoolExecutor(parse_workers) as parse_pool:
+            start = time.perf_counter()
+            pipelined = crawl_movie_pages(movie_links, max_concurrency=args.concurrency,
+                                          rate=args.rate, burst=args.concurrency, parse_executor=parse_pool,
+                                          parse_workers=parse_workers)
+            pipelined_time = time.perf_counter() - start
+
+    assert serial == threaded == pipelined, 'fetch engine results differ from the serial loop'
+
+    print(f'{len(movie_links)} pages, {args.delay}s simulated latency')
+    print(f'{"serial get_info_box loop":<28}: {serial_time:8.3f} s')
+    print(f'{f"fetch engine (x{args.concurrency})":<28}: {concurrent_time:8.3f} s')
+    print(f'{"  + process pool parsing":<28}: {pipelined_time:8.3f} s')
+    print(f'{"speedup":<28}: {serial_time / concurrent_time:8.2f}x / {serial_time / pipelined_time:.2f}x')
+    print(f'transport: {transport_stats()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+'''
+    Benchmark: memory footprint and time-to-DataFrame of the movie data as a list of infobox
+    dicts (what main.py builds) against a list of MovieRecords (modules/movie_schema.py).
+
+    The movies are synthetic pages (synthetic_pages.py) parsed with parse_info_box().  Real
+    infoboxes differ from page to page, so every movie also gets a few of --rare-labels rare
+    labels and some alias labels ("Countries", "Production companies") - with the default
+    settings the dicts carry a few hundred distinct keys, as the real Disney list does.
+
+    - footprint: memory held by the list once it is built (tracemalloc), the movies loaded
+      from JSON text so that every record has its own strings
+    - dicts -> DataFrame: format_budget_and_gross_batch() + format_release_dates_batch() +
+      pd.DataFrame(), the path of main.py
+    - records -> DataFrame: to_records() + records_to_dataframe()
+
+    $ python web_scraping/benchmarks/bench_movie_schema.py --records 20000
+'''
+import argparse
+import json
+from pathlib import Path
+import random
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+# make the "modules" package (web_scraping/) and the "shared" package (repo root) importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from modules.budget_gross_conversion import format_budget_and_gross_batch
+from modules.date_conversion import format_release_dates_batch
+from modules.movie_schema import records_to_dataframe, to_records
+from modules.processing_data import parse_info_box
+from synthetic_pages import synthetic_corpus
+
+ALIASES = {'Country': 'Countries', 'Language': 'Languages', 'Production company': 'Production companies'}
+
+
+def movie_dicts_json(count, rare_labels, seed=0):
+    rnd = random.Random(seed)
+    pages = synthetic_corpus(min(count, 500))
+    parsed = [parse_info_box(indx, path, content) for indx, (path, content) in enumerate(pages.items(), start=1)]
+    movies = []
+    for i in range(count):
+        movie = dict(parsed[i % len(parsed)])
+        for label, alias in ALIASES.items():
+            if rnd.random() < 0.3:
+                movie[alias] = [movie.pop(label), 'Other']
+        for _ in range(rnd.randint(0, 5)):
+            movie[f'Rare label {rnd.randrange(rare_labels)}'] = f'rare value {rnd.randrange(1000)}'
+        movies.append(movie)
+    return json.dumps(movies)
+
+
+def footprint(build):
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, result
+
+
+def dicts_to_dataframe(movies):
+    format_budget_and_gross_batch(movies)
+    format_release_dates_batch(movies)
+    return pd.DataFrame(movies)
+
+
+def records_dataframe(movies):
+    return records_to_dataframe(to_records(movies))
+
+
+def best_time(fn, text, repeat):
+    # every run converts freshly loaded dicts - the loading itself is not timed
+    times = []
+    for _ in range(repeat):
+        movies = json.loads(text)
+        start = time.perf_counter()
+        df = fn(movies)
+        times.append(time.perf_counter() - start)
+    return min(times), df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=20_000)
+    parser.add_argument('--rare-labels', type=int, default=300, help='size of the pool of rare infobox labels')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    text = movie_dicts_json(args.records, args.rare_labels)
+    dict_bytes, movies = footprint(lambda: json.loads(text))
+    keys = len({key for movie in movies for key in movie})
+    del movies
+    record_bytes, records = footprint(lambda: to_records(json.loads(text)))
+    del records
+
+    print(f'{args.records} movies, {keys} distinct infobox labels\n')
+    print(f'{"":<12} {"footprint":>10} {"-> DataFrame":>13} {"columns":>8} {"frame memory":>13}')
+    for name, size, fn in [('dicts', dict_bytes, dicts_to_dataframe), ('MovieRecords', record_bytes, records_dataframe)]:
+        seconds, df = best_time(fn, text, args.repeat)
+        frame_mb = df.memory_usage(deep=True).sum() / 1e6
+        print(f'{name:<12} {size / 1e6:>7.1f} MB {seconds:>12.3f}s {df.shape[1]:>8} {frame_mb:>10.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
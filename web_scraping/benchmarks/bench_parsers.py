@@ -0,0 +1,74 @@
+'''
+    Benchmark: infobox parsing backends of processing_data.parse_info_box().
+
+    Parses every page of a corpus with each installed backend ('html.parser', 'lxml',
+    'selectolax'), checks that all backends produce identical movie_info dicts and prints
+    the time per page.  The corpus always gets a few extra pages with non-ASCII text and no
+    <meta charset>, so the check also covers how each backend decodes the bytes.
+
+    Corpus: a folder of saved movie pages (--pages-dir, "*.html") or synthetic pages padded
+    with --filler paragraphs of body text to mimic the size of a real wikipedia article.
+
+    $ python web_scraping/benchmarks/bench_parsers.py --pages 200 --filler 300
+'''
+import argparse
+from pathlib import Path
+import sys
+import time
+
+# make the "modules" package (web_scraping/) and the "shared" package (repo root) importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from modules.processing_data import available_backends, parse_info_box
+from shared.local_http_server import load_saved_pages
+from synthetic_pages import synthetic_corpus, synthetic_movie_page
+
+
+def parse_corpus(pages, backend):
+    results = []
+    for indx, (path, content) in enumerate(pages.items(), start=1):
+        try:
+            results.append(parse_info_box(indx, path, content, backend=backend))
+        except Exception as e:
+            # TV shows / pages without an infobox - every backend must fail the same way
+            results.append(str(e))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages-dir', help='folder with saved movie pages (*.html)')
+    parser.add_argument('--pages', type=int, default=200, help='number of synthetic pages')
+    parser.add_argument('--filler', type=int, default=300, help='filler paragraphs per synthetic page')
+    parser.add_argument('--repeat', type=int, default=3, help='best of N runs')
+    args = parser.parse_args()
+
+    if args.pages_dir:
+        pages = load_saved_pages(args.pages_dir)
+    else:
+        pages = synthetic_corpus(args.pages, filler_paragraphs=args.filler)
+    for i in range(3):
+        pages[f'/wiki/No_charset_{i}'] = synthetic_movie_page(f'Film {i} – Ü', seed=i, meta_charset=False)
+    avg_kb = sum(map(len, pages.values())) / len(pages) / 1024
+    print(f'{len(pages)} pages, {avg_kb:.1f} KB per page on average\n')
+
+    reference = None
+    baseline = None
+    for backend in reversed(available_backends()):  # 'html.parser' first - it is the reference
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = parse_corpus(pages, backend)
+            timings.append(time.perf_counter() - start)
+
+        if reference is None:
+            reference, baseline = results, min(timings)
+        assert results == reference, f'{backend} results differ from html.parser'
+
+        best = min(timings)
+        print(f'{backend:<12}: {best:7.3f} s  ({best / len(pages) * 1000:6.2f} ms/page, {baseline / best:5.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+'''
+    Benchmark: file size, write time and load-to-DataFrame time of the movie data in the
+    formats main.py has used - JSON, pickle, CSV - against the streaming JSON Lines and the
+    columnar Parquet and Arrow IPC writers of file_save_and_load.py.
+
+    The records are synthetic movies (synthetic_pages.py) run through the same budget / box
+    office / release date conversions as main.py, replicated up to --records rows.
+
+    "load" means getting back to a DataFrame with the release dates as datetime64:
+    - JSON / JSON Lines (dates written as ISO strings) and CSV need the dates parsed again
+    - pickle needs the list of dicts turned into a DataFrame
+    - parquet and arrow load straight into typed columns
+
+    $ python web_scraping/benchmarks/bench_serialization.py --records 50000
+'''
+import argparse
+import json
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# make the "modules" package (web_scraping/) and the "shared" package (repo root) importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from modules.budget_gross_conversion import format_budget_and_gross_batch
+from modules.date_conversion import format_release_dates_batch
+from modules.file_save_and_load import iter_movie_jsonl_data, load_movie_arrow_data, load_movie_parquet_data, \
+     load_movie_pickle_data, save_movie_arrow_data, save_movie_jsonl_data, save_movie_parquet_data, \
+     save_movie_pickle_data
+from modules.processing_data import parse_info_box
+from synthetic_pages import synthetic_corpus
+
+
+def build_records(count):
+    pages = synthetic_corpus(min(count, 500))
+    movies = [parse_info_box(indx, path, content) for indx, (path, content) in enumerate(pages.items(), start=1)]
+    format_budget_and_gross_batch(movies)
+    format_release_dates_batch(movies)
+    return [dict(movies[i % len(movies)]) for i in range(count)]
+
+
+def save_json(fname, movies):
+    with fname.open('w') as f:
+        json.dump(movies, f, ensure_ascii=False, default=str)
+
+def load_json(fname):
+    with fname.open() as f:
+        df = pd.DataFrame(json.load(f))
+    df['Release date'] = pd.to_datetime(df['Release date'])
+    return df
+
+def load_jsonl(fname):
+    df = pd.DataFrame(iter_movie_jsonl_data(fname))
+    df['Release date'] = pd.to_datetime(df['Release date'])
+    return df
+
+def save_csv(fname, movies):
+    pd.DataFrame(movies).to_csv(fname, index=False)
+
+def load_csv(fname):
+    return pd.read_csv(fname, parse_dates=['Release date'])
+
+def load_pickle(fname):
+    return pd.DataFrame(load_movie_pickle_data(fname))
+
+
+FORMATS = {
+    'json':    ('movies.json', save_json, load_json),
+    'jsonl':   ('movies.jsonl', save_movie_jsonl_data, load_jsonl),
+    'jsonl.gz': ('movies.jsonl.gz', save_movie_jsonl_data, load_jsonl),
+    'pickle':  ('movies.pickle', save_movie_pickle_data, load_pickle),
+    'csv':     ('movies.csv', save_csv, load_csv),
+    'parquet': ('movies.parquet', save_movie_parquet_data, load_movie_parquet_data),
+    'arrow':   ('movies.arrow', save_movie_arrow_data, load_movie_arrow_data),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=20000)
+    args = parser.parse_args()
+
+    movies = build_records(args.records)
+    print(f'{len(movies)} records\n')
+    print(f'{"format":<9} {"size (KB)":>10} {"write (s)":>10} {"load (s)":>10}  dates')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (file_name, save, load) in FORMATS.items():
+            fname = Path(tmp) / file_name
+
+            start = time.perf_counter()
+            save(fname, movies)
+            write_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            df = load(fname)
+            load_time = time.perf_counter() - start
+
+            size_kb = fname.stat().st_size / 1024
+            print(f'{name:<9} {size_kb:>10.1f} {write_time:>10.3f} {load_time:>10.3f}  {df["Release date"].dtype}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+'''
+    Benchmark: requests saved by the URL frontier on a large list page, and the cost of its
+    set / Bloom filter dedup.
+
+    The link set is synthetic: --articles distinct articles, each linked --links-per-article
+    times on average in the spellings real list pages use - plain, with a #fragment, through
+    the mobile host, percent-encoded, with main.py's old "https://en.wikipedia.org//wiki/..."
+    double slash - and --redirect-rate of the articles also linked through a redirect alias
+    known from an earlier run.
+
+    - old main.py: every href became f"https://en.wikipedia.org/{path}" and was fetched
+    - exact string dedup: a set of those urls
+    - URLFrontier: canonicalized (and with the aliases of an earlier run), set or Bloom filter
+
+    $ python web_scraping/benchmarks/bench_url_frontier.py --articles 50000
+'''
+import argparse
+from pathlib import Path
+import random
+import sys
+import time
+import tracemalloc
+from urllib.parse import quote
+
+# make the "modules" package (web_scraping/) and the "shared" package (repo root) importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from modules.url_frontier import URLFrontier, canonicalize_url
+
+LIST_URL = 'https://en.wikipedia.org/wiki/List_of_films'
+
+
+def spellings(title):
+    return [
+        f'/wiki/{title}',
+        f'/wiki/{title}#Plot',
+        f'https://en.m.wikipedia.org/wiki/{title}',
+        f'/wiki/{quote(title.replace("_", " "))}',
+        f'//en.wikipedia.org/wiki/{title}#Cast',
+    ]
+
+
+def synthetic_links(articles, links_per_article, redirect_rate, seed=0):
+    rnd = random.Random(seed)
+    titles = [f"Film_{i}_({rnd.randint(1937, 2023)}_film)" for i in range(articles)]
+    hrefs, aliases = [], {}
+    for title in titles:
+        hrefs.append(f'/wiki/{title}')
+        for _ in range(rnd.randint(0, 2 * (links_per_article - 1))):
+            hrefs.append(rnd.choice(spellings(title)))
+        if rnd.random() < redirect_rate:
+            alias = f'/wiki/{title}_(redirect)'
+            hrefs.append(alias)
+            # what record_page() learned in an earlier run
+            aliases[canonicalize_url(alias, LIST_URL)] = canonicalize_url(f'/wiki/{title}', LIST_URL)
+    rnd.shuffle(hrefs)
+    return hrefs, aliases
+
+
+def old_main_urls(hrefs):
+    return [f"https://en.wikipedia.org/{href}" for href in hrefs]
+
+
+def run_frontier(hrefs, aliases, dedup, capacity):
+    frontier = URLFrontier(dedup=dedup, capacity=capacity, aliases=aliases)
+    for href in hrefs:
+        frontier.add(href, base=LIST_URL)
+    return len(frontier.drain())
+
+
+def measure(fn):
+    # timed on its own - tracemalloc slows every allocation down - then run again for the peak memory
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=50_000)
+    parser.add_argument('--links-per-article', type=int, default=3, help='average number of links to one article')
+    parser.add_argument('--redirect-rate', type=float, default=0.1)
+    args = parser.parse_args()
+
+    hrefs, aliases = synthetic_links(args.articles, args.links_per_article, args.redirect_rate)
+    print(f'{len(hrefs)} links to {args.articles} articles, {len(aliases)} known redirect aliases\n')
+    print(f'{"":<24} {"requests":>9} {"extra":>7} {"time":>8} {"peak memory":>12}')
+    variants = [
+        ('old main.py', lambda: len(old_main_urls(hrefs))),
+        ('exact string dedup', lambda: len(set(old_main_urls(hrefs)))),
+        ('URLFrontier (set)', lambda: run_frontier(hrefs, aliases, 'set', args.articles)),
+        ('URLFrontier (bloom)', lambda: run_frontier(hrefs, aliases, 'bloom', args.articles)),
+    ]
+    for name, fn in variants:
+        requests, seconds, peak = measure(fn)
+        print(f'{name:<24} {requests:>9} {requests - args.articles:>+7} {seconds:>7.3f}s {peak / 1e6:>9.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+'''
+    Synthetic wikipedia-like movie pages for the benchmarks.
+
+    Real pages are best (save them into a folder and pass --pages-dir to the benchmarks), but
+    these cover every infobox shape that get_dict_val() handles - "<li>" lists, "<br>" lists,
+    running time, footnote <sup> tags, the hidden "bday dtstart published updated" date span -
+    wrapped in a page body of realistic size.
+'''
+import random
+
+FILLER_PARAGRAPH = ('<p>The film was produced by the studio and released to theaters '
+                    '<a href="/wiki/Some_Link">some link</a><sup class="reference">[{n}]</sup> '
+                    'with a score by <b>a composer</b> and received generally positive '
+                    'reviews from critics.</p>\n')
+
+
+def synthetic_movie_page(title, seed=0, filler_paragraphs=0, meta_charset=True):
+    rnd = random.Random(seed)
+    budget = rnd.choice(['$12 million', '$1.2–1.5 million', '$790,000', '$150–200 million',
+                         '$3.5 to 4 million', 'N/A'])
+    box_office = rnd.choice(['$1.067 billion', '$418 million', '$8.5 million', '$1-2 billion'])
+    day = rnd.randint(1, 28)
+    month = rnd.choice(['January', 'March', 'June', 'November'])
+    year = rnd.randint(1937, 2023)
+    release = rnd.choice([
+        f'<ul><li>{month} {day}, {year}<span style="display:none"> (<span class="bday dtstart published updated">{year}-01-01</span>)</span> (Los Angeles)</li>'
+        f'<li>{month} {day + 1}, {year} (United States)</li></ul>',
+        f'{day} {month} {year}<sup>[2]</sup>',
+    ])
+    filler = ''.join(FILLER_PARAGRAPH.format(n=n) for n in range(filler_paragraphs))
+    # without the <meta charset> a parser has to be told the bytes are utf-8
+    meta = '<meta charset="UTF-8">' if meta_charset else ''
+
+    return f'''<!DOCTYPE html>
+<html><head>{meta}<title>{title} - Wikipedia</title></head><body>
+<div id="content"><h1>{title}</h1>
+<table class="infobox vevent"><tbody>
+<tr><th colspan="2" class="infobox-above summary">{title}</th></tr>
+<tr><td colspan="2"><a href="/wiki/File:Poster.jpg"><img src="poster.jpg"></a></td></tr>
+<tr><th class="infobox-label">Directed by</th><td class="infobox-data">Some\xa0Director<sup class="reference">[1]</sup></td></tr>
+<tr><th class="infobox-label">Screenplay by</th><td class="infobox-data">Writer One<br>Writer Two</td></tr>
+<tr><th class="infobox-label">Starring</th><td class="infobox-data"><div class="plainlist"><ul><li>Actor\xa0One</li><li>Actor Two</li><li>Actor Three</li></ul></div></td></tr>
+<tr><th class="infobox-label">Production<br>company</th><td class="infobox-data">Walt Disney Pictures</td></tr>
+<tr><th class="infobox-label">Release date</th><td class="infobox-data">{release}</td></tr>
+<tr><th class="infobox-label">Running time</th><td class="infobox-data">{rnd.randint(60, 150)} minutes</td></tr>
+<tr><th class="infobox-label">Country</th><td class="infobox-data">United States</td></tr>
+<tr><th class="infobox-label">Language</th><td class="infobox-data">English</td></tr>
+<tr><th class="infobox-label">Budget</th><td class="infobox-data">{budget}<sup class="reference">[3]</sup></td></tr>
+<tr><th class="infobox-label">Box office</th><td class="infobox-data">{box_office}<sup class="reference">[4]</sup></td></tr>
+</tbody></table>
+{filler}
+</div></body></html>'''.encode()
+
+
+def synthetic_corpus(count, filler_paragraphs=0):
+    '''
+    {url path: page bytes} for count synthetic movies
+    '''
+    return {f'/wiki/Movie_{i}': synthetic_movie_page(f'Movie {i}', seed=i, filler_paragraphs=filler_paragraphs)
+            for i in range(count)}
@@ -11,174 +11,222 @@
 # ========================
 
 ## %%
+import concurrent.futures
+import os
 from pathlib import Path
+import sys
 import time
-import pandas as pd
-import requests
 
-from bs4 import BeautifulSoup as bs
+# put the repo root on sys.path for the "shared" package
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from shared.http_session import transport_stats
 
 # import submodules all on the same path
 
-from modules.budget_gross_conversion import format_budget_and_gross
-from modules.date_conversion import date_conversion, format_date_final
-from modules.processing_data import get_info_box
-from modules.file_save_and_load import load_movie_json_data, load_movie_pickle_data, \
-     save_movie_json_data, save_movie_pickle_data
+from modules.budget_gross_conversion import format_budget_and_gross_batch
+from modules.checkpoint_journal import CheckpointJournal
+from modules.cleanup_dataframe import apply_cleanup, format_plan, plan_cleanup
+from modules.date_conversion import format_release_dates_batch
+from modules.fetch_engine import crawl_movie_pages
+from modules.file_save_and_load import load_movie_parquet_data, save_movie_json_data, save_movie_parquet_data
+from modules.movie_schema import records_to_dataframe, to_records
+from modules.response_cache import ResponseCache
+from modules.run_metrics import RunMetrics
+from modules.scraper import DISNEY_FILMS, movies_by_source, plan_scrape
+from modules.url_frontier import URLFrontier
 
 # file names and their paths
 json_file_name = 'disney_test_all.json'
-final_json_file_name = 'disney_movies_final.json'
 json_file = Path(Path(__file__).parent/json_file_name) # jsonfile
-final_json_file_ = Path(Path(__file__).parent/final_json_file_name) # jsonfile
-pickle_file = Path(Path.cwd()/'disney_movie.pickle')    # pickle file
-
-
-
-## %%
-dis_movies_url = 'https://en.wikipedia.org/wiki/List_of_Walt_Disney_Pictures_films'
-
-#  do request.get to disney movies wiki page to get the webpage html and convert to BeautifulSoup
-
-# start_time = time.perf_counter()
-
-r = requests.get(dis_movies_url)
-
-if r.ok:
-    disney_soup = bs(r.content, 'html.parser')
-
-# getting movies info - we want to get all movies
-# movies are grouped by decades and are in table with class = "wikitable sortable jquery-tablesorter"
-# Using select() I slowly expand the selection to include the whole class name and stop at
-# "wikitable sortable" - if I included "query-tablesorter" for some reason it gives me an empty list
-# the following select() yields 12 items - each item for ever decade between 1930s-2020s
-#         disney_movies = dis_movies.select("table.wikitable.sortable ")  # this returns 12 items
-
-# but we need ALL movies regardless of the year - reviewing the HTML source I noticed that the movies are inside
-# an italics tag, so we expand the select to include the <i> tag as follows, and that returns 518 items
-#         disney_movies = disney_soup.select("table.wikitable.sortable i")  # this returns 518 items
-
-# the task  is to get the href link of each of the 518 movies and the movie title
-# run the following list comprehensions to check if there are any movie that doesnt have either the link or title
-#        movie_titles = [movie.get_text().strip() if movie.get_text().strip() else 'None' for movie in disney_movies]
-#        movie_links = [movie.a['href'] if movie.select_one("a") else 'None' for movie in disney_movies]
-
-# running the above link, we found all movies have the get_text() info, but 9 movies do not have links
-#         print(movie_titles.count("None"), movie_links.count("None"))   # returns 0 for missing titles, 9 for missing links
-
-# so in light of this discovery, we decide to skip those movies that do not have links
-# update the select() one more time to include the <a> tags (<a> tag holds the each movie's wiki page link)
-disney_movies = disney_soup.select(".wikitable.sortable i a")
-
-
-## %% Grab the details of each Disney movie and add to movie_info_list
-start_time = time.perf_counter()
-
-movie_info_list = []
-
-for index, movie in enumerate(disney_movies):
-    # impose a 25-second sleep timer  break after processing 100 movie transactions so as to not overwhelm wikipedia
-    if index > 0 and index % 100 == 0: # let python take a break by setting a 25 second sleep timer
-        time.sleep(25)
-    
-    ## I choose one the following if statements to just pull specific number of data 
-    # if index == 50:
-    #     break
-    # if index < 490:
-    #     continue
-    # elif index == 505:
-    #     break
-    try:
-        path = movie['href']
-        full_path = f"https://en.wikipedia.org/{path}"
-        movie_info_list.append(get_info_box(index+1, full_path))
-
-    except Exception as e:
-        print(f"\n{movie.get_text()}")
-        print(e)
-
-end_time = time.perf_counter()
-
-print(f"\n\nProcess Completed: {end_time - start_time}")
-
-# check number of movie records in the list
-print(f"\n\n{len(movie_info_list) = }")
-
-
-
-## %%
-# write the current state of movie_info_list to a json file:
-save_movie_json_data(json_file, movie_info_list)
-# after saving the json data to a file, let's read the json data again
-json_data_var = load_movie_json_data(json_file)
-
-## %%
-# check that json_data_var is exactly the same as movie_info_list (it should be)
-# then throw away (delete) the json_data_var variable. If not, then it means our
-# 'save and load json' methods are incorrect and must be fixed,
-if movie_info_list == json_data_var:  # this should always be true
-    del json_data_var  # no need to keep this variable for longer
-
-#  update "budget", "Box office", and "Release date" values
-for movie in movie_info_list:
-    format_budget_and_gross(movie)
-    # convert the release date value to a datetime object
-    movie['Release date'] = date_conversion(movie.get('Release date', 'N/A'))
-
-# now lets save the movie data once more - but because we just changed the release date value t a 
-# python datetime object, and writing a python datetime object to JSON throws the following error:
-#
-#         datetime.datetime is not JSON serializable
-#
-# Python provides a module called pickle to serialize and deserialize data. We can write to a  
-# pickle file instead.  Note that pickle is Python-specific thus pickle files can ONLY be processed
-# by python, unlike JSON files which can be read and processed using other languages like Java, PHP, etc.
-save_movie_pickle_data(pickle_file, movie_info_list)
-
-## %%
-# after saving the pickled JSON data to a file, let's read the pickle file just to 
-# confirm that our 'save and load pickle data' functions are working properly.
-pickled_json_data = load_movie_pickle_data(pickle_file)
-
-## %%
-# compare pickle_data with movie_info_list - they should be the same,
-# otherwise we need to fix our 'save and load pickle data' functions
-if movie_info_list != pickled_json_data:
-    print("PICKLE DATA NOT MATCHED - fix 'save and load pickle data' functions")
-else:
-    print("Pickle data successfully saved and re-loaded")
-
-# we read back the pickled JSON data AND convert the datetime object to "<MONTH NAME> DD, YYYY" string format
-for item in pickled_json_data:
-    if item.get('Release date'):
-        date_obj = item.get('Release date')
-        item['Release date'] = format_date_final(date_obj)
-
-
-## %% - this pickle_json_data is now  JSON-ready after date format has been completed
-# final_json_file_name = 'disney_movies_final.json'
-# final_json_file_ = Path(Path(__file__).parent/final_json_file_name) # jsonfile
-
-# save_movie_json_data(final_json_file_, pickled_json_data)
-# final_movie_list = load_movie_json_data(final_json_file_)
-
-## %%
-
-#--- BONUS - PANDAS DATAFRAME
-# lets pick up the data stored in the pickle file
-# We are reading from the pickle_file instead of the final_json_file because pickle file can store the
-# python datetime objects unlike json files.
-pickled_data = load_movie_pickle_data(pickle_file)
-df = pd.DataFrame(pickled_data)
-## %%
-final_movies_csv_file = Path(Path(__file__).parent/'final_movies_list.csv') # jsonfile
-
-# write dataframe to csv file
-df.to_csv(final_movies_csv_file)
-## %%
-df_dtypes = df.dtypes
-print(df_dtypes)
-
-# end_time = time.perf_counter()
-
-# print(f"\n\nProcess Completed: {end_time - start_time}")
+parquet_file = Path(Path(__file__).parent/'disney_movies.parquet')    # typed, columnar movie data
+typed_parquet_file = Path(Path(__file__).parent/'disney_movies_typed.parquet')  # the movies on the fixed schema of movie_schema.py
+http_cache_dir = Path(Path(__file__).parent/'.http_cache')  # on-disk cache of downloaded pages
+journal_file = Path(Path(__file__).parent/'disney_crawl_journal.jsonl')  # checkpoint journal of finished movies
+run_report_file = Path(Path(__file__).parent/'run_report.json')  # timings, counters and errors of the last run
+url_aliases_file = Path(Path(__file__).parent/'url_aliases.json')  # redirect urls found by earlier runs
+
+# with RESUME = True a rerun after a crash only crawls the movies missing from the journal,
+# set it to False to throw the journal away and crawl every movie again
+RESUME = True
+
+# set OFFLINE = True to rerun the parsing and cleaning stages from the response cache only (no network)
+OFFLINE = False
+# cached pages younger than this are reused without even a conditional GET to wikipedia
+CACHE_MAX_AGE = 24 * 60 * 60
+
+
+# everything below runs under the "__main__" guard - the movie pages are parsed by a
+# ProcessPoolExecutor, and its worker processes must be able to import this module
+# without starting a crawl of their own (same pattern as multi-processing/mp_pool_executor.py)
+if __name__ == '__main__':
+
+    ## %%
+    # the list(s) of films to scrape - see modules/scraper.py to add another wikipedia list of films,
+    # e.g. SOURCES = [DISNEY_FILMS, FilmListSource('animation', 'https://en.wikipedia.org/wiki/List_of_...')]
+    # a film that is on more than one list is only crawled once
+    SOURCES = [DISNEY_FILMS]
+
+    # pages are read through the response cache - a rerun only revalidates them with conditional GETs
+    response_cache = ResponseCache(http_cache_dir, max_age=CACHE_MAX_AGE, offline=OFFLINE)
+
+    # getting movies info - we want to get all movies
+    # movies are grouped by decades and are in table with class = "wikitable sortable jquery-tablesorter"
+    # Using select() I slowly expand the selection to include the whole class name and stop at
+    # "wikitable sortable" - if I included "query-tablesorter" for some reason it gives me an empty list
+    # the following select() yields 12 items - each item for ever decade between 1930s-2020s
+    #         disney_movies = dis_movies.select("table.wikitable.sortable ")  # this returns 12 items
+
+    # but we need ALL movies regardless of the year - reviewing the HTML source I noticed that the movies are inside
+    # an italics tag, so we expand the select to include the <i> tag as follows, and that returns 518 items
+    #         disney_movies = disney_soup.select("table.wikitable.sortable i")  # this returns 518 items
+
+    # the task  is to get the href link of each of the 518 movies and the movie title
+    # run the following list comprehensions to check if there are any movie that doesnt have either the link or title
+    #        movie_titles = [movie.get_text().strip() if movie.get_text().strip() else 'None' for movie in disney_movies]
+    #        movie_links = [movie.a['href'] if movie.select_one("a") else 'None' for movie in disney_movies]
+
+    # running the above link, we found all movies have the get_text() info, but 9 movies do not have links
+    #         print(movie_titles.count("None"), movie_links.count("None"))   # returns 0 for missing titles, 9 for missing links
+
+    # so in light of this discovery, we decide to skip those movies that do not have links
+    # update the select() one more time to include the <a> tags (<a> tag holds the each movie's wiki page link)
+    # - that ".wikitable.sortable i a" selector is now the link_selector of DISNEY_FILMS (modules/scraper.py)
+
+
+    ## %% Grab the details of each Disney movie and add to movie_info_list
+    start_time = time.perf_counter()
+
+    # every stage below is timed, and the crawl records the fetch / parse time of each page and the
+    # errors by category - all of it goes into run_report.json at the end (see modules/run_metrics.py)
+    metrics = RunMetrics()
+
+    # download the list pages and number every movie link with its 1-based index - the index is used
+    # for the "# 001: Title" numbering.  movie_links holds (index, url, parse function) of each film.
+    # The links go through a URL frontier that canonicalizes them (no more "https://en.wikipedia.org//wiki/..."
+    # double slash, fragments, mobile links ...) and drops the duplicates - including the redirects
+    # that earlier runs found, which are kept in url_aliases.json
+    frontier = URLFrontier(aliases=URLFrontier.load_aliases(url_aliases_file))
+    with metrics.stage('list_pages'):
+        scrape_plan = plan_scrape(SOURCES, fetch=response_cache.fetch, frontier=frontier)
+    movie_links = scrape_plan.movie_links
+    for source_name, title in scrape_plan.skipped:
+        print(f"\n{title} ({source_name})")
+        print("movie has no wiki link")
+    if scrape_plan.duplicates:
+        print(f"{scrape_plan.duplicates} duplicate links (same article linked more than once) - each article is crawled once")
+
+    # every finished movie is appended to the checkpoint journal right away, so if the script dies
+    # halfway through, the next run skips the movies that are already done
+    journal = CheckpointJournal(journal_file)
+    if not RESUME:
+        journal.reset()
+    pending_links = journal.pending(movie_links)
+    if journal.stale:
+        # the list page changed since the journal was written - those indices belong to other films now
+        print(f"{len(journal.stale)} journaled movies are now at other positions on the list - crawled again")
+    print(f"{len(movie_links) - len(pending_links)} movies restored from {journal_file.name}, {len(pending_links)} to crawl")
+
+    # fetch the movie pages concurrently - the per-host token bucket rate limiter replaces the
+    # old "sleep 25 seconds every 100 movies" timer so as to not overwhelm wikipedia.
+    # Downloading runs on threads, while the CPU-bound parsing runs on a pool of worker
+    # processes so it can use all cores.
+    parse_workers = os.cpu_count() or 1
+    # leaving the "with response_cache" block writes the cache index, also when the crawl fails
+    with metrics.stage('crawl'), response_cache, concurrent.futures.ProcessPoolExecutor(parse_workers) as parse_pool:
+        # the frontier's fetcher spots redirects: when two links turn out to be the same article, the
+        # lower index keeps it - the other one is reported as a "duplicate" error instead of being parsed
+        # again, or, when it was parsed already, listed in frontier.duplicate_of and dropped below
+        crawl_movie_pages(pending_links, fetch=frontier.fetcher(response_cache.fetch), on_result=journal.append,
+                          max_concurrency=8, rate=5.0, burst=10, parse_executor=parse_pool,
+                          parse_workers=parse_workers, metrics=metrics)
+    frontier.save_aliases(url_aliases_file)
+    journal.close()
+
+    # restored + newly crawled movies, in index order - same list the serial loop used to build
+    movie_info_list = journal.results([link for link in movie_links if link[0] not in frontier.duplicate_of])
+    # the same movies per list (a film on two lists counts for both) - with more than one source,
+    # this tells how many movies each list contributed
+    movies_per_source = movies_by_source(scrape_plan, journal.completed)
+    for source_name, source_movies in movies_per_source.items():
+        print(f"{source_name}: {len(source_movies)} movies")
+
+    end_time = time.perf_counter()
+
+    print(f"\n\nProcess Completed: {end_time - start_time}")
+    # how many requests reused a pooled keep-alive connection instead of a new TCP/TLS handshake
+    print(f"\n{transport_stats() = }")
+    print(f"{response_cache.stats() = }")
+    metrics.info['transport'] = transport_stats()
+    metrics.info['response_cache'] = response_cache.stats()
+    metrics.info['url_frontier'] = frontier.stats()
+    metrics.count('movies', len(movie_info_list))
+    metrics.info['movies_per_source'] = {name: len(source_movies) for name, source_movies in movies_per_source.items()}
+    metrics.count('movies_restored', len(movie_links) - len(pending_links))
+
+    # check number of movie records in the list
+    print(f"\n\n{len(movie_info_list) = }")
+
+
+
+    ## %%
+    # write the current state of movie_info_list (the raw infobox data) to a json file:
+    with metrics.stage('serialize'):
+        save_movie_json_data(json_file, movie_info_list)
+
+    #  update "budget", "Box office", and "Release date" values
+    # the Budget and Box office columns are converted in one batch pass over all movies
+    with metrics.stage('money_conversion'):
+        format_budget_and_gross_batch(movie_info_list)
+    # convert the release date values to datetime objects - also in one batch pass, where each
+    # distinct date string is parsed only once
+    with metrics.stage('date_conversion'):
+        format_release_dates_batch(movie_info_list)
+
+    # now lets save the movie data once more - but because we just changed the release date value to a
+    # python datetime object, and writing a python datetime object to JSON throws the following error:
+    #
+    #         datetime.datetime is not JSON serializable
+    #
+    # We used to write a pickle file for that (pickle can store python datetime objects), then read it
+    # back to build the DataFrame.  A parquet file stores the release dates as a native datetime64 column
+    # and the amounts as float columns, so the DataFrame loads back fully typed with nothing to re-parse.
+    # Unlike pickle, parquet files can also be read by other languages and tools.
+    with metrics.stage('serialize'):
+        save_movie_parquet_data(parquet_file, movie_info_list)
+
+    ## %%
+
+    #--- BONUS - PANDAS DATAFRAME
+    with metrics.stage('dataframe'):
+        df = load_movie_parquet_data(parquet_file)
+
+        # drop the columns that are 90% (or more) empty and convert the remaining columns to their
+        # proper dtypes - planned first (printed below), then done in one pass
+        cleanup_plan = plan_cleanup(df)
+        df = apply_cleanup(df, cleanup_plan)
+    print(format_plan(cleanup_plan))
+    ## %%
+    final_movies_csv_file = Path(Path(__file__).parent/'final_movies_list.csv') # jsonfile
+
+    # write dataframe to csv file
+    with metrics.stage('serialize'):
+        df.to_csv(final_movies_csv_file)
+    ## %%
+    df_dtypes = df.dtypes
+    print(df_dtypes)
+
+    ## %%
+    # the same movies as typed records: the infobox labels mapped onto a fixed set of fields
+    # (labels outside the schema kept in each record's "extras"), one properly typed column per field
+    with metrics.stage('typed_records'):
+        movie_records = to_records(movie_info_list)
+        typed_df = records_to_dataframe(movie_records)
+    print(typed_df.dtypes)
+    # parquet keeps those dtypes (category, Int64, datetime64 ...), so the typed table loads back as it is
+    with metrics.stage('serialize'):
+        typed_df.to_parquet(typed_parquet_file)
+
+    ## %%
+    # where did the time go - network, parser or rate limiter?  And which pages failed, and why?
+    print(f"\n{metrics.format_report()}")
+    metrics.save_report(run_report_file)
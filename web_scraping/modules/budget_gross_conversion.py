@@ -1,6 +1,9 @@
 import re
 from decimal import Decimal
 
+import numpy as np
+import pandas as pd
+
 # =================================================================================
 # Convert budget and box office amounts to numeric values
 # =================================================================================
@@ -23,6 +26,12 @@ word_re = rf"\${number}\s*(-|\sto\s|–)?({number})?\s({units})"
 #      $1-2 BILLION  - returns '1'
 value_re = rf"\${number}"
 
+# precompile the patterns once at import time instead of on every money_conversion() call
+number_pattern = re.compile(number)
+units_pattern = re.compile(units, flags=re.I)
+word_pattern = re.compile(word_re, flags=re.I)
+value_pattern = re.compile(value_re)
+
 def money_conversion(money):
 
     # money_conversion("$12.2 million") --> 12200000    # word_syntax
@@ -30,18 +39,18 @@ def money_conversion(money):
 
     # convert a amount value in word syntax (e.g., "$4 million") to a float value (i.e., 4000000.0)
     def parse_word_syntax(amt_string, num_string):
-        value_string = re.search(number,num_string).group()
+        value_string = number_pattern.search(num_string).group()
         # strip off commas from the value_string - e.g., from '3,000 thousand' to '3000 thousand'
         value  = float(value_string.replace(',',''))
 
-        unit = re.search(units, amt_string, flags=re.I).group().lower()  # convert unit to lowercase
+        unit = units_pattern.search(amt_string).group().lower()  # convert unit to lowercase
         unit_to_number = get_unit_value_dict[unit]
         # converting floating point arithmetic to decimal arithmetic
         return (float(Decimal(str(value)) * unit_to_number)) if unit else None
 
     def parse_value_syntax(amount):
         # value_string = re.search(currency_pattern,amount).group()
-        value_string = re.search(number,amount).group()
+        value_string = number_pattern.search(amount).group()
         # strip off commas after regex
         value  = float(value_string.replace(',',''))
         return value
@@ -55,9 +64,9 @@ def money_conversion(money):
         money = [amt for amt in money if '$' in amt]
         money = money[0] if money else 'None'
 
-    # ignore case when doing re.search in word_syntax by passing "flags=re.I" parameter
-    word_syntax = re.search(word_re, money, flags=re.I)
-    value_syntax = re.search(value_re, money)
+    # word_pattern ignores case (compiled with "flags=re.I")
+    word_syntax = word_pattern.search(money)
+    value_syntax = value_pattern.search(money)
 
     if word_syntax:
         # return parse_word_syntax(word_syntax.group())  # commented out temporarily
@@ -76,4 +85,78 @@ def format_budget_and_gross(the_movie):
     # print(d)
     return the_movie
 
+# =================================================================================
+# Batch conversion - convert a whole Budget / Box office column in one pass
+# =================================================================================
+
+# one pattern for the vectorized path: the first dollar figure (same as value_re) plus, through
+# an optional lookahead, the unit word when word_re matches at that same dollar sign
+amount_re = rf"(?:(?=\${number}\s*(-|\sto\s|–)?({number})?\s(?P<unit>{units})))?\$(?P<value>{number})"
+
+def first_dollar_amount(money):
+    # same input handling as money_conversion(): keep the first amount with a dollar
+    # figure from a list, and treat 'N/A' (or anything that is not a string) as missing
+    if isinstance(money, list):
+        money = [amt for amt in money if '$' in amt]
+        money = money[0] if money else 'None'
+    return money if isinstance(money, str) and money != 'N/A' else None
+
+def money_conversion_batch(values):
+    '''
+    Convert a whole column of Budget / Box office values to a float array (NaN where
+    money_conversion() returns None).
+
+    - a pandas Series goes through the vectorized path (pandas .str.extract)
+    - a list (or any other iterable) goes through money_conversion() with the precompiled patterns
+
+    money_conversion_batch(["$12.2 million", "$790,000", "N/A"]) --> array([12200000., 790000., nan])
+    '''
+    if isinstance(values, pd.Series):
+        return _money_conversion_vectorized(values)
+
+    converted = (money_conversion(money) for money in values)
+    return np.array([np.nan if amount is None else amount for amount in converted], dtype=float)
+
+def _money_conversion_vectorized(values):
+    money = values.map(first_dollar_amount).astype(object)
+    if money.isna().all():
+        return np.full(len(money), np.nan)
+
+    # first dollar figure (e.g. "$1" in "$1-2 billion") - the value money_conversion() uses
+    # for both syntaxes - and the unit of the word syntax, in a single extract
+    parts = money.str.extract(amount_re, flags=re.I)
+    value_string = parts['value'].str.replace(',', '')
+    unit = parts['unit']
+
+    # no unit at the first dollar sign - the word syntax may still match at a LATER one,
+    # e.g. "$5 ($6 million)", so look for it in those rows only
+    later = unit.isna() & value_string.notna()
+    if later.any():
+        unit[later] = money[later].str.extract(word_pattern).iloc[:, -1]
+
+    exponent = unit.str.lower().map({'thousand': 'e3', 'million': 'e6', 'billion': 'e9'})
+
+    # "12.2" + "e6" parses to exactly float(Decimal('12.2') * 1000000) - what money_conversion()
+    # computes - as long as the figure has at most 15 significant digits (so that it survives
+    # the round trip through float).  Longer figures go through money_conversion() itself.
+    # (astype(float): a column of whole numbers without units would come out as int64)
+    result = pd.to_numeric(value_string.str.cat(exponent.fillna('')), errors='coerce').astype(float)
+    too_long = value_string.str.len() > 15
+    if too_long.any():
+        result[too_long] = np.array([money_conversion(amount) for amount in money[too_long]], dtype=float)
+
+    return result.to_numpy(dtype=float)
+
+def format_budget_and_gross_batch(movie_list):
+    '''
+    Batch version of format_budget_and_gross(): converts the Budget and Box office values
+    of every movie in one pass per column and updates the movie dicts in place.
+    '''
+    for key, new_key in (('Budget', 'Budget (US$)'), ('Box office', 'Box office (US$)')):
+        amounts = money_conversion_batch(pd.Series([movie.get(key, 'N/A') for movie in movie_list], dtype=object))
+        for movie, amount in zip(movie_list, amounts):
+            movie[new_key] = None if np.isnan(amount) else float(amount)
+            movie.pop(key, None)
+    return movie_list
+
 # --- END OF Monetary Conversion functions
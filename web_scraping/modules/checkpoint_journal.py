@@ -0,0 +1,114 @@
+'''
+    Append-only checkpoint journal for the movie crawl.
+
+    movie_info_list used to live only in memory until save_movie_json_data() ran after the
+    loop - if main.py died at movie 400, the whole crawl was lost.  The journal writes every
+    get_info_box result to a JSON Lines file the moment it completes:
+
+        {"movie_indx": 1, "movie_info": {"title": "# 001: Snow White ...", ...}}
+        {"movie_indx": 3, "movie_info": {...}}
+
+    On restart the journal is read back, the finished indices are skipped and only the rest
+    are crawled.  A crash in the middle of a write can only damage the last line, which is
+    dropped when the journal is loaded.
+
+    An index only counts as finished for the same link: the list page can change between runs
+    (a film inserted higher up shifts every index after it), so an entry whose
+    movie_info['wiki_link'] isn't the href of its index any more is crawled again.
+
+    Example:
+        journal = CheckpointJournal(Path('disney_crawl.jsonl'))
+        pending = journal.pending(movie_links)
+        crawl_movie_pages(pending, on_result=journal.append)
+        movie_info_list = journal.results(movie_links)
+'''
+import json
+import os
+import threading
+
+
+class CheckpointJournal:
+    def __init__(self, fname):
+        self.fname = fname
+        self.completed = {}
+        self.stale = []     # indices pending() found journaled for another link
+        self._lock = threading.Lock()
+        self._load()
+        self._file = open(self.fname, 'a', encoding='utf-8')
+
+    def _load(self):
+        if not self.fname.exists():
+            return
+        data = self.fname.read_bytes()
+
+        # a crash in the middle of a write leaves a torn last line without a newline - cut it
+        # off, otherwise the next appended record would be glued onto it (that movie is
+        # simply fetched again)
+        end = data.rfind(b'\n') + 1
+        if end != len(data):
+            with self.fname.open('r+b') as f:
+                f.truncate(end)
+
+        for line in data[:end].split(b'\n')[:-1]:
+            record = json.loads(line)
+            self.completed[record['movie_indx']] = record['movie_info']
+
+    def append(self, movie_indx, movie_info):
+        '''
+        record one finished movie - safe to call from several threads
+        '''
+        line = json.dumps({'movie_indx': movie_indx, 'movie_info': movie_info}, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.completed[movie_indx] = movie_info
+
+    def _is_done(self, movie_indx, href):
+        # a movie_info without a wiki_link (e.g. from a custom parse function) can't be checked
+        movie_info = self.completed.get(movie_indx)
+        return movie_info is not None and movie_info.get('wiki_link', href) == href
+
+    def pending(self, movie_links):
+        '''
+        the (movie_indx, href) pairs that are not in the journal yet - links with more items,
+        like the (movie_indx, href, parse) links of scraper.py, are passed through as they are.
+        Entries journaled for another href are dropped (and listed in self.stale).
+        '''
+        pending = []
+        with self._lock:
+            for link in movie_links:
+                movie_indx, href = link[0], link[1]
+                if self._is_done(movie_indx, href):
+                    continue
+                if movie_indx in self.completed:
+                    del self.completed[movie_indx]
+                    self.stale.append(movie_indx)
+                pending.append(link)
+        return pending
+
+    def results(self, movie_links):
+        '''
+        movie_info dicts of the finished movies in movie_links, in index order
+        '''
+        return [self.completed[indx] for indx, href in sorted(link[:2] for link in movie_links)
+                if self._is_done(indx, href)]
+
+    def reset(self):
+        '''
+        start over with an empty journal (e.g. for a fresh full crawl)
+        '''
+        with self._lock:
+            self._file.seek(0)
+            self._file.truncate()
+            self.completed.clear()
+            self.stale.clear()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
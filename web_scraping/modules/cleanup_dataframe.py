@@ -3,16 +3,55 @@
 
     The code shows a few ways of how to remove columns from a dataframe.
     IT also shows different ways to replace values in a column.
-    
-    TIP: 
-    I  ran the dataframes.info  in the background to decide which columns 
-    to remove based on the total percentage of NULL values per column 
+
+    TIP:
+    I  ran the dataframes.info  in the background to decide which columns
+    to remove based on the total percentage of NULL values per column
     (I went with columns whose total rows have NaN values that are 90% and higher).
 
+    cleanup_dataframe() now makes that decision itself: plan_cleanup() measures the NaN ratio
+    of every column and plans the drops (90% rule) and the dtype conversions, and
+    apply_cleanup() carries the plan out in ONE pass - one new DataFrame, instead of a copy of
+    the whole frame per drop() call.  Columns are chosen by name and NaN ratio, so the plan
+    still works when wikipedia adds or removes an infobox label (the column positions 34, 31-33
+    and 22: used by clean_up_columns() only fit one particular scrape).
+
+        plan = plan_cleanup(df)
+        print(format_plan(plan))
+        df = apply_cleanup(df, plan)
 '''
+from collections import namedtuple
+
 import pandas as pd
 
+# drop the columns with at least this share of missing values
+NAN_THRESHOLD = 0.9
+
+# columns that are always dropped, whatever their NaN ratio
+DROP_COLUMNS = ('Hepburn', 'Languages', 'Countries')
+
+# columns that are never dropped, however empty they are
+KEEP_COLUMNS = ('title', 'wiki_link')
+
+# target dtypes of the movie columns - values that don't convert become NaN / NaT
+# (numeric columns that are already int or float are kept as they are)
+MOVIE_DTYPES = {
+    'Running time': 'float64',
+    'Budget (US$)': 'float64',
+    'Box office (US$)': 'float64',
+    'Release date': 'datetime64[ns]',
+}
+
+# drop  - columns to remove, in frame order
+# coerce - {column: dtype} for the kept columns that are not of that dtype yet
+# nan_ratios - {column: share of missing values} of every column of the frame
+CleanupPlan = namedtuple('CleanupPlan', ['drop', 'coerce', 'nan_ratios'])
+
+
 def clean_up_columns(df):
+    # the hand-written version, kept to show the different ways to drop columns - it only fits
+    # the column layout of one scrape (see plan_cleanup() for the general version), and every
+    # drop() call below creates a new copy of the frame
 
 # DROP ONE COLUMN
     df.drop(columns='Hepburn', inplace=True)
@@ -20,7 +59,7 @@ def clean_up_columns(df):
     # DROP COLUMNS (USE A LIST)
     df.drop(columns=['Languages','Countries'], inplace=True)
 
-    # DROP COLUMN USING COLUMN INDEX 
+    # DROP COLUMN USING COLUMN INDEX
     # when not specify 'columns=' for the following commands, use axis=1 to indicate column items
     df.drop(df.iloc[:, [34,]], axis=1, inplace=True) # delete one column only using column index
     df.drop(df.iloc[:, [31,32,33]], axis=1, inplace=True) # delete  multiple columns using their respective column indices
@@ -35,7 +74,72 @@ def clean_up_columns(df):
     df.drop(columns=df.columns[22:], inplace=True)
     #----
 
-def cleanup_dataframe(dataset):
+    # "df = df.drop(...)" above made df a NEW frame - the caller's frame only got the inplace
+    # drops, so the result has to be returned
+    return df
+
+def nan_ratios(df):
+    '''
+    {column: share of missing values} - counted one column at a time, so no boolean
+    isna() mask of the whole frame is built
+    '''
+    rows = len(df)
+    if not rows:
+        return {column: 0.0 for column in df.columns}
+    return {column: 1 - df[column].count() / rows for column in df.columns}
+
+def _needs_coercion(series, dtype):
+    # a column that already has the right KIND of dtype is left alone - datetime64[us] from a
+    # parquet file is as good as datetime64[ns], an int column needs no float conversion
+    if dtype in ('datetime64[ns]', 'datetime'):
+        return not pd.api.types.is_datetime64_dtype(series.dtype)
+    dtype = pd.api.types.pandas_dtype(dtype)
+    if pd.api.types.is_numeric_dtype(dtype):
+        return not pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype)
+    return series.dtype != dtype
+
+def plan_cleanup(df, nan_threshold=NAN_THRESHOLD, drop=DROP_COLUMNS, keep=KEEP_COLUMNS, dtypes=MOVIE_DTYPES):
+    '''
+    Decide, without changing df, which columns to drop and which to convert:
+
+    - a column named in `drop` is dropped (names that aren't in the frame are ignored)
+    - a column whose NaN ratio is >= nan_threshold is dropped, unless it is named in `keep`
+    - a kept column named in `dtypes` is converted unless it already has that dtype
+    '''
+    ratios = nan_ratios(df)
+    drop, keep = set(drop), set(keep)
+    to_drop = [column for column in df.columns
+               if column in drop or (ratios[column] >= nan_threshold and column not in keep)]
+    dropped = set(to_drop)
+    coerce = {column: dtype for column, dtype in (dtypes or {}).items()
+              if column in ratios and column not in dropped and _needs_coercion(df[column], dtype)}
+    return CleanupPlan(to_drop, coerce, ratios)
+
+def _coerce(series, dtype):
+    # scraped values are messy - anything that doesn't convert becomes NaN / NaT instead of an error
+    if dtype in ('datetime64[ns]', 'datetime'):
+        return pd.to_datetime(series, errors='coerce')
+    if pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(dtype)):
+        return pd.to_numeric(series, errors='coerce').astype(dtype)
+    return series.astype(dtype)
+
+def apply_cleanup(df, plan):
+    '''
+    Build the cleaned frame in one pass: the kept columns, with the planned conversions.
+    The kept columns that aren't converted are not copied (pandas Copy-on-Write shares them
+    with df until one side is modified); df itself is left unchanged.
+    '''
+    dropped = set(plan.drop)
+    columns = {column: _coerce(df[column], plan.coerce[column]) if column in plan.coerce else df[column]
+               for column in df.columns if column not in dropped}
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+def format_plan(plan):
+    lines = [f'drop {len(plan.drop)} of {len(plan.nan_ratios)} columns:']
+    lines += [f'  {column:<32} {plan.nan_ratios[column]:6.1%} NaN' for column in plan.drop]
+    lines += [f'convert {column} -> {dtype}' for column, dtype in plan.coerce.items()]
+    return '\n'.join(lines)
 
-    dataset = clean_up_columns(dataset)
-    return clean_up_nan_values(dataset)
+def cleanup_dataframe(dataset, nan_threshold=NAN_THRESHOLD, **plan_options):
+    # plan_options: drop=, keep=, dtypes= - see plan_cleanup()
+    return apply_cleanup(dataset, plan_cleanup(dataset, nan_threshold, **plan_options))
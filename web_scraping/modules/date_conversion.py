@@ -1,27 +1,103 @@
+import calendar
 from datetime import datetime as dt
+from functools import lru_cache
+import re
+
+import numpy as np
+import pandas as pd
+
+# formats of the release dates found in the infoboxes - "June 18, 2010" and "18 June 2010"
+date_fmts = ["%B %d, %Y", "%d %B %Y"]
+
+# Regex format detector - instead of trying strptime() with every format and swallowing the
+# exception of each format that doesn't match, pick the format up front.  The patterns are
+# built the same way strptime() builds its own regex (case insensitive month names, any run of
+# whitespace where the format has a space, "%d" with or without a leading zero), so a string
+# is detected exactly when strptime() would accept its shape.
+month_re = '|'.join(calendar.month_name[1:])
+day_re = r"(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])"
+year_re = r"\d\d\d\d"
+
+date_fmt_patterns = [
+    (re.compile(rf"({month_re})\s+{day_re},\s+{year_re}", flags=re.I), "%B %d, %Y"),
+    (re.compile(rf"{day_re}\s+({month_re})\s+{year_re}", flags=re.I), "%d %B %Y"),
+]
+
+def date_cleanup(date):
+    return date.split("(")[0].strip()
+
+def detect_date_format(date_str):
+    for pattern, fmt in date_fmt_patterns:
+        if pattern.fullmatch(date_str):
+            return fmt
+    return None
+
+# the same release date strings show up again and again, so remember the parsed values
+@lru_cache(maxsize=4096)
+def parse_date_str(date_str):
+    fmt = detect_date_format(date_str)
+    if fmt is None:
+        return None
+    try:
+        return dt.strptime(date_str, fmt)
+    except ValueError:
+        # right shape but not a real date, e.g. "February 30, 2010"
+        return None
 
 # cleaning up the "release date" data, convert it to datetime object
 def date_conversion(date): # we want to convert all dates to MMMMM dd, YYYY format
 
-    def date_cleanup(date):
-        return date.split("(")[0].strip()
-
     if date == 'N/A':
         return None
     if isinstance(date, list):
         date = date[0]
 
-    date_str = date_cleanup(date)
+    # if no formatting was done, parse_date_str() just returns None
+    return parse_date_str(date_cleanup(date))
+
+# =================================================================================
+# Batch conversion - convert a whole "Release date" column in one pass
+# =================================================================================
+
+def release_date_string(date):
+    # same input handling as date_conversion(), 'N/A' (or anything that is not a string) is missing
+    if isinstance(date, list):
+        date = date[0]
+    return date_cleanup(date) if isinstance(date, str) and date != 'N/A' else None
+
+def date_conversion_batch(dates):
+    '''
+    Convert a whole column (list or pandas Series) of release dates to a datetime64 Series,
+    ready to go into a DataFrame.  Dates date_conversion() can't convert come out as NaT.
+
+    Each distinct date string is parsed only once: the column is factorized into its unique
+    values, every format's unique strings go through ONE pandas.to_datetime() call with that
+    explicit format, and the results are spread back over the rows.
+    '''
+    index = dates.index if isinstance(dates, pd.Series) else None
+    date_strings = pd.Series([release_date_string(date) for date in dates], index=index, dtype=object)
 
-    date_fmts = ["%B %d, %Y", "%d %B %Y"]
+    codes, uniques = pd.factorize(date_strings)
+    parsed = pd.Series(pd.NaT, index=range(len(uniques)), dtype='datetime64[us]')
+    formats = pd.Series([detect_date_format(date_str) for date_str in uniques], dtype=object)
     for fmt in date_fmts:
-        try:
-            return dt.strptime(date_str, fmt)
-        except:
-            # when the data does not match format, don't fail it and just let it continue (pass)
-            pass
-    # if no formatting was done, just return None
-    return None
+        is_fmt = (formats == fmt).to_numpy()
+        if is_fmt.any():
+            parsed[is_fmt] = pd.to_datetime(pd.Series(uniques[is_fmt]), format=fmt, errors='coerce').to_numpy()
+
+    # factorize() gives missing values the code -1, which picks the NaT appended at the end
+    values = np.append(parsed.to_numpy(), np.datetime64('NaT'))[codes]
+    return pd.Series(values, index=date_strings.index, dtype='datetime64[us]')
+
+def format_release_dates_batch(movie_list):
+    '''
+    Batch version of "movie['Release date'] = date_conversion(...)" for every movie in the
+    list - updates the movie dicts in place with datetime objects (None when not converted)
+    '''
+    release_dates = date_conversion_batch([movie.get('Release date', 'N/A') for movie in movie_list])
+    for movie, release_date in zip(movie_list, release_dates):
+        movie['Release date'] = None if pd.isna(release_date) else release_date.to_pydatetime()
+    return movie_list
 
 def format_date_final(date_object):
     final_date_format = '%B %d %Y'
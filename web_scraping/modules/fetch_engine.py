@@ -0,0 +1,191 @@
+'''
+    Asyncio-based fetch engine for the movie pages.
+
+    main.py used to call get_info_box() once per link, one after another, and slept for
+    25 seconds after every 100 links so as to not overwhelm wikipedia.  Most of that wall
+    time was spent waiting on the network (or on the sleep timer).
+
+    This engine downloads the pages concurrently instead:
+    - a semaphore bounds the number of requests in flight (max_concurrency)
+    - a per-host token bucket (rate requests/second, with a burst allowance) replaces the
+      fixed sleep, so we stay polite to the server without sitting idle
+    - the blocking fetch function runs in a thread pool so any sync HTTP client can be used
+    - downloading and parsing are separate stages joined by a bounded queue, so the parsing
+      can run on a ProcessPoolExecutor and use all cores (see crawl())
+
+    The results are returned as a list of movie_info dicts in index order - exactly what the
+    old serial loop produced - so the downstream format_budget_and_gross() and
+    date_conversion() steps do not change.
+
+    Example:
+        movie_links = [(1, 'https://en.wikipedia.org/wiki/Toy_Story_3'), ...]
+        movie_info_list = crawl_movie_pages(movie_links, max_concurrency=8, rate=5)
+'''
+import asyncio
+import concurrent.futures
+import time
+from urllib.parse import urlsplit
+
+from modules.processing_data import fetch_page, parse_info_box
+from modules.run_metrics import take_fetch_source
+
+
+class TokenBucket:
+    '''
+    Token bucket rate limiter: tokens are added at 'rate' tokens per second up to
+    'capacity' tokens.  Each request takes one token, waiting for a refill if the
+    bucket is empty.
+    '''
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        # the lock makes waiters queue up in FIFO order instead of racing for the next token
+        async with self.lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class HostRateLimiter:
+    '''
+    Keeps one TokenBucket per host name, so a slow rate for one site does not throttle
+    requests going to another.
+    '''
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+
+    async def acquire(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        await self.buckets[host].acquire()
+
+
+def sourced_fetch(fetch, href):
+    # runs on the fetch thread - the page and where it came from (downloaded, revalidated, cache hit)
+    take_fetch_source()
+    content = fetch(href)
+    return content, take_fetch_source()
+
+
+def timed_call(fn, *args):
+    # runs in the parse worker (thread or process), so the time excludes the executor's queue
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+async def crawl(movie_links, fetch=fetch_page, parse=parse_info_box,
+                max_concurrency=8, rate=5.0, burst=10, on_result=None,
+                parse_executor=None, parse_workers=None, queue_size=None, metrics=None):
+    '''
+    Fetch and parse every (movie_indx, href) pair in movie_links concurrently.
+
+    - fetch(href) must return the raw page content (it runs in a worker thread)
+    - parse(movie_indx, href, content) must return the movie_info dict - a link given as
+      (movie_indx, href, parse) is parsed with its own parse function instead (scraper.py
+      crawls the links of several list pages, each with its own page layout, in one go)
+    - on_result(movie_indx, movie_info), if given, is called as soon as each movie is
+      done (e.g. CheckpointJournal.append, so a crash doesn't lose the finished movies)
+
+    The crawl is a two-stage pipeline:
+    1. I/O stage - up to max_concurrency downloads run in a thread pool and put the raw html
+       into a bounded queue (queue_size pages)
+    2. parse stage - parse_workers tasks take pages off the queue and parse them on
+       parse_executor.  Pass a ProcessPoolExecutor to spread the CPU-bound BeautifulSoup
+       work over all cores (parse must then be picklable, i.e. a module-level function),
+       with parse_workers set to its number of processes (default: max_concurrency).
+       By default pages are parsed on the I/O threads.
+
+    When the parsers fall behind, the queue fills up and the downloaders wait before taking
+    the next link, so at most queue_size + max_concurrency pages are held in memory.
+
+    Links that fail to download or parse are reported and skipped, the same way the
+    old serial loop in main.py did.  The returned list is sorted by movie_indx.
+
+    With a RunMetrics (run_metrics.py) as `metrics`, the fetch latency, rate limiter wait,
+    page size and parse time of every page and the errors by category are recorded in it.
+    '''
+    limiter = HostRateLimiter(rate, burst)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    loop = asyncio.get_running_loop()
+    results = {}
+
+    if parse_workers is None:
+        parse_workers = max_concurrency
+    queue = asyncio.Queue(maxsize=queue_size or 2 * parse_workers)
+
+    def report_error(stage, href, e):
+        print(f"\n{href}")
+        print(e)
+        if metrics:
+            metrics.record_error(stage, href, e)
+
+    async def download(movie_indx, href, link_parse=None):
+        async with semaphore:
+            waiting = time.perf_counter()
+            await limiter.acquire(href)
+            started = time.perf_counter()
+            try:
+                content, source = await loop.run_in_executor(io_pool, sourced_fetch, fetch, href)
+            except Exception as e:
+                report_error('fetch', href, e)
+                return
+            if metrics:
+                metrics.record_fetch(time.perf_counter() - started, len(content), started - waiting, source)
+            # still holding the semaphore - a full queue stops new downloads (backpressure)
+            await queue.put((movie_indx, href, content, link_parse or parse))
+
+    async def parse_pages():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            movie_indx, href, content, page_parse = item
+            try:
+                results[movie_indx], seconds = await loop.run_in_executor(parse_executor or io_pool, timed_call,
+                                                                          page_parse, movie_indx, href, content)
+            except Exception as e:
+                report_error('parse', href, e)
+                continue
+            if metrics:
+                metrics.record_parse(seconds)
+            if on_result:
+                # a failing callback (e.g. the journal hits a disk error) must not kill this parser -
+                # the downloaders would then wait on the full queue forever
+                try:
+                    on_result(movie_indx, results[movie_indx])
+                except Exception as e:
+                    report_error('on_result', href, e)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency,
+                                               thread_name_prefix='fetch') as io_pool:
+        parsers = [asyncio.create_task(parse_pages()) for _ in range(parse_workers)]
+        await asyncio.gather(*(download(*link) for link in movie_links))
+        # all pages are queued - one None per parser tells it to stop once the queue is drained
+        for _ in parsers:
+            await queue.put(None)
+        await asyncio.gather(*parsers)
+
+    return [results[indx] for indx in sorted(results)]
+
+
+def crawl_movie_pages(movie_links, **kwargs):
+    '''
+    Synchronous entry point for scripts - runs crawl() in a new event loop.
+    '''
+    return asyncio.run(crawl(movie_links, **kwargs))
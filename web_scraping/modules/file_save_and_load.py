@@ -1,6 +1,33 @@
+from datetime import date
+import gzip
+import io
 import json
+import math
+from pathlib import Path
 import pickle
 
+import pandas as pd
+
+# optional - a faster JSON encoder / decoder for the JSON Lines files
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# optional - zstd compression for the JSON Lines files
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# optional - only needed for the columnar (parquet / arrow) files
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
 # saving json data to a file
 def save_movie_json_data(fname, data):
     with fname.open('w') as f:
@@ -22,3 +49,155 @@ def save_movie_pickle_data(fname, data):
 def load_movie_pickle_data(fname):
     with open(fname, 'rb') as f:
         return pickle.load(f)
+
+# =================================================================================
+# Streaming JSON Lines (NDJSON) - one movie per line
+# =================================================================================
+# save_movie_json_data() dumps the whole list at once and load_movie_json_data() reads the whole
+# file back, so memory peaks at several times the size of the data and nothing can be read
+# before the write is done.  With one JSON document per line, records are appended as they
+# are produced and read back one at a time by a generator.
+#
+# Compression follows the file name: "movies.jsonl.gz" is gzip, "movies.jsonl.zst" is zstd
+# (needs the 'zstandard' package), anything else is plain text.  Both compressors allow
+# appending - each append simply adds another compressed member / frame to the file.
+
+def _json_default(value):
+    # write datetime objects the way orjson does, e.g. "2010-06-18T00:00:00"
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def dumps_json_line(record):
+    if orjson is not None:
+        return orjson.dumps(record, default=_json_default) + b'\n'
+    return (json.dumps(record, ensure_ascii=False, default=_json_default) + '\n').encode('utf-8')
+
+def loads_json_line(line):
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+def jsonl_compression(fname):
+    suffix = Path(fname).suffix
+    return {'.gz': 'gzip', '.zst': 'zstd'}.get(suffix)
+
+def _open_jsonl(fname, mode):
+    compression = jsonl_compression(fname)
+    if compression == 'gzip':
+        return gzip.open(fname, mode)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("'.zst' JSON Lines files need the 'zstandard' package")
+        f = open(fname, mode)
+        if mode.startswith('r'):
+            return zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True, closefd=True)
+        return zstandard.ZstdCompressor().stream_writer(f, closefd=True)
+    return open(fname, mode)
+
+class JsonLinesWriter:
+    '''
+    Appending JSON Lines writer - use it as a context manager and write() each movie as
+    soon as it is ready:
+
+        with JsonLinesWriter(Path('movies.jsonl.gz')) as writer:
+            for movie in movies:
+                writer.write(movie)
+    '''
+    def __init__(self, fname, append=True):
+        self.fname = fname
+        self._file = _open_jsonl(fname, 'ab' if append else 'wb')
+        self.count = 0
+
+    def write(self, record):
+        self._file.write(dumps_json_line(record))
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# saving movie data to a JSON Lines file - "records" can be any iterable, even a generator
+def save_movie_jsonl_data(fname, records, append=False):
+    with JsonLinesWriter(fname, append=append) as writer:
+        writer.write_many(records)
+        return writer.count
+
+# loading movie data from a JSON Lines file, one record at a time
+def iter_movie_jsonl_data(fname):
+    with _open_jsonl(fname, 'rb') as f:
+        # zstd stream readers are not line iterators - wrap them in a buffered reader
+        lines = f if jsonl_compression(fname) != 'zstd' else io.BufferedReader(f)
+        for line in lines:
+            if line.strip():
+                yield loads_json_line(line)
+
+# =================================================================================
+# Typed columnar storage - Parquet and Arrow IPC (feather)
+# =================================================================================
+# JSON can't store datetime objects, which is why main.py used to detour through a pickle
+# file. The columnar formats store datetime64 and float columns natively, so the DataFrame
+# loads back with the right dtypes and nothing has to be parsed again.
+#
+# Infobox columns often mix strings, ints and lists of strings (e.g. "Starring"), which have
+# no single Arrow type.  Those columns are stored as JSON text and decoded again on load - the
+# names of these columns are kept in the file's schema metadata under "json_columns".
+
+# key of the schema metadata entry listing the JSON encoded columns
+JSON_COLUMNS_KEY = b'json_columns'
+
+def is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+def movies_to_arrow_table(data):
+    if pa is None:
+        raise ImportError("the parquet / arrow files need the 'pyarrow' package")
+
+    df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+    columns, json_columns = {}, []
+    for name, column in df.items():
+        try:
+            columns[name] = pa.array(column, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # mixed value types - store the column as JSON text
+            json_columns.append(name)
+            columns[name] = pa.array([None if is_missing(value) else json.dumps(value, ensure_ascii=False)
+                                      for value in column], type=pa.string())
+
+    table = pa.table(columns)
+    return table.replace_schema_metadata({JSON_COLUMNS_KEY: json.dumps(json_columns)})
+
+def arrow_table_to_movies(table):
+    json_columns = json.loads((table.schema.metadata or {}).get(JSON_COLUMNS_KEY, b'[]'))
+    df = table.to_pandas()
+    # list columns (e.g. "Starring" when every value is a list) come back as numpy arrays
+    for field in table.schema:
+        if pa.types.is_list(field.type):
+            df[field.name] = df[field.name].map(lambda value: None if value is None else value.tolist())
+    for name in json_columns:
+        df[name] = df[name].astype(object).map(lambda value: None if is_missing(value) else json.loads(value))
+    return df
+
+# saving movie data (list of dicts or DataFrame) to a parquet file
+def save_movie_parquet_data(fname, data, compression='zstd'):
+    pq.write_table(movies_to_arrow_table(data), fname, compression=compression)
+
+# loading movie data from a parquet file as a DataFrame
+def load_movie_parquet_data(fname, columns=None):
+    return arrow_table_to_movies(pq.read_table(fname, columns=columns))
+
+# saving movie data to an Arrow IPC (feather v2) file - uncompressed by default, so that
+# the file can be memory-mapped when it is loaded
+def save_movie_arrow_data(fname, data, compression='uncompressed'):
+    feather.write_feather(movies_to_arrow_table(data), fname, compression=compression)
+
+# loading movie data from an Arrow IPC file as a DataFrame
+def load_movie_arrow_data(fname, memory_map=True):
+    return arrow_table_to_movies(feather.read_table(fname, memory_map=memory_map))
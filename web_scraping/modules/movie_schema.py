@@ -0,0 +1,260 @@
+'''
+    Typed, compact movie records
+
+    parse_info_box() returns one dict per movie whose keys are whatever label the infobox
+    shows ("Country" on one page, "Countries" on the next, "Production companies" ...) and
+    whose values are strings, ints or lists.  A few hundred movies carry hundreds of distinct
+    keys, and pd.DataFrame(movie_list) turns them into a wide, sparse frame of object columns.
+
+    This module maps the infobox labels onto a fixed set of canonical FIELDS and stores each
+    movie as a MovieRecord - a class with __slots__, so no per-record __dict__ and no repeated
+    key strings.  The values get one type per field:
+
+        text      str                      title, wiki_link
+        category  str (lists joined)       country, language, production_company, distributed_by
+        names     tuple of str             directed_by, starring, music_by ...
+        minutes   int                      running_time
+        money     float (US$)              budget, box_office
+        date      datetime                 release_date
+
+    Labels that aren't in the schema go into the record's `extras` dict (None when there are
+    none), so nothing the infobox had is lost.  records_to_dataframe() builds the DataFrame
+    column by column with the final dtypes (string, category, Int64, float64, datetime64).
+
+        records = to_records(movie_info_list)
+        df = records_to_dataframe(records)
+'''
+from collections import namedtuple
+from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
+import re
+
+import numpy as np
+import pandas as pd
+
+from modules.budget_gross_conversion import money_conversion, money_conversion_batch
+from modules.date_conversion import date_conversion, date_conversion_batch
+
+# one canonical field: its name on the record, its kind (see the module docstring) and the
+# infobox labels that map onto it - including the already converted labels of main.py
+Field = namedtuple('Field', ['name', 'kind', 'labels'])
+
+FIELDS = (
+    Field('title', 'text', ('title',)),
+    Field('wiki_link', 'text', ('wiki_link',)),
+    Field('directed_by', 'names', ('Directed by',)),
+    Field('produced_by', 'names', ('Produced by',)),
+    Field('screenplay_by', 'names', ('Screenplay by',)),
+    Field('story_by', 'names', ('Story by',)),
+    Field('written_by', 'names', ('Written by',)),
+    Field('based_on', 'names', ('Based on',)),
+    Field('starring', 'names', ('Starring', 'Voices of')),
+    Field('narrated_by', 'names', ('Narrated by',)),
+    Field('music_by', 'names', ('Music by',)),
+    Field('cinematography', 'names', ('Cinematography',)),
+    Field('edited_by', 'names', ('Edited by',)),
+    Field('production_company', 'category', ('Production company', 'Production companies')),
+    Field('distributed_by', 'category', ('Distributed by',)),
+    Field('release_date', 'date', ('Release date', 'Release dates')),
+    Field('running_time', 'minutes', ('Running time',)),
+    Field('country', 'category', ('Country', 'Countries')),
+    Field('language', 'category', ('Language', 'Languages')),
+    Field('budget', 'money', ('Budget', 'Budget (US$)')),
+    Field('box_office', 'money', ('Box office', 'Box office (US$)')),
+)
+
+FIELD_NAMES = tuple(field.name for field in FIELDS)
+
+# DataFrame dtype of each kind - 'names' stays an object column of tuples
+KIND_DTYPES = {'text': 'string', 'category': 'category', 'names': object, 'minutes': 'Int64',
+               'money': 'float64', 'date': 'datetime64[us]'}
+
+def normalize_label(label):
+    # "Production\xa0companies " -> "production companies"
+    return ' '.join(label.split()).lower()
+
+# normalized infobox label -> Field
+LABEL_INDEX = {normalize_label(label): field for field in FIELDS for label in field.labels}
+
+# the same few hundred labels come back on every page, so remember where each one maps to
+@lru_cache(maxsize=4096)
+def field_of(label):
+    # the Field of an infobox label, None when the label is not in the schema
+    return LABEL_INDEX.get(normalize_label(label))
+
+minutes_pattern = re.compile(r'\d+')
+
+
+class MovieRecord:
+    '''
+    One movie, one slot per canonical field (None when the infobox doesn't have it)
+    plus `extras`, a dict of the labels outside the schema (None when there are none)
+    '''
+    __slots__ = FIELD_NAMES + ('extras',)
+
+    title: str
+    wiki_link: str
+    directed_by: tuple
+    produced_by: tuple
+    screenplay_by: tuple
+    story_by: tuple
+    written_by: tuple
+    based_on: tuple
+    starring: tuple
+    narrated_by: tuple
+    music_by: tuple
+    cinematography: tuple
+    edited_by: tuple
+    production_company: str
+    distributed_by: str
+    release_date: datetime
+    running_time: int
+    country: str
+    language: str
+    budget: float
+    box_office: float
+    extras: dict
+
+    def __init__(self, extras=None, **fields):
+        unknown = fields.keys() - set(FIELD_NAMES)
+        if unknown:
+            raise TypeError(f'unknown MovieRecord fields: {", ".join(sorted(unknown))}')
+        self._fill(fields, extras)
+
+    def _fill(self, fields, extras):
+        for name in FIELD_NAMES:
+            setattr(self, name, fields.get(name))
+        self.extras = extras or None
+
+    @classmethod
+    def _from_fields(cls, fields, extras):
+        # no argument checking - for to_records(), whose field names come from the schema
+        record = cls.__new__(cls)
+        record._fill(fields, extras)
+        return record
+
+    @classmethod
+    def from_infobox(cls, movie_info):
+        '''
+        Record of one parse_info_box() dict - converts every value on its own (to_records()
+        converts the money and date columns of a whole list in one batch)
+        '''
+        fields, extras = split_infobox(movie_info)
+        return cls(extras, **{field.name: convert_value(field.kind, value) for field, value in fields})
+
+    def to_dict(self):
+        # the record as a dict of canonical fields (extras included as they are)
+        values = {name: getattr(self, name) for name in FIELD_NAMES}
+        values['extras'] = self.extras
+        return values
+
+    def __eq__(self, other):
+        if not isinstance(other, MovieRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        filled = ', '.join(f'{name}={getattr(self, name)!r}' for name in FIELD_NAMES if getattr(self, name) is not None)
+        return f'MovieRecord({filled})'
+
+
+def split_infobox(movie_info):
+    '''
+    [(Field, raw value)] of the labels in the schema, and the {label: value} of the others.
+    When two labels map onto the same field (e.g. "Country" and "Countries"), the first wins
+    and the other one goes into the extras, so its value isn't lost.
+    '''
+    fields, seen, extras = [], set(), {}
+    for label, value in movie_info.items():
+        field = field_of(label)
+        if field is None or field.name in seen:
+            extras[label] = value
+        else:
+            seen.add(field.name)
+            fields.append((field, value))
+    return fields, extras
+
+def as_names(value):
+    if value is None or value == 'N/A':
+        return None
+    if isinstance(value, (list, tuple)):
+        return tuple(str(item) for item in value)
+    return (str(value),)
+
+def as_text(value):
+    if value is None or value == 'N/A':
+        return None
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(item) for item in value)
+    return str(value)
+
+def as_minutes(value):
+    # get_dict_val() already made "102 minutes" an int - lists and leftover strings take their first number
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else None
+    if value is None or isinstance(value, int):
+        return value
+    found = minutes_pattern.search(str(value))
+    return int(found.group()) if found else None
+
+def as_money(value):
+    # "Budget (US$)" is already converted by format_budget_and_gross*()
+    if value is None or isinstance(value, float):
+        return None if value is None or np.isnan(value) else value
+    return money_conversion(value)
+
+def as_date(value):
+    # "Release date" may already be converted by format_release_dates_batch()
+    if value is None or isinstance(value, datetime):
+        return value
+    return date_conversion(value)
+
+converters = {'text': as_text, 'category': as_text, 'names': as_names,
+              'minutes': as_minutes, 'money': as_money, 'date': as_date}
+
+def convert_value(kind, value):
+    return converters[kind](value)
+
+def to_records(movie_list):
+    '''
+    MovieRecords of a list of parse_info_box() dicts.  The money and date values are converted
+    per column with money_conversion_batch() / date_conversion_batch() (each distinct date
+    string parsed once), the other fields value by value.
+    '''
+    rows = []       # ({field name: value}, extras) per movie
+    batch = {}      # field name -> ([row dicts], [raw values]) still to convert in one batch
+    for movie_info in movie_list:
+        fields, extras = split_infobox(movie_info)
+        values = {}
+        for field, value in fields:
+            if field.kind in ('money', 'date') and isinstance(value, (str, list)):
+                pending = batch.setdefault(field, ([], []))
+                pending[0].append(values)
+                pending[1].append(value)
+            else:
+                values[field.name] = convert_value(field.kind, value)
+        rows.append((values, extras))
+
+    for field, (targets, raw) in batch.items():
+        if field.kind == 'money':
+            converted = [None if np.isnan(amount) else float(amount)
+                         for amount in money_conversion_batch(pd.Series(raw, dtype=object))]
+        else:
+            converted = [None if pd.isna(date) else date.to_pydatetime() for date in date_conversion_batch(raw)]
+        for values, value in zip(targets, converted):
+            values[field.name] = value
+
+    return [MovieRecord._from_fields(values, extras) for values, extras in rows]
+
+def records_to_dataframe(records, extras=False):
+    '''
+    DataFrame of MovieRecords with one typed column per field (see KIND_DTYPES);
+    extras=True adds an "extras" column holding each record's extras dict
+    '''
+    columns = {}
+    for field in FIELDS:
+        columns[field.name] = pd.Series(list(map(attrgetter(field.name), records)), dtype=KIND_DTYPES[field.kind])
+    if extras:
+        columns['extras'] = pd.Series([record.extras for record in records], dtype=object)
+    return pd.DataFrame(columns, copy=False)
@@ -1,6 +1,24 @@
 from bs4 import BeautifulSoup as bs
 
-import requests
+# importable once main.py (or a benchmark) has put the repo root on sys.path
+from shared.http_session import get_session
+
+# optional C-based parsers used to locate the infobox quickly - see parse_info_box()
+try:
+    import lxml.html
+    # wikipedia pages are utf-8 - lxml would read the bytes of a page without <meta charset> as latin-1
+    lxml_utf8_parser = lxml.html.HTMLParser(encoding='utf-8')
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        # older selectolax releases only ship the "modest" backend
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
 
 # %%
 # --- BEGIN functions that handle data formatting
@@ -45,36 +63,102 @@ def get_dict_val(row_data):
     else:
         return row_data.get_text(" ", strip=True).replace("\xa0", " ")
 
+# download the raw html of a movie's wiki page
+def fetch_page(href):
+    # use the shared keep-alive session so every movie page reuses a pooled connection
+    resp = get_session().get(href)
+    # raise an HTTPError for a 4xx/5xx response instead of trying to parse an error page
+    resp.raise_for_status()
+    return resp.content
+
 # process the infobox to gather all information from a movie
 def get_info_box(movie_indx, href):
-    resp = requests.get(href)
-    if resp.ok:
-        movie_html = bs(resp.content, 'html.parser')
-
-    # first check if mov object has an "infobox-header summary" - if present, DO NOT PROCESS as it is not a movie
-    if movie_html.find("th", class_= "infobox-header summary"):
-        raise Exception(f"{href} is incorrectly linked to a TV show, not movie")
+    return parse_info_box(movie_indx, href, fetch_page(href))
+
+# --- parser backends ---
+# Building a BeautifulSoup tree of the WHOLE page with the pure-python 'html.parser' is by far the
+# most expensive part of get_info_box().  All the data we need sits in ONE table, so the fast
+# backends use a C parser (lxml or selectolax) to find "table.infobox.vevent", and only that
+# small html fragment is handed to BeautifulSoup.  The movie_info dicts come out identical.
+PARSER_BACKENDS = ('selectolax', 'lxml', 'html.parser')
+
+def available_backends():
+    installed = {'selectolax': HTMLParser is not None, 'lxml': lxml is not None, 'html.parser': True}
+    return [backend for backend in PARSER_BACKENDS if installed[backend]]
+
+def default_backend():
+    # the fastest backend that is installed
+    return available_backends()[0]
+
+# the pages that can't be turned into a movie_info dict - "category" is the name run_metrics.py
+# counts them under (an Exception subclass still pickles, so it comes back from a worker process)
+class ScrapeError(Exception):
+    category = 'scrape_error'
+
+class TvShowLinkError(ScrapeError):
+    category = 'tv_show'
+
+class NoInfoboxError(ScrapeError):
+    category = 'no_infobox'
+
+def tv_show_error(href):
+    return TvShowLinkError(f"{href} is incorrectly linked to a TV show, not movie")
+
+def find_infobox_lxml(content, href):
+    doc = lxml.html.fromstring(content, parser=lxml_utf8_parser)
+    if doc.xpath('//th[@class="infobox-header summary"]'):
+        raise tv_show_error(href)
+    tables = doc.xpath('//table[contains(concat(" ", normalize-space(@class), " "), " infobox ")'
+                       ' and contains(concat(" ", normalize-space(@class), " "), " vevent ")]')
+    return lxml.html.tostring(tables[0], encoding='unicode', with_tail=False) if tables else None
+
+def find_infobox_selectolax(content, href):
+    doc = HTMLParser(content)
+    if doc.css_first('th[class="infobox-header summary"]'):
+        raise tv_show_error(href)
+    table = doc.css_first('table.infobox.vevent')
+    return table.html if table else None
+
+# parse an already downloaded movie page - kept apart from fetch_page() so that the
+# fetch engine can download pages concurrently and parse them as they arrive
+def parse_info_box(movie_indx, href, content, backend=None):
+    backend = backend or default_backend()
+
+    if backend == 'html.parser':
+        movie_html = bs(content, 'html.parser')
+
+        # first check if mov object has an "infobox-header summary" - if present, DO NOT PROCESS as it is not a movie
+        if movie_html.find("th", class_= "infobox-header summary"):
+            raise tv_show_error(href)
     else:
-        clean_up_references(movie_html)
-
-        # Grab table tag with class="infobox vevent", as it contains all the movie info data we need
-        infobox = movie_html.select_one("table.infobox.vevent") # infobox is under table element class=infobox.vevent
-
-        # get infobox table rows (info_tr) from the infobox
-        info_tr = infobox.select("tr")
-        # print(f"{info_tr = }")
-
-        movie_info = {}
-        for idx, row in enumerate(info_tr):
-            if idx==0:
-                movie_title = row.find("th").get_text(" ", strip=True)
-                movie_info['title'] = f"# {movie_indx:03d}: {movie_title}"
-                # add the wiki link for the movie in the dictionary
-                movie_info['wiki_link'] = href
-            # elif index > 1:
-            elif row.find("th"):  # if there is a row header then process
-                d_key = row.find("th").get_text(" ", strip=True)
-                d_val = get_dict_val(row.find("td"))
-                movie_info[d_key] = d_val
+        find_infobox = find_infobox_lxml if backend == 'lxml' else find_infobox_selectolax
+        infobox_html = find_infobox(content, href)
+        if infobox_html is None:
+            raise NoInfoboxError(f"{href} has no movie infobox")
+        movie_html = bs(infobox_html, 'html.parser')
+
+    clean_up_references(movie_html)
+
+    # Grab table tag with class="infobox vevent", as it contains all the movie info data we need
+    infobox = movie_html.select_one("table.infobox.vevent") # infobox is under table element class=infobox.vevent
+    if infobox is None:
+        raise NoInfoboxError(f"{href} has no movie infobox")
+
+    # get infobox table rows (info_tr) from the infobox
+    info_tr = infobox.select("tr")
+    # print(f"{info_tr = }")
+
+    movie_info = {}
+    for idx, row in enumerate(info_tr):
+        if idx==0:
+            movie_title = row.find("th").get_text(" ", strip=True)
+            movie_info['title'] = f"# {movie_indx:03d}: {movie_title}"
+            # add the wiki link for the movie in the dictionary
+            movie_info['wiki_link'] = href
+        # elif index > 1:
+        elif row.find("th"):  # if there is a row header then process
+            d_key = row.find("th").get_text(" ", strip=True)
+            d_val = get_dict_val(row.find("td"))
+            movie_info[d_key] = d_val
 
     return movie_info
@@ -0,0 +1,218 @@
+'''
+    On-disk HTTP response cache for the wikipedia scraper.
+
+    Every run of main.py used to re-download the list page and every movie page, even though
+    almost none of them change between runs.  ResponseCache sits between the scraper and the
+    shared HTTP session:
+
+    - bodies are stored gzip-compressed and content-addressed (file name = sha256 of the body),
+      so two urls serving the same page only take up disk space once
+    - index.json maps each url to its body digest plus the ETag / Last-Modified headers
+    - a cached url is revalidated with a conditional GET (If-None-Match / If-Modified-Since),
+      a "304 Not Modified" answer means we just read the body from disk
+    - entries younger than max_age seconds are served without contacting the server at all
+    - when the cache grows past max_bytes, the least recently used urls are evicted
+    - offline=True never touches the network: cached urls are served as-is, anything else
+      raises CacheMiss.  Handy to rerun the parsing and cleaning stages with no network.
+
+    Example:
+        with ResponseCache(Path('.http_cache'), max_age=24*60*60) as cache:
+            content = cache.fetch('https://en.wikipedia.org/wiki/Toy_Story_3')
+'''
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+import time
+
+from modules.run_metrics import report_fetch_source
+from shared.http_session import get_session
+
+
+class CacheMiss(Exception):
+    '''
+    Raised in offline mode when a url is not in the cache
+    '''
+    category = 'cache_miss'
+
+
+class ResponseCache:
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024, max_age=0, offline=False, session=None):
+        self.cache_dir = Path(cache_dir)
+        self.bodies_dir = self.cache_dir / 'bodies'
+        self.index_file = self.cache_dir / 'index.json'
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.offline = offline
+        self.session = session
+        self.hits = self.revalidated = self.misses = self.evictions = 0
+        self._lock = threading.Lock()
+
+        self.bodies_dir.mkdir(parents=True, exist_ok=True)
+        self.index = json.loads(self.index_file.read_text()) if self.index_file.exists() else {}
+        self._refs = {}     # body digest -> number of urls pointing to it
+        self._bytes = 0     # size of all the body files
+        for entry in self.index.values():
+            self._add_ref(entry)
+        self._dirty = False
+
+    # --- body storage (content-addressed) ---
+    def _body_path(self, digest):
+        return self.bodies_dir / digest[:2] / f'{digest}.gz'
+
+    def _read_cached_body(self, url, entry):
+        '''
+        The cached body of url, None when it is gone - read under the lock, as a concurrent
+        _store() may evict the entry and delete its body file
+        '''
+        with self._lock:
+            try:
+                compressed = self._body_path(entry['digest']).read_bytes()
+            except FileNotFoundError:
+                # the body file was deleted behind our back - forget the url, it is fetched again
+                if self.index.get(url) is entry:
+                    del self.index[url]
+                    self._release(entry)
+                    self._dirty = True
+                return None
+        return gzip.decompress(compressed)
+
+    def _write_body(self, content):
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._body_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            # write to a temp file and rename, so a crash never leaves a half-written body behind
+            tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            tmp.write_bytes(gzip.compress(content))
+            os.replace(tmp, path)
+        return digest, path.stat().st_size
+
+    # --- index (all of these are called with the lock held) ---
+    def _save_index(self):
+        tmp = self.index_file.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.index))
+        os.replace(tmp, self.index_file)
+        self._dirty = False
+
+    def _add_ref(self, entry):
+        # bodies are shared between urls - count the urls per digest, and the bytes of every digest once
+        if self._refs.get(entry['digest'], 0) == 0:
+            self._bytes += entry['size']
+        self._refs[entry['digest']] = self._refs.get(entry['digest'], 0) + 1
+
+    def _release(self, entry):
+        # one url less points to the body - the file is deleted once no url points to it anymore
+        self._refs[entry['digest']] -= 1
+        if self._refs[entry['digest']] == 0:
+            del self._refs[entry['digest']]
+            self._bytes -= entry['size']
+            self._body_path(entry['digest']).unlink(missing_ok=True)
+
+    def _evict(self):
+        '''
+        drop least recently used urls until the cache fits in max_bytes again
+        '''
+        if self._bytes <= self.max_bytes:
+            return
+        for url, entry in sorted(self.index.items(), key=lambda item: item[1]['last_access']):
+            if self._bytes <= self.max_bytes:
+                break
+            del self.index[url]
+            self.evictions += 1
+            self._release(entry)
+
+    def _store(self, url, response):
+        digest, size = self._write_body(response.content)
+        with self._lock:
+            self.misses += 1
+            old_entry = self.index.get(url)
+            self.index[url] = entry = {
+                'digest': digest,
+                'size': size,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched': time.time(),
+                'last_access': time.time(),
+            }
+            self._add_ref(entry)
+            # the page changed - its old body is garbage unless another url shares it
+            if old_entry:
+                self._release(old_entry)
+            self._evict()
+            # index.json is written by flush(), not after every page - rewriting the whole
+            # index per store made a crawl O(n^2).  A crash only loses index entries: their
+            # pages are downloaded again (and land on the same content-addressed body files)
+            self._dirty = True
+
+    # --- public api ---
+    def fetch(self, url):
+        '''
+        Return the body of url, from the cache when possible
+        '''
+        with self._lock:
+            entry = self.index.get(url)
+            if entry:
+                entry['last_access'] = time.time()
+                self._dirty = True
+
+        if entry and (self.offline or time.time() - entry['fetched'] < self.max_age):
+            content = self._read_cached_body(url, entry)
+            if content is not None:
+                with self._lock:
+                    self.hits += 1
+                report_fetch_source('cache_hit')
+                return content
+            entry = None
+        if self.offline:
+            raise CacheMiss(f'{url} is not in the response cache (offline mode)')
+
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        response = (self.session or get_session()).get(url, headers=headers)
+        if entry and response.status_code == 304:
+            content = self._read_cached_body(url, entry)
+            if content is not None:
+                with self._lock:
+                    self.revalidated += 1
+                    entry['fetched'] = time.time()
+                report_fetch_source('revalidated')
+                return content
+            # evicted while we were revalidating - download it again, unconditionally
+            response = (self.session or get_session()).get(url)
+
+        response.raise_for_status()
+        self._store(url, response)
+        report_fetch_source('downloaded')
+        return response.content
+
+    def flush(self):
+        '''
+        persist the index - new pages, access times, revalidation times - to index.json
+        '''
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'urls': len(self.index),
+                'bytes': self._bytes,
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
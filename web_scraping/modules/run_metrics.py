@@ -0,0 +1,234 @@
+'''
+    Instrumentation for a scrape run: stage timers, histograms, counters, error categories
+    and a machine-readable run report.
+
+    "Process Completed: 412.3" says how long a run took, not why.  A RunMetrics collects
+
+    - stages      wall-clock time of each step of main.py - list pages, crawl, money
+                  conversion, date conversion, serialize ... (with metrics.stage('name'): ...)
+    - histograms  per-page distributions: fetch latency, time waiting for the rate limiter,
+                  parse time (measured inside the parse worker), page size
+    - counters    pages fetched / parsed, bytes downloaded ...
+    - errors      failed pages by category - 'tv_show', 'no_infobox', 'cache_miss', 'http_404',
+                  'timeout', 'connection' or the exception's class name - with a few example urls
+
+    The fetch figures are split by where the page came from - 'downloaded' (a body over the
+    network), 'revalidated' (a "304 Not Modified" round trip) or 'cache_hit' (read from disk).
+    Only downloads go into fetch_seconds and bytes_downloaded; a rerun served from the response
+    cache would otherwise hide the real network cost behind hundreds of ~0 ms "fetches".
+    A fetch function tells which it was with report_fetch_source() (ResponseCache.fetch does),
+    a fetch that doesn't say counts as a download.
+
+    crawl() (fetch_engine.py) fills in the per-page figures when it is given metrics=...
+    With all of it in one report, a slow run shows whether the time went into the network
+    (fetch latency), the parser (parse time) or the rate limiter (rate_limit_wait).
+
+        metrics = RunMetrics()
+        with metrics.stage('crawl'):
+            crawl_movie_pages(links, metrics=metrics)
+        print(metrics.format_report())
+        metrics.save_report(Path('run_report.json'))
+'''
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import json
+import math
+import threading
+import time
+
+import requests
+
+# upper bounds (seconds) of the latency histogram buckets - the last bucket is "more than 10s"
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# upper bounds (bytes) of the page size histogram buckets
+SIZE_BUCKETS = (10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000)
+
+# failed urls kept per error category, as examples for the report
+ERROR_EXAMPLES = 5
+
+# where a fetched page came from -> (latency histogram, page counter)
+FETCH_SOURCES = {
+    'downloaded': ('fetch_seconds', 'pages_downloaded'),
+    'revalidated': ('revalidate_seconds', 'pages_revalidated'),
+    'cache_hit': ('cache_hit_seconds', 'pages_from_cache'),
+}
+
+# the source of the last fetch of each thread - the fetch runs on a worker thread, and crawl()
+# reads its source back on that same thread (see take_fetch_source())
+_fetch_source = threading.local()
+
+
+def report_fetch_source(source):
+    '''
+    Called by a fetch function: how it served the page of the current call (a FETCH_SOURCES key)
+    '''
+    _fetch_source.value = source
+
+
+def take_fetch_source():
+    # the source reported by the last fetch on this thread ('downloaded' if none), and clear it
+    source = getattr(_fetch_source, 'value', None) or 'downloaded'
+    _fetch_source.value = None
+    return source
+
+
+def percentile(ordered, pct):
+    # nearest-rank percentile of an already sorted list
+    return ordered[max(math.ceil(len(ordered) * pct / 100), 1) - 1]
+
+
+def error_category(exc):
+    '''
+    Short name of the kind of failure - the exception's own `category` (ScrapeError,
+    CacheMiss), the HTTP status, timeout / connection, or else the class name
+    '''
+    category = getattr(exc, 'category', None)
+    if category:
+        return category
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return f'http_{exc.response.status_code}'
+    if isinstance(exc, requests.Timeout):
+        return 'timeout'
+    if isinstance(exc, requests.ConnectionError):
+        return 'connection'
+    return type(exc).__name__
+
+
+class Histogram:
+    '''
+    Keeps every value (a run has hundreds of pages, not millions) - the report gives the
+    summary statistics, percentiles and the counts per bucket
+    '''
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.values = []
+
+    def add(self, value):
+        self.values.append(value)
+
+    def report(self):
+        if not self.values:
+            return {'count': 0}
+        ordered = sorted(self.values)
+        counts = [0] * (len(self.buckets) + 1)
+        for value in ordered:
+            counts[next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))] += 1
+        labels = [f'<={bound}' for bound in self.buckets] + [f'>{self.buckets[-1]}']
+        return {
+            'count': len(ordered),
+            'sum': round(sum(ordered), 6),
+            'mean': round(sum(ordered) / len(ordered), 6),
+            'min': round(ordered[0], 6),
+            'p50': round(percentile(ordered, 50), 6),
+            'p95': round(percentile(ordered, 95), 6),
+            'p99': round(percentile(ordered, 99), 6),
+            'max': round(ordered[-1], 6),
+            'buckets': dict(zip(labels, counts)),
+        }
+
+
+class RunMetrics:
+    '''
+    Thread-safe collector for one scrape run (the crawl reports from the event loop, the
+    stages may be timed from any thread)
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.stages = {}            # name -> [calls, seconds]
+        self.counters = {}
+        self.histograms = {
+            'fetch_seconds': Histogram(LATENCY_BUCKETS),
+            'revalidate_seconds': Histogram(LATENCY_BUCKETS),
+            'cache_hit_seconds': Histogram(LATENCY_BUCKETS),
+            'rate_limit_wait_seconds': Histogram(LATENCY_BUCKETS),
+            'parse_seconds': Histogram(LATENCY_BUCKETS),
+            'page_bytes': Histogram(SIZE_BUCKETS),
+        }
+        self.errors = {}            # category -> {'count': n, 'stages': {stage: n}, 'examples': [url, ...]}
+        self.info = {}              # anything else for the report, e.g. the response cache stats
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                calls_seconds = self.stages.setdefault(name, [0, 0.0])
+                calls_seconds[0] += 1
+                calls_seconds[1] += seconds
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, value):
+        with self._lock:
+            self.histograms[name].add(value)
+
+    # --- called by crawl() ---
+    def record_fetch(self, seconds, nbytes, rate_limit_wait, source='downloaded'):
+        histogram, counter = FETCH_SOURCES[source]
+        with self._lock:
+            self.histograms[histogram].add(seconds)
+            self.histograms['rate_limit_wait_seconds'].add(rate_limit_wait)
+            self.histograms['page_bytes'].add(nbytes)
+            self.counters['pages_fetched'] = self.counters.get('pages_fetched', 0) + 1
+            self.counters[counter] = self.counters.get(counter, 0) + 1
+            if source == 'downloaded':
+                self.counters['bytes_downloaded'] = self.counters.get('bytes_downloaded', 0) + nbytes
+
+    def record_parse(self, seconds):
+        with self._lock:
+            self.histograms['parse_seconds'].add(seconds)
+            self.counters['pages_parsed'] = self.counters.get('pages_parsed', 0) + 1
+
+    def record_error(self, stage, url, exc):
+        category = error_category(exc)
+        with self._lock:
+            error = self.errors.setdefault(category, {'count': 0, 'stages': {}, 'examples': []})
+            error['count'] += 1
+            error['stages'][stage] = error['stages'].get(stage, 0) + 1
+            if len(error['examples']) < ERROR_EXAMPLES:
+                error['examples'].append(url)
+
+    # --- the report ---
+    def report(self):
+        with self._lock:
+            return {
+                'started': datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+                'wall_seconds': round(time.perf_counter() - self._start, 6),
+                'stages': {name: {'calls': calls, 'seconds': round(seconds, 6)}
+                           for name, (calls, seconds) in self.stages.items()},
+                'counters': dict(self.counters),
+                'histograms': {name: histogram.report() for name, histogram in self.histograms.items()},
+                'errors': {category: {**error, 'examples': list(error['examples'])}
+                           for category, error in self.errors.items()},
+                'info': dict(self.info),
+            }
+
+    def save_report(self, fname):
+        with fname.open('w') as f:
+            json.dump(self.report(), f, indent=4, default=str)
+
+    def format_report(self):
+        report = self.report()
+        lines = [f"run: {report['wall_seconds']:.2f}s"]
+        for name, stage in report['stages'].items():
+            lines.append(f"  {name:<24} {stage['seconds']:9.3f}s  ({stage['calls']} calls)")
+        for name in ('fetch_seconds', 'revalidate_seconds', 'rate_limit_wait_seconds', 'parse_seconds'):
+            histogram = report['histograms'][name]
+            if histogram['count']:
+                lines.append(f"  {name:<24} p50 {histogram['p50']:.3f}s  p95 {histogram['p95']:.3f}s  "
+                             f"max {histogram['max']:.3f}s  total {histogram['sum']:.2f}s")
+        counters = report['counters']
+        lines.append(f"  pages fetched {counters.get('pages_fetched', 0)} (downloaded {counters.get('pages_downloaded', 0)}, "
+                     f"revalidated {counters.get('pages_revalidated', 0)}, from cache {counters.get('pages_from_cache', 0)}), "
+                     f"parsed {counters.get('pages_parsed', 0)}, {counters.get('bytes_downloaded', 0) / 1e6:.1f} MB downloaded")
+        for category, error in sorted(report['errors'].items(), key=lambda item: -item[1]['count']):
+            lines.append(f"  errors {category:<17} {error['count']:5}  e.g. {error['examples'][0]}")
+        return '\n'.join(lines)
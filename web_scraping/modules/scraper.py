@@ -0,0 +1,154 @@
+'''
+    Multi-source scraper - crawl several wikipedia lists of films in one job.
+
+    main.py used to hardcode everything about ONE list: the list page url, the
+    ".wikitable.sortable i a" selector that finds the movie links on it, and the infobox
+    parser for the movie pages.  Here those three are the settings of a FilmListSource:
+
+    - list_url       - the page listing the films
+    - link_selector  - css selector of the film links on that page (the list-page extractor)
+    - link_filter    - link_filter(url) -> True to crawl the link (default: wikipedia articles only)
+    - parse          - parse(movie_indx, href, content) -> movie_info dict for a film page
+                       (the detail-page extractor, default parse_info_box)
+
+    plan_scrape() downloads the list pages and merges their links in a URLFrontier
+    (url_frontier.py): every link is canonicalized, so a film that is on several lists - or
+    linked with a fragment, the mobile host, a redirect seen in an earlier run ... - gets ONE
+    movie_indx and is downloaded and parsed only once.  The links of all the sources then go
+    through a single crawl() (fetch_engine.py) - one rate limiter, one pool of downloads and
+    one parse pool for the whole job - in priority order (FilmListSource(priority=...), lower
+    first).  Redirects found during the crawl are reported as duplicates, not parsed again.
+
+    The numbering follows the lists in order, every <a> tag counting (as in main.py), and a
+    film seen before keeps its first number - so for the Disney list alone the movie_indx
+    values are the same as main.py's, and existing checkpoint journals stay valid.
+
+    Example:
+        animation = FilmListSource('animation', 'https://en.wikipedia.org/wiki/List_of_Walt_Disney_Animation_Studios_films')
+        movies = scrape([DISNEY_FILMS, animation], fetch=response_cache.fetch, max_concurrency=8, rate=5.0)
+        movies['animation']   # movie_info dicts, in list order
+'''
+from collections import namedtuple
+import concurrent.futures
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup as bs
+
+from modules.fetch_engine import crawl_movie_pages
+from modules.processing_data import fetch_page, parse_info_box
+from modules.url_frontier import URLFrontier, canonicalize_url
+
+# namespaces of wikipedia pages that are not articles ("File:Poster.jpg", "Category:..." ...)
+NON_ARTICLE_PREFIXES = ('File:', 'Category:', 'Help:', 'Special:', 'Template:', 'Wikipedia:', 'Portal:', 'Talk:')
+
+
+def wiki_article_filter(url):
+    '''
+    Default link filter: links to wikipedia articles - no red links ("index.php?action=edit"),
+    other namespaces or other sites
+    '''
+    parts = urlsplit(url)
+    if not parts.netloc.endswith('wikipedia.org') or not parts.path.startswith('/wiki/'):
+        return False
+    return not parts.path[len('/wiki/'):].startswith(NON_ARTICLE_PREFIXES)
+
+
+class FilmListSource:
+    def __init__(self, name, list_url, link_selector='.wikitable.sortable i a', link_filter=wiki_article_filter,
+                 parse=parse_info_box, priority=0):
+        self.name = name
+        self.list_url = list_url
+        self.link_selector = link_selector
+        self.link_filter = link_filter
+        # must be a module-level function when the pages are parsed on a ProcessPoolExecutor
+        self.parse = parse
+        # the links of the sources with the lowest priority are crawled first
+        self.priority = priority
+
+    def extract_links(self, content):
+        '''
+        [(film title, canonical url or None)] of the links on the list page, in page order -
+        url is None for a link without href or one rejected by link_filter
+        '''
+        links = []
+        for anchor in bs(content, 'html.parser').select(self.link_selector):
+            href = anchor.get('href')
+            url = canonicalize_url(href, self.list_url) if href else None
+            if url and self.link_filter and not self.link_filter(url):
+                url = None
+            links.append((anchor.get_text().strip(), url))
+        return links
+
+    def __repr__(self):
+        return f'FilmListSource({self.name!r}, {self.list_url!r})'
+
+
+# the list main.py has always scraped
+DISNEY_FILMS = FilmListSource('disney', 'https://en.wikipedia.org/wiki/List_of_Walt_Disney_Pictures_films')
+
+# movie_links - [(movie_indx, url, parse)] to crawl, each film once, in priority order
+# source_links - {source name: [movie_indx, ...]} in list order, shared films included
+# skipped - [(source name, film title)] of the links without a (wanted) url
+# duplicates - number of links that were already listed by an earlier source (or earlier on the same list)
+# frontier - the URLFrontier of the links - its fetcher() spots redirects during the crawl
+ScrapePlan = namedtuple('ScrapePlan', ['movie_links', 'source_links', 'skipped', 'duplicates', 'frontier'])
+
+
+def fetch_list_pages(sources, fetch=fetch_page):
+    # the few list pages are downloaded in parallel; their links are merged in source order
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(sources), 1), thread_name_prefix='list') as pool:
+        return list(pool.map(lambda source: fetch(source.list_url), sources))
+
+
+def plan_scrape(sources, fetch=fetch_page, frontier=None):
+    '''
+    Download the list pages of the sources and number their film links (see the module
+    docstring).  Pass a frontier to choose its dedup mode or give it the aliases of an earlier run.
+    '''
+    if frontier is None:
+        frontier = URLFrontier()
+    source_links, skipped = {}, []
+    for source, content in zip(sources, fetch_list_pages(sources, fetch)):
+        indices = source_links.setdefault(source.name, [])
+        for title, url in source.extract_links(content):
+            if url is None:
+                skipped.append((source.name, title))
+                # every link counts for the numbering, also the ones that aren't crawled
+                frontier.skip_ids(1)
+                continue
+            movie_indx, is_new = frontier.add(url, priority=source.priority, data=source.parse)
+            if not is_new:
+                frontier.skip_ids(1)
+            # None: a duplicate in a 'bloom' frontier, which can't tell what it duplicates
+            if movie_indx is not None:
+                indices.append(movie_indx)
+    return ScrapePlan(frontier.drain(), source_links, skipped, frontier.duplicates, frontier)
+
+
+def movies_by_source(plan, completed):
+    '''
+    {source name: [movie_info, ...]} in list order, from a {movie_indx: movie_info} dict
+    (e.g. CheckpointJournal.completed) - a link that turned out to be a redirect gets the
+    movie of the link it duplicates, films that failed are left out
+    '''
+    resolve = plan.frontier.resolve
+    return {name: [completed[resolve(indx)] for indx in indices if resolve(indx) in completed]
+            for name, indices in plan.source_links.items()}
+
+
+def scrape(sources, fetch=fetch_page, frontier=None, **crawl_kwargs):
+    '''
+    plan_scrape() + ONE crawl of all the links; crawl_kwargs go to crawl_movie_pages()
+    (max_concurrency, rate, burst, on_result, parse_executor ...)
+    '''
+    plan = plan_scrape(sources, fetch, frontier)
+    completed = {}
+    on_result = crawl_kwargs.pop('on_result', None)
+
+    def collect(movie_indx, movie_info):
+        completed[movie_indx] = movie_info
+        if on_result:
+            on_result(movie_indx, movie_info)
+
+    crawl_movie_pages(plan.movie_links, fetch=plan.frontier.fetcher(fetch), on_result=collect, **crawl_kwargs)
+    return movies_by_source(plan, completed)
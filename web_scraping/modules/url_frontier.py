@@ -0,0 +1,290 @@
+'''
+    URL frontier - the set of links still to crawl, each article once, in priority order.
+
+    The same wikipedia article can be linked in many ways:
+
+        /wiki/Toy_Story_3                       https://en.m.wikipedia.org/wiki/Toy_Story_3
+        /wiki/Toy_Story_3#Plot                  http://en.wikipedia.org/wiki/Toy_Story_3
+        //wiki/Toy_Story_3 (main.py's old       /wiki/Toy%20Story%203
+           f"https://en.wikipedia.org/{path}")  /w/index.php?title=Toy_Story_3
+        /wiki/Toy_Story_Three  - a redirect, served under its own url
+
+    canonicalize_url() maps every spelling onto one url.  The frontier numbers each canonical
+    url once, remembering them in a set - or, for very large link sets, in a BloomFilter
+    (fixed memory, but a false positive skips a link that was never crawled, and a duplicate
+    can't be traced back to the link it duplicates).
+
+    Redirects can't be seen in the url: wikipedia serves the redirected article under the
+    alias url, with the real url in <link rel="canonical">.  record_page() reads that link
+    after the first fetch: the alias is remembered (later links to it are duplicates right
+    away, and save_aliases() keeps them for the next run), and when two links turn out to be
+    the same article, the one with the LOWEST link id keeps it - whichever download finished
+    first - so the numbering doesn't depend on the timing of a concurrent crawl, and it is
+    the link the saved aliases keep on the next run.
+
+    Links come out of drain() in priority order - lower priority first, then in the order they
+    were added - which is the order crawl() starts the downloads in.
+
+        frontier = URLFrontier()
+        for href in hrefs:
+            frontier.add(href, base='https://en.wikipedia.org/wiki/List_of_Walt_Disney_Pictures_films')
+        crawl_movie_pages(frontier.drain(), fetch=frontier.fetcher(fetch_page))
+'''
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import re
+import threading
+from functools import lru_cache
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urljoin, urlsplit, urlunsplit
+
+from modules.processing_data import ScrapeError
+
+# characters left as they are in a path - everything else is percent-encoded the same way
+PATH_SAFE = "/:@!$&'()*+,;=-._~"
+
+# query parameters that never change the page
+TRACKING_PARAMS = ('utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'oldformat')
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+canonical_link_pattern = re.compile(rb'<link\s+rel="canonical"\s+href="([^"]+)"', flags=re.I)
+
+
+def _wiki_title(title):
+    # wikipedia titles: spaces are underscores, and the first letter is always upper case
+    title = title.replace(' ', '_').strip('_')
+    return title[:1].upper() + title[1:]
+
+
+@lru_cache(maxsize=64)
+def _wiki_origin(base):
+    # "https://en.wikipedia.org" for a page of a wikipedia site, None for any other base
+    parts = urlsplit(base)
+    host = (parts.hostname or '').rstrip('.')
+    if not host.endswith('wikipedia.org') or parts.port:
+        return None
+    return 'https://' + host.replace('.m.wikipedia.org', '.wikipedia.org')
+
+
+def canonicalize_url(url, base=None):
+    '''
+    One spelling per page: absolute, lower case scheme and host, no default port, no
+    fragment, single slashes, the same percent-encoding, sorted query without tracking
+    parameters.  For wikipedia also: https, desktop host ("en.m." -> "en."), and
+    /w/index.php?title=X and "/wiki/x y" both become /wiki/X_y.
+    '''
+    # fast path for what almost every link on a list page is - "/wiki/Title" (maybe with a
+    # #fragment) on a wikipedia page - same result as below without urljoin() and urlsplit()
+    if base and url.startswith('/wiki/') and '?' not in url and '/.' not in url:
+        origin = _wiki_origin(base)
+        if origin:
+            path = unquote(re.sub(r'/{2,}', '/', url.partition('#')[0].strip()))
+            path = '/wiki/' + _wiki_title(path[len('/wiki/'):])
+            return origin + quote(path, safe=PATH_SAFE)
+    if base:
+        url = urljoin(base, url)
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'https').lower()
+    host = (parts.hostname or '').rstrip('.')
+    # decoded ONCE here and encoded once at the end - "100%2525" is the title "100%25", not "100%"
+    path = unquote(re.sub(r'/{2,}', '/', parts.path)) or '/'
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key not in TRACKING_PARAMS]
+
+    if host.endswith('wikipedia.org'):
+        scheme = 'https'
+        host = host.replace('.m.wikipedia.org', '.wikipedia.org')
+        if path == '/w/index.php' and [key for key, _ in query] == ['title']:
+            path, query = '/wiki/' + query[0][1], []
+        if path.startswith('/wiki/'):
+            path = '/wiki/' + _wiki_title(path[len('/wiki/'):])
+
+    netloc = host
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{host}:{parts.port}'
+    return urlunsplit((scheme, netloc, quote(path, safe=PATH_SAFE), urlencode(sorted(query)), ''))
+
+
+def canonical_link(content):
+    # the <link rel="canonical" href="..."> of a page, None when it has none
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    found = canonical_link_pattern.search(content)
+    return found.group(1).decode('utf-8', 'replace') if found else None
+
+
+class BloomFilter:
+    '''
+    Set membership in a fixed amount of memory - `in` may answer True for an item that was
+    never added (with probability error_rate once `capacity` items are in), never False for
+    one that was
+    '''
+    def __init__(self, capacity=1_000_000, error_rate=0.001):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # double hashing - k positions from the two halves of one 128-bit digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __len__(self):
+        return self.count
+
+
+class DuplicatePage(ScrapeError):
+    '''
+    The page turned out to be an article that a link with a lower id fetched under another url (a redirect)
+    '''
+    category = 'duplicate'
+
+
+class URLFrontier:
+    '''
+    dedup      - 'set' (exact) or 'bloom' (fixed memory, see BloomFilter)
+    capacity / error_rate - size of the Bloom filter
+    first_id   - number given to the first link; every new canonical url gets the next one
+    aliases    - {alias url: canonical url} known from an earlier run (see save_aliases())
+    '''
+    def __init__(self, dedup='set', capacity=1_000_000, error_rate=0.001, first_id=1, aliases=None):
+        if dedup not in ('set', 'bloom'):
+            raise ValueError(f"dedup must be 'set' or 'bloom', not {dedup!r}")
+        self._lock = threading.Lock()
+        self.dedup = dedup
+        # canonical url -> link id ('set'), or a BloomFilter of the canonical urls ('bloom')
+        self._seen = {} if dedup == 'set' else BloomFilter(capacity, error_rate)
+        self.aliases = dict(aliases or {})
+        self._heap = []
+        self._order = itertools.count()
+        self._next_id = first_id
+        self._pending = {}              # url -> link id of the links not fetched yet
+        self._fetched = {}              # canonical url of a fetched page -> link id
+        self.duplicate_of = {}          # link id -> id of the link it turned out to duplicate
+        self.added = self.duplicates = 0
+
+    def canonical(self, url, base=None):
+        url = canonicalize_url(url, base)
+        return self.aliases.get(url, url)
+
+    def add(self, url, base=None, priority=0, data=None):
+        '''
+        Queue a link unless its page is queued already.  Returns (link id, is_new): the id is
+        the one of the earlier link for a duplicate (None with dedup='bloom').  `data` is
+        passed through to drain() - e.g. the parse function of the link.
+        '''
+        url = self.canonical(url, base)
+        with self._lock:
+            self.added += 1
+            if url in self._seen:
+                self.duplicates += 1
+                return (self._seen[url] if self.dedup == 'set' else None), False
+            link_id = self._next_id
+            self._next_id += 1
+            if self.dedup == 'set':
+                self._seen[url] = link_id
+            else:
+                self._seen.add(url)
+            self._pending[url] = link_id
+            heapq.heappush(self._heap, (priority, next(self._order), link_id, url, data))
+            return link_id, True
+
+    def skip_ids(self, count):
+        # number the next link as if `count` links had been added (main.py counts links without href too)
+        with self._lock:
+            self._next_id += count
+
+    def drain(self):
+        '''
+        All the queued links as (link id, url) - (link id, url, data) when the link has data -
+        in priority order.  The frontier is empty afterwards; add() still knows every url.
+        '''
+        links = []
+        with self._lock:
+            while self._heap:
+                _, _, link_id, url, data = heapq.heappop(self._heap)
+                links.append((link_id, url) if data is None else (link_id, url, data))
+        return links
+
+    def __len__(self):
+        return len(self._heap)
+
+    def record_page(self, url, content):
+        '''
+        Check a fetched page for a redirect: returns the id of the link that keeps the same
+        article - a fetched link with a lower id - or None when this link keeps it: the page is
+        new, or it takes the article over from a higher id fetched before it (that id is then
+        listed in duplicate_of, and its movie must be dropped).  Also None when url isn't a
+        link of this frontier (not from drain(), or recorded already).  The alias is
+        remembered either way.
+        '''
+        url = canonicalize_url(url)
+        target = canonical_link(content)
+        target = canonicalize_url(target, url) if target else url
+        with self._lock:
+            link_id = self._pending.pop(url, None)
+            if target != url:
+                self.aliases[url] = target
+                # a link to the real url, added later, is a duplicate of this one
+                if self.dedup == 'bloom':
+                    self._seen.add(target)
+                elif link_id is not None:
+                    self._seen[target] = min(self._seen.get(target, link_id), link_id)
+            if link_id is None:
+                return None
+            keeper = self._fetched.get(target)
+            if keeper is not None and keeper < link_id:
+                self.duplicate_of[link_id] = keeper
+                return keeper
+            if keeper is not None:
+                # the lower id finished downloading after the higher one - it takes the article over
+                self.duplicate_of[keeper] = link_id
+            self._fetched[target] = link_id
+            return None
+
+    def fetcher(self, fetch):
+        '''
+        Wrap fetch(href) for crawl(): a page that turns out to be an article fetched already
+        (under another url) raises DuplicatePage, so crawl() skips it instead of parsing it again
+        '''
+        def fetch_once(href):
+            content = fetch(href)
+            earlier = self.record_page(href, content)
+            if earlier is not None:
+                raise DuplicatePage(f'{href} is the same article as link {earlier}')
+            return content
+        return fetch_once
+
+    def resolve(self, link_id):
+        # the id of the link whose page stands for link_id (a taken over keeper points on to the new one)
+        while link_id in self.duplicate_of:
+            link_id = self.duplicate_of[link_id]
+        return link_id
+
+    def save_aliases(self, fname):
+        with fname.open('w') as f:
+            json.dump(self.aliases, f, indent=1, sort_keys=True)
+
+    @staticmethod
+    def load_aliases(fname):
+        if not fname.exists():
+            return {}
+        with fname.open() as f:
+            return json.load(f)
+
+    def stats(self):
+        return {'added': self.added, 'duplicates': self.duplicates, 'queued': len(self._heap),
+                'aliases': len(self.aliases), 'duplicate_pages': len(self.duplicate_of), 'dedup': self.dedup}
@@ -0,0 +1,81 @@
+'''
+    unittests of modules/budget_gross_conversion.py - money_conversion_batch() must give what
+    money_conversion() gives, on the list path and on the vectorized (pandas Series) path
+
+    $ cd web_scraping && python -m unittest test_budget_gross_conversion
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from modules.budget_gross_conversion import money_conversion, money_conversion_batch
+
+# value -> what money_conversion() returns for it
+EDGE_CASES = [
+    ("$790,000", 790000.0),
+    ("$12.2 million", 12200000.0),
+    ("$1.5 BILLION", 1500000000.0),
+    ("$3 thousand", 3000.0),
+    # ranges - the first figure counts
+    ("$1-2 billion", 1000000000.0),
+    ("$3–4 million", 3000000.0),
+    ("$5 to 6 million", 5000000.0),
+    ("$120,000 - 400,000 million", 120000.0),
+    # the unit is found at a later dollar sign
+    ("$5 ($6 million)", 5000000.0),
+    ("N/A", None),
+    ("about 5 million", None),
+    # lists - the first amount with a dollar figure
+    (["£10 million", "$13 million"], 13000000.0),
+    (["£10 million"], None),
+    ([], None),
+    # <sup> leftovers of the infobox
+    ("$50 million<sup>[2]</sup>", 50000000.0),
+    ("$25 million[1]", 25000000.0),
+    ("<sup>$7,000</sup>", 7000.0),
+    # more than 15 digits - goes through money_conversion() on the vectorized path too
+    ("$1234567890123456789", 1234567890123456789.0),
+]
+
+
+def as_scalar(amount):
+    return None if np.isnan(amount) else float(amount)
+
+
+class TestMoneyConversionBatch(unittest.TestCase):
+    def test_scalar(self):
+        for money, expected in EDGE_CASES:
+            self.assertEqual(money_conversion(money), expected, msg=repr(money))
+
+    def test_list_path(self):
+        values = [money for money, _ in EDGE_CASES]
+        converted = money_conversion_batch(values)
+        self.assertEqual(converted.dtype, float)
+        self.assertEqual([as_scalar(amount) for amount in converted], [money_conversion(money) for money in values])
+
+    def test_series_path(self):
+        values = [money for money, _ in EDGE_CASES]
+        converted = money_conversion_batch(pd.Series(values, dtype=object))
+        self.assertEqual(converted.dtype, float)
+        self.assertEqual([as_scalar(amount) for amount in converted], [money_conversion(money) for money in values])
+
+    def test_one_value_at_a_time(self):
+        # a column of a single row (or with no unit anywhere) must not change the result
+        for money, expected in EDGE_CASES:
+            for values in ([money], pd.Series([money], dtype=object)):
+                self.assertEqual(as_scalar(money_conversion_batch(values)[0]), expected, msg=repr(money))
+
+    def test_values_the_scalar_raises_on(self):
+        # not a string: the list path raises like money_conversion(), the Series path treats it as missing
+        for money in (None, 5):
+            self.assertRaises(TypeError, money_conversion, money)
+            self.assertRaises(TypeError, money_conversion_batch, [money])
+            self.assertTrue(np.isnan(money_conversion_batch(pd.Series([money], dtype=object))[0]))
+        # a list holding a non-string raises on both paths
+        self.assertRaises(TypeError, money_conversion, ["$1", None])
+        self.assertRaises(TypeError, money_conversion_batch, pd.Series([["$1", None]], dtype=object))
+
+
+if __name__ == "__main__":
+    unittest.main()
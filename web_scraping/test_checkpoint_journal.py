@@ -0,0 +1,84 @@
+'''
+    unittests of modules/checkpoint_journal.py - a crawl that is stopped and started again
+    must only fetch the movies the journal doesn't have, even after a torn write
+
+    $ cd web_scraping && python -m unittest test_checkpoint_journal
+'''
+from pathlib import Path
+import tempfile
+import unittest
+
+from modules.checkpoint_journal import CheckpointJournal
+
+MOVIE_LINKS = [(1, '/wiki/Snow_White'), (2, '/wiki/Pinocchio'), (3, '/wiki/Fantasia')]
+
+
+def movie(href):
+    return {'title': href[len('/wiki/'):], 'wiki_link': href}
+
+
+class TestCheckpointJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.fname = Path(self.tmp_dir.name) / 'crawl.jsonl'
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_resume(self):
+        with CheckpointJournal(self.fname) as journal:
+            journal.append(3, movie('/wiki/Fantasia'))
+            journal.append(1, movie('/wiki/Snow_White'))
+
+        with CheckpointJournal(self.fname) as journal:
+            self.assertEqual(journal.pending(MOVIE_LINKS), [(2, '/wiki/Pinocchio')])
+            journal.append(2, movie('/wiki/Pinocchio'))
+            # in index order, not in the order the downloads finished
+            self.assertEqual([info['title'] for info in journal.results(MOVIE_LINKS)],
+                             ['Snow_White', 'Pinocchio', 'Fantasia'])
+            self.assertEqual(journal.pending(MOVIE_LINKS), [])
+
+    def test_extra_link_items_are_passed_through(self):
+        with CheckpointJournal(self.fname) as journal:
+            journal.append(1, movie('/wiki/Snow_White'))
+            links = [link + (str.upper,) for link in MOVIE_LINKS]
+            self.assertEqual(journal.pending(links), links[1:])
+
+    def test_torn_last_line(self):
+        with CheckpointJournal(self.fname) as journal:
+            journal.append(1, movie('/wiki/Snow_White'))
+        with self.fname.open('a') as f:
+            f.write('{"movie_indx": 2, "movie_info": {"title": "Pinoc')
+
+        with CheckpointJournal(self.fname) as journal:
+            self.assertEqual(list(journal.completed), [1])
+            self.assertEqual(journal.pending(MOVIE_LINKS), MOVIE_LINKS[1:])
+            journal.append(2, movie('/wiki/Pinocchio'))
+
+        # the record after the torn line is a line of its own
+        with CheckpointJournal(self.fname) as journal:
+            self.assertEqual(sorted(journal.completed), [1, 2])
+        self.assertEqual(len(self.fname.read_text().splitlines()), 2)
+
+    def test_shifted_index_is_crawled_again(self):
+        with CheckpointJournal(self.fname) as journal:
+            journal.append(1, movie('/wiki/Snow_White'))
+            journal.append(2, movie('/wiki/Pinocchio'))
+
+        # a film was inserted at index 2 of the list page
+        links = [(1, '/wiki/Snow_White'), (2, '/wiki/Dumbo'), (3, '/wiki/Pinocchio')]
+        with CheckpointJournal(self.fname) as journal:
+            self.assertEqual(journal.pending(links), links[1:])
+            self.assertEqual(journal.stale, [2])
+            self.assertEqual([info['title'] for info in journal.results(links)], ['Snow_White'])
+
+    def test_reset(self):
+        with CheckpointJournal(self.fname) as journal:
+            journal.append(1, movie('/wiki/Snow_White'))
+            journal.reset()
+            self.assertEqual(journal.pending(MOVIE_LINKS), MOVIE_LINKS)
+        self.assertEqual(self.fname.read_text(), '')
+
+
+if __name__ == "__main__":
+    unittest.main()
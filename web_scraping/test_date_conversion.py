@@ -0,0 +1,67 @@
+'''
+    unittests of modules/date_conversion.py - date_conversion_batch() must give what
+    date_conversion() gives, for a list and for a pandas Series
+
+    $ cd web_scraping && python -m unittest test_date_conversion
+'''
+from datetime import datetime
+import unittest
+
+import pandas as pd
+
+from modules.date_conversion import date_conversion, date_conversion_batch
+
+# value -> what date_conversion() returns for it
+EDGE_CASES = [
+    ("June 18, 2010", datetime(2010, 6, 18)),
+    ("18 June 2010", datetime(2010, 6, 18)),
+    ("june  8,  2010", datetime(2010, 6, 8)),
+    ("June 18, 2010 (United States)", datetime(2010, 6, 18)),
+    ("February 30, 2010", None),
+    ("2010", None),
+    ("N/A", None),
+    # ranges
+    ("June 18–20, 2010", None),
+    ("June 18, 2010 to July 1, 2010", None),
+    # lists - the first date counts
+    (["June 18, 2010", "July 1, 2010"], datetime(2010, 6, 18)),
+    (["N/A"], None),
+    # <sup> leftovers of the infobox
+    ("June 18, 2010<sup>[1]</sup>", None),
+    ("June 18, 2010[1]", None),
+]
+
+
+def as_scalar(date):
+    return None if pd.isna(date) else date.to_pydatetime()
+
+
+class TestDateConversionBatch(unittest.TestCase):
+    def test_scalar(self):
+        for date, expected in EDGE_CASES:
+            self.assertEqual(date_conversion(date), expected, msg=repr(date))
+
+    def test_batch(self):
+        dates = [date for date, _ in EDGE_CASES]
+        expected = [date_conversion(date) for date in dates]
+        for values in (dates, pd.Series(dates, dtype=object)):
+            converted = date_conversion_batch(values)
+            self.assertEqual(converted.dtype, 'datetime64[us]')
+            self.assertEqual([as_scalar(date) for date in converted], expected)
+
+    def test_series_index_is_kept(self):
+        converted = date_conversion_batch(pd.Series(["June 18, 2010", "N/A"], index=[7, 3], dtype=object))
+        self.assertEqual(list(converted.index), [7, 3])
+
+    def test_values_the_scalar_raises_on(self):
+        # not a string: date_conversion() raises, the batch treats it as missing
+        for date in (None, 5, [None]):
+            self.assertRaises(AttributeError, date_conversion, date)
+            self.assertTrue(pd.isna(date_conversion_batch([date])[0]))
+        # an empty list raises on both paths
+        self.assertRaises(IndexError, date_conversion, [])
+        self.assertRaises(IndexError, date_conversion_batch, [[]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+'''
+    unittests of modules/url_frontier.py - the link numbering must not depend on the order in
+    which a concurrent crawl happens to finish the downloads
+
+    $ cd web_scraping && python -m unittest test_url_frontier
+'''
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from modules.url_frontier import DuplicatePage, URLFrontier, canonicalize_url
+
+LIST_URL = 'https://en.wikipedia.org/wiki/List_of_films'
+FILM_TWO = 'https://en.wikipedia.org/wiki/Film_Two'     # a redirect to Film_2
+FILM_2 = 'https://en.wikipedia.org/wiki/Film_2'
+
+
+def page(canonical_url):
+    return f'<html><head><link rel="canonical" href="{canonical_url}"></head></html>'.encode()
+
+
+PAGES = {FILM_TWO: page(FILM_2), FILM_2: page(FILM_2)}
+
+
+def crawl_in_order(order):
+    '''
+    Plan the links "Film_Two" (id 1) and "Film_2" (id 2), fetch them in the given order of
+    ids, return (frontier, {link id: 'parsed' or 'duplicate'})
+    '''
+    frontier = URLFrontier()
+    frontier.add('/wiki/Film_Two', base=LIST_URL)
+    frontier.add('/wiki/Film_2', base=LIST_URL)
+    links = {link_id: url for link_id, url in frontier.drain()}
+    fetch = frontier.fetcher(PAGES.__getitem__)
+    outcome = {}
+    for link_id in order:
+        try:
+            fetch(links[link_id])
+            outcome[link_id] = 'parsed'
+        except DuplicatePage:
+            outcome[link_id] = 'duplicate'
+    return frontier, outcome
+
+
+class TestRedirectNumbering(unittest.TestCase):
+    def test_lower_id_fetched_first_keeps_the_article(self):
+        frontier, outcome = crawl_in_order([1, 2])
+        self.assertEqual(outcome, {1: 'parsed', 2: 'duplicate'})
+        self.assertEqual(frontier.duplicate_of, {2: 1})
+
+    def test_lower_id_fetched_last_takes_the_article_over(self):
+        frontier, outcome = crawl_in_order([2, 1])
+        # both were parsed - the higher id is listed in duplicate_of so its movie gets dropped
+        self.assertEqual(outcome, {2: 'parsed', 1: 'parsed'})
+        self.assertEqual(frontier.duplicate_of, {2: 1})
+
+    def test_both_orders_give_the_same_ids(self):
+        first, _ = crawl_in_order([1, 2])
+        second, _ = crawl_in_order([2, 1])
+        for link_id in (1, 2):
+            self.assertEqual(first.resolve(link_id), 1)
+            self.assertEqual(second.resolve(link_id), 1)
+        self.assertEqual(first.aliases, second.aliases)
+
+    def test_next_run_keeps_the_lower_id(self):
+        # with the aliases of the earlier run the duplicate is dropped before any fetch
+        for order in ([1, 2], [2, 1]):
+            earlier, _ = crawl_in_order(order)
+            frontier = URLFrontier(aliases=earlier.aliases)
+            self.assertEqual(frontier.add('/wiki/Film_Two', base=LIST_URL), (1, True))
+            self.assertEqual(frontier.add('/wiki/Film_2', base=LIST_URL), (1, False))
+
+
+class TestCanonicalizeUrl(unittest.TestCase):
+    def test_spellings_of_one_article(self):
+        for href in ('/wiki/Toy_Story_3', '/wiki/Toy_Story_3#Plot', '/wiki/toy%20Story%203',
+                     'https://en.m.wikipedia.org/wiki/Toy_Story_3', '//en.wikipedia.org//wiki/Toy_Story_3',
+                     '/w/index.php?title=Toy_Story_3'):
+            self.assertEqual(canonicalize_url(href, LIST_URL), 'https://en.wikipedia.org/wiki/Toy_Story_3')
+
+    def test_percent_decoded_once(self):
+        self.assertEqual(canonicalize_url('/wiki/100%2525', LIST_URL), 'https://en.wikipedia.org/wiki/100%2525')
+
+
+if __name__ == "__main__":
+    unittest.main()